@@ -66,11 +66,8 @@ const UserPhotosPage:  React.FC = () => {
   const fetchUsers = useCallback(async () => {
     setLoading(prev => ({ ...prev, users: true }));
     try {
-      // API принимает: skip (от 0), limit (от 1 до 1000)
-      // getUsers(skip, limit) - skip должен быть >= 0
-      const skip = 0;  // начинаем с первого пользователя
-      const limit = 1000;  // максимальный лимит API
-      const data = await userApi.getUsers(skip, limit);
+      // getUsers() проходит по всем страницам через X-Next-Cursor
+      const data = await userApi.getUsers();
       setUsers(data);
       setFilteredUsers(data);
     } catch (error) {
@@ -89,7 +86,7 @@ const UserPhotosPage:  React.FC = () => {
   const fetchUserPhotos = useCallback(async (userId:  string) => {
     setLoading(prev => ({ ...prev, photos: true }));
     try {
-      const response:  MediaListResponse = await photosApi.getUserPhotos(userId, 0, 1000);
+      const response:  MediaListResponse = await photosApi.getUserPhotos(userId);
       
       // Map API response to Photo array - API returns data in 'media' field
       const photosData:  Photo[] = (response.media || []).map(item => ({
@@ -151,9 +151,7 @@ const UsersPage: React.FC = () => {
   const fetchUsers = useCallback(async () => {
     setLoading(prev => ({ ...prev, users: true }));
     try {
-      const skip = 0;
-      const limit = 1000;
-      const data = await userApi.getUsers(skip, limit);
+      const data = await userApi.getUsers();
       
       // Fetch course details for each user
       const usersWithCourses = await Promise.all(
@@ -359,7 +359,7 @@ const ContentEditor:  React.FC<ContentEditorProps> = ({
   const loadMediaLibrary = async () => {
     setLoadingLibrary(true);
     try {
-      const response = await s3Api.getAllMedia(0, 100, undefined, courseId);
+      const response = await s3Api.getAllMedia(null, 100, undefined, courseId);
 
       setLibraryMedia(
         (response.items || []).map((m:  any) => ({
@@ -118,15 +118,18 @@ export const userApi = {
     return response.data;
   },
 
-  // Get all users (admin only)
-  getAllUsers: async (
-    skip:  number = 0,
-    limit: number = 100
-  ): Promise<User[]> => {
-    const response = await axios.get("/user/all", {
-      params: { skip, limit },
-    });
-    return response.data;
+  // Get all users (admin only), following the X-Next-Cursor header page by page
+  getAllUsers: async (limit: number = 1000): Promise<User[]> => {
+    const users: User[] = [];
+    let cursor: string | undefined;
+    do {
+      const response = await axios.get("/user/all", {
+        params: { cursor, limit },
+      });
+      users.push(...response.data);
+      cursor = response.headers["x-next-cursor"];
+    } while (cursor);
+    return users;
   },
 
   // Get user by ID (admin only)
@@ -151,11 +154,8 @@ export const userApi = {
 
   // Helper:  Get users with pagination
   // ИСПРАВЛЕНО: добавлена проверка на минимальное значение page
-  getUsers: (page: number = 1, limit: number = 20) => {
-    // Ensure page is at least 1 to avoid negative skip values
-    const safePage = Math.max(1, page);
-    const skip = (safePage - 1) * limit;
-    return userApi.getAllUsers(skip, limit);
+  getUsers: (limit: number = 1000) => {
+    return userApi.getAllUsers(limit);
   },
 };
 
@@ -732,15 +732,16 @@ export const s3Api = {
     }
   },
 
-  // Get all media files
+  // Get a page of media files; pass next_cursor of the previous page as cursor
   getAllMedia: async (
-    skip:  number = 0,
+    cursor?: string | null,
     limit: number = 100,
     mediaType?:  "image" | "video",
     courseId?: number,
     lessonId?: number
   ) => {
-    const params:  any = { skip, limit };
+    const params:  any = { limit };
+    if (cursor) params.cursor = cursor;
     if (mediaType) params.media_type = mediaType;
     if (courseId) params.course_id = courseId;
     if (lessonId) params.lesson_id = lessonId;
@@ -766,15 +767,22 @@ export const s3Api = {
 // PHOTOS API
 // ============================================================================
 export const photosApi = {
-  // Get user photos with correct structure
+  // Get all user photos, following next_cursor page by page
   getUserPhotos: async (
     userId: string,
-    skip: number = 0,
-    limit: number = 100
+    limit: number = 1000
   ): Promise<MediaListResponse> => {
-    const response = await axios.get(`/photos/user/${userId}`, {
-      params: { skip, limit },
-    });
-    return response.data;
+    const result: MediaListResponse = { media: [], total: 0, next_cursor: null };
+    let cursor: string | null | undefined;
+    do {
+      const response = await axios.get(`/photos/user/${userId}`, {
+        params: { cursor: cursor ?? undefined, limit },
+      });
+      const page: MediaListResponse = response.data;
+      result.media.push(...page.media);
+      result.total = page.total;
+      cursor = page.next_cursor;
+    } while (cursor);
+    return result;
   },
 };
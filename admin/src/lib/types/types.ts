@@ -370,6 +370,7 @@ export interface PhotoMedia {
 export interface MediaListResponse {
   media: PhotoMedia[];
   total:  number;
+  next_cursor?: string | null;
 }
 
 export interface Photo extends PhotoMedia {
@@ -22,6 +22,7 @@ from auth.src.app.core.config import settings
 # Import all models so Alembic can detect them
 from auth.src.app.models.user import User  # noqa
 from auth.src.app.models.session import Session  # noqa
+from auth.src.app.models.enrollment import UserCourseEnrollment  # noqa
 # this is the Alembic Config object
 config = context.config
 
@@ -0,0 +1,27 @@
+"""Add user created_at index for keyset pagination
+
+Revision ID: e7d23fa84209
+Revises: 2dbccd097361
+Create Date: 2026-10-17 11:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7d23fa84209'
+down_revision: Union[str, Sequence[str], None] = '2dbccd097361'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_user_created_at_id', 'user', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_created_at_id', table_name='user')
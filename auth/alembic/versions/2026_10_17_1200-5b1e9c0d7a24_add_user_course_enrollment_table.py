@@ -0,0 +1,88 @@
+"""Move enrolled_courses into user_course_enrollment table
+
+Revision ID: 5b1e9c0d7a24
+Revises: e7d23fa84209
+Create Date: 2026-10-17 12:00:00.000000+00:00
+
+"""
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e9c0d7a24'
+down_revision: Union[str, Sequence[str], None] = 'e7d23fa84209'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    enrollment = op.create_table(
+        'user_course_enrollment',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('course_id', sa.String(length=100), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'course_id')
+    )
+    op.create_index(
+        'ix_user_course_enrollment_course_id_user_id',
+        'user_course_enrollment',
+        ['course_id', 'user_id'],
+        unique=False
+    )
+    
+    # Copy the JSON lists; created_at keeps the original order of each list
+    bind = op.get_bind()
+    users = bind.execute(
+        sa.text('SELECT id, enrolled_courses FROM "user" WHERE enrolled_courses IS NOT NULL')
+    ).all()
+    migrated_at = datetime.now(timezone.utc)
+    rows = []
+    for user_id, enrolled_courses in users:
+        try:
+            course_ids = json.loads(enrolled_courses)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(course_ids, list):
+            continue
+        for position, course_id in enumerate(dict.fromkeys(str(c) for c in course_ids)):
+            rows.append({
+                'user_id': uuid.UUID(str(user_id)),
+                'course_id': course_id,
+                'created_at': migrated_at + timedelta(microseconds=position),
+            })
+    for start in range(0, len(rows), BATCH_SIZE):
+        op.bulk_insert(enrollment, rows[start:start + BATCH_SIZE])
+    
+    op.drop_column('user', 'enrolled_courses')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('user', sa.Column('enrolled_courses', sa.Text(), nullable=True))
+    
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text(
+            'SELECT user_id, course_id FROM user_course_enrollment '
+            'ORDER BY user_id, created_at, course_id'
+        )
+    ).all()
+    for user_id, user_rows in groupby(rows, key=lambda row: row[0]):
+        bind.execute(
+            sa.text('UPDATE "user" SET enrolled_courses = :courses WHERE id = :user_id'),
+            {'courses': json.dumps([row[1] for row in user_rows]), 'user_id': user_id}
+        )
+    
+    op.drop_index('ix_user_course_enrollment_course_id_user_id', table_name='user_course_enrollment')
+    op.drop_table('user_course_enrollment')
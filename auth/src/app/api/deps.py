@@ -8,11 +8,13 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from auth.src.app.core.principal_cache import principal_cache
 from auth.src.app.core.security import decode_access_token
 from auth.src. app.db.database import get_async_session
 from auth.src.app.exceptions import UserNotFoundError, UserInactiveError
 from auth.src.app.models.user import User
 from auth.src.app.repositories import UserRepository
+from auth.src.app.schemas.user import UserRead
 
 logger = logging.getLogger(__name__)
 
@@ -30,22 +32,18 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    session: AsyncSession = Depends(get_db_session),
-) -> User:
+def _get_token_user_id(credentials: HTTPAuthorizationCredentials) -> UUID:
     """
-    Get current authenticated user from JWT token.
+    Decode the bearer token and return its subject.
     
     Args:
         credentials: HTTP authorization credentials
-        session: Database session
         
     Returns:
-        User: Current authenticated user
+        UUID: ID of the user the token was issued to
         
     Raises:
-        HTTPException: If token is invalid or user not found
+        HTTPException: If token is invalid
     """
     token = credentials.credentials
     
@@ -60,7 +58,7 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        user_id = UUID(user_id_str)
+        return UUID(user_id_str)
         
     except Exception as e:
         logger.error(f"Token decode error: {str(e)}")
@@ -69,6 +67,29 @@ async def get_current_user(
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    session: AsyncSession = Depends(get_db_session),
+) -> User:
+    """
+    Get current authenticated user from JWT token.
+    
+    Loads the database row; endpoints that only read the user should
+    depend on get_current_principal instead.
+    
+    Args:
+        credentials: HTTP authorization credentials
+        session: Database session
+        
+    Returns:
+        User: Current authenticated user
+        
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    user_id = _get_token_user_id(credentials)
     
     user_repo = UserRepository(session)
     user = await user_repo.get(user_id)
@@ -76,9 +97,91 @@ async def get_current_user(
     if not user:
         raise UserNotFoundError()
     
+    principal_cache.put(UserRead.model_validate(user))
     return user
 
 
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    session: AsyncSession = Depends(get_db_session),
+) -> UserRead:
+    """
+    Get a snapshot of the current user, served from the principal cache.
+    
+    The database is queried only on a cache miss.
+    
+    Args:
+        credentials: HTTP authorization credentials
+        session: Database session
+        
+    Returns:
+        UserRead: Current authenticated user
+        
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    user_id = _get_token_user_id(credentials)
+    
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    
+    user_repo = UserRepository(session)
+    user = await user_repo.get(user_id)
+    
+    if not user:
+        raise UserNotFoundError()
+    
+    principal = UserRead.model_validate(user)
+    principal_cache.put(principal)
+    return principal
+
+
+async def get_current_active_principal(
+    current_user: UserRead = Depends(get_current_principal),
+) -> UserRead:
+    """
+    Get a snapshot of the current active user.
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Returns:
+        UserRead: Current active user
+        
+    Raises:
+        HTTPException: If user is inactive
+    """
+    if not current_user.is_active:
+        raise UserInactiveError()
+    
+    return current_user
+
+
+async def get_current_superprincipal(
+    current_user: UserRead = Depends(get_current_active_principal),
+) -> UserRead:
+    """
+    Get a snapshot of the current superuser.
+    
+    Args:
+        current_user: Current active user
+        
+    Returns:
+        UserRead: Current superuser
+        
+    Raises:
+        HTTPException: If user is not a superuser
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return current_user
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -11,18 +11,20 @@ from auth.src.app.api. deps import (
     get_db_session,
     get_current_user,
     get_current_active_user,
-    get_current_superuser,
+    get_current_superprincipal,
 )
+from auth.src.app.core.principal_cache import principal_cache
 from auth.src.app. core.security import (
     create_access_token,
     create_refresh_token,
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
     verify_refresh_token,
 )
 from auth.src.app.db.database import get_async_session
 from auth.src.app.exceptions import (
     InvalidCredentialsError,
+    PasswordHashingOverloadedError,
     UserNotFoundError,
     UserInactiveError,
 )
@@ -88,7 +90,7 @@ async def register(
         )
     
     # Create new user with all fields
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = await get_password_hash_async(user_in.password)
     user_data = {
         "email": user_in.email,
         "hashed_password": hashed_password,
@@ -152,7 +154,7 @@ async def login(
         raise InvalidCredentialsError()
     
     # Verify password
-    if not verify_password(login_data.password, user.hashed_password):
+    if not await verify_password_async(login_data.password, user.hashed_password):
         logger. warning(f"Failed login attempt for user: {user.email}")
         raise InvalidCredentialsError()
     
@@ -339,13 +341,16 @@ async def reset_password(
             raise UserNotFoundError()
         
         # Update password
-        hashed_password = get_password_hash(new_password)
+        hashed_password = await get_password_hash_async(new_password)
         await user_repo.update(user.id, hashed_password=hashed_password)
+        principal_cache.invalidate(user.id)
         
         logger.info(f"Password reset successful for user: {user.email}")
         
         return {"message": "Password reset successful"}
         
+    except PasswordHashingOverloadedError:
+        raise
     except Exception as e:
         logger.error(f"Password reset failed: {str(e)}")
         raise HTTPException(
@@ -376,7 +381,7 @@ async def change_password(
         Success message
     """
     # Verify old password
-    if not verify_password(password_data.old_password, current_user.hashed_password):
+    if not await verify_password_async(password_data.old_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect old password"
@@ -384,8 +389,9 @@ async def change_password(
     
     # Update to new password
     user_repo = UserRepository(session)
-    hashed_password = get_password_hash(password_data.new_password)
+    hashed_password = await get_password_hash_async(password_data.new_password)
     await user_repo.update(current_user.id, hashed_password=hashed_password)
+    principal_cache.invalidate(current_user.id)
     
     logger.info(f"Password changed for user: {current_user.email}")
     
@@ -400,7 +406,7 @@ async def change_password(
 )
 async def grant_admin_role(
     grant_data: GrantAdminRequest,
-    current_user: User = Depends(get_current_superuser),
+    current_user: UserRead = Depends(get_current_superprincipal),
     session: AsyncSession = Depends(get_async_session),
 ) -> UserRead:
     """
@@ -441,6 +447,7 @@ async def grant_admin_role(
         target_user.id,
         is_superuser=True
     )
+    principal_cache.invalidate(target_user.id)
     
     logger. info(
         f"Admin role granted to user {target_user.email} (ID: {target_user.id}) "
@@ -1,26 +1,28 @@
 """Enrollment API endpoints for course management."""
 
 import logging
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from auth.src.app.api.deps import get_current_superuser
+from auth.src.app.core.config import settings
+from auth.src.app.core.principal_cache import principal_cache
 from auth.src.app.db.database import get_async_session
-from auth.src.app.models.user import User
-from auth.src.app.repositories import UserRepository
+from auth.src.app.repositories import EnrollmentRepository, UserRepository
 from auth.src.app.schemas.enrollment import (
+    BulkEnrollmentRequest,
+    BulkEnrollmentResponse,
+    CourseMember,
     EnrollmentResponse,
     MyCoursesResponse,
 )
+from auth.src.app.schemas.user import UserRead
 
 from auth.src.app.api.deps import (
-    get_db_session,
-    get_current_user,
-    get_current_active_user,
-    get_current_superuser,
+    get_current_active_principal,
+    get_current_superprincipal,
 )
 
 logger = logging.getLogger(__name__)
@@ -36,7 +38,7 @@ router = APIRouter()
 async def enroll_in_course(
     course_id: str,
     user_id: str = Query(..., description="ID of the user to enroll"),
-    current_user: User = Depends(get_current_superuser),
+    current_user: UserRead = Depends(get_current_superprincipal),
     session: AsyncSession = Depends(get_async_session),
 ) -> EnrollmentResponse:
     """
@@ -73,23 +75,17 @@ async def enroll_in_course(
             detail=f"User {user_id} not found"
         )
     
-    # Get current enrolled courses
-    enrolled_courses = target_user.enrolled_courses
+    enrollment_repo = EnrollmentRepository(session)
     
-    # Check if already enrolled
-    if course_id in enrolled_courses:
+    # Nothing is inserted if the user is already enrolled
+    if not await enrollment_repo.enroll(course_id, [target_user.id]):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"User is already enrolled in course {course_id}"
         )
+    principal_cache.invalidate(target_user.id)
     
-    # Add course to enrolled courses
-    updated_courses = enrolled_courses + [course_id]
-    target_user.enrolled_courses = updated_courses
-    
-    # Save to database
-    await user_repo.update(target_user.id, _enrolled_courses=target_user._enrolled_courses)
-    await session.commit()
+    updated_courses = await enrollment_repo.get_course_ids(target_user.id)
     
     logger.info(f"Admin {current_user.email} enrolled user {target_user.email} in course {course_id}")
     
@@ -108,7 +104,7 @@ async def enroll_in_course(
 async def unenroll_from_course(
     course_id: str,
     user_id: str = Query(..., description="ID of the user to unenroll"),
-    current_user: User = Depends(get_current_superuser),
+    current_user: UserRead = Depends(get_current_superprincipal),
     session: AsyncSession = Depends(get_async_session),
 ) -> EnrollmentResponse:
     """
@@ -145,19 +141,16 @@ async def unenroll_from_course(
             detail=f"User {user_id} not found"
         )
     
-    enrolled_courses = target_user.enrolled_courses
+    enrollment_repo = EnrollmentRepository(session)
     
-    if course_id not in enrolled_courses:
+    if not await enrollment_repo.unenroll(course_id, [target_user.id]):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User is not enrolled in course {course_id}"
         )
+    principal_cache.invalidate(target_user.id)
     
-    updated_courses = [c for c in enrolled_courses if c != course_id]
-    target_user.enrolled_courses = updated_courses
-    
-    await user_repo.update(target_user.id, _enrolled_courses=target_user._enrolled_courses)
-    await session.commit()
+    updated_courses = await enrollment_repo.get_course_ids(target_user.id)
     
     logger.info(f"Admin {current_user.email} unenrolled user {target_user.email} from course {course_id}")
     
@@ -167,6 +160,139 @@ async def unenroll_from_course(
     )
 
 
+@router.post(
+    "/courses/{course_id}/bulk-enroll",
+    status_code=status.HTTP_200_OK,
+    response_model=BulkEnrollmentResponse,
+    description="Enroll many users in a course (admin only)",
+)
+async def bulk_enroll_in_course(
+    course_id: str,
+    bulk_data: BulkEnrollmentRequest,
+    current_user: UserRead = Depends(get_current_superprincipal),
+    session: AsyncSession = Depends(get_async_session),
+) -> BulkEnrollmentResponse:
+    """
+    Enroll a list of users in a course with a single statement.
+    Only accessible by superusers.
+    
+    Unknown user IDs and users that are already enrolled are skipped,
+    so the request can be safely retried.
+    
+    Args:
+        course_id: ID of the course to enroll in
+        bulk_data: IDs of the users to enroll
+        current_user: Current authenticated superuser
+        session: Database session
+        
+    Returns:
+        BulkEnrollmentResponse: IDs of the users that were enrolled
+    """
+    user_ids = set(bulk_data.user_ids)
+    
+    enrollment_repo = EnrollmentRepository(session)
+    enrolled = await enrollment_repo.enroll(course_id, list(user_ids))
+    for user_id in enrolled:
+        principal_cache.invalidate(user_id)
+    
+    logger.info(f"Admin {current_user.email} bulk enrolled {len(enrolled)} users in course {course_id}")
+    
+    return BulkEnrollmentResponse(
+        message=f"Enrolled {len(enrolled)} of {len(user_ids)} users",
+        course_id=course_id,
+        requested=len(user_ids),
+        changed_user_ids=enrolled
+    )
+
+
+@router.post(
+    "/courses/{course_id}/bulk-unenroll",
+    status_code=status.HTTP_200_OK,
+    response_model=BulkEnrollmentResponse,
+    description="Unenroll many users from a course (admin only)",
+)
+async def bulk_unenroll_from_course(
+    course_id: str,
+    bulk_data: BulkEnrollmentRequest,
+    current_user: UserRead = Depends(get_current_superprincipal),
+    session: AsyncSession = Depends(get_async_session),
+) -> BulkEnrollmentResponse:
+    """
+    Unenroll a list of users from a course with a single statement.
+    Only accessible by superusers.
+    
+    Args:
+        course_id: ID of the course to unenroll from
+        bulk_data: IDs of the users to unenroll
+        current_user: Current authenticated superuser
+        session: Database session
+        
+    Returns:
+        BulkEnrollmentResponse: IDs of the users that were unenrolled
+    """
+    user_ids = set(bulk_data.user_ids)
+    
+    enrollment_repo = EnrollmentRepository(session)
+    unenrolled = await enrollment_repo.unenroll(course_id, list(user_ids))
+    for user_id in unenrolled:
+        principal_cache.invalidate(user_id)
+    
+    logger.info(f"Admin {current_user.email} bulk unenrolled {len(unenrolled)} users from course {course_id}")
+    
+    return BulkEnrollmentResponse(
+        message=f"Unenrolled {len(unenrolled)} of {len(user_ids)} users",
+        course_id=course_id,
+        requested=len(user_ids),
+        changed_user_ids=unenrolled
+    )
+
+
+@router.get(
+    "/courses/{course_id}/members",
+    status_code=status.HTTP_200_OK,
+    response_model=List[CourseMember],
+    description="Get users enrolled in a course (admin only)",
+)
+async def get_course_members(
+    course_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    current_user: UserRead = Depends(get_current_superprincipal),
+    session: AsyncSession = Depends(get_async_session),
+) -> List[CourseMember]:
+    """
+    Get a page of the members of a course ordered by user ID.
+    Only accessible by superusers.
+    
+    The cursor of the next page is returned in the X-Next-Cursor header.
+    
+    Args:
+        course_id: Course ID
+        response: HTTP response
+        cursor: Cursor returned with the previous page
+        limit: Maximum number of records to return
+        current_user: Current authenticated superuser
+        session: Database session
+        
+    Returns:
+        List[CourseMember]: Enrolled users with their enrollment time
+    """
+    enrollment_repo = EnrollmentRepository(session)
+    
+    enrollments, next_cursor = await enrollment_repo.list_members(
+        course_id,
+        cursor=cursor,
+        limit=limit
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    logger.info(f"Admin {current_user.email} retrieved {len(enrollments)} members of course {course_id}")
+    
+    return [CourseMember.model_validate(enrollment) for enrollment in enrollments]
+
+
 @router.get(
     "/my-courses",
     status_code=status.HTTP_200_OK,
@@ -174,7 +300,7 @@ async def unenroll_from_course(
     description="Get list of courses the current user is enrolled in",
 )
 async def get_my_courses(
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserRead = Depends(get_current_active_principal),
 ) -> MyCoursesResponse:
     """
     Get the list of course IDs that the current user is enrolled in.
@@ -199,7 +325,7 @@ async def get_my_courses(
     description="Get detailed information about courses the current user is enrolled in",
 )
 async def get_my_courses_details(
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserRead = Depends(get_current_active_principal),
 ) -> MyCoursesResponse:
     """
     Get detailed information about courses the current user is enrolled in.
@@ -1,30 +1,48 @@
 """User management API endpoints."""
 
+import asyncio
+import csv
+import io
 import logging
-from typing import List, Optional
-from uuid import UUID
+import secrets
+from itertools import islice
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
 from sqlalchemy import select
 
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, File, Form, HTTPException, status, Query, Response, UploadFile
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.src.app.api.deps import (
     get_db_session,
-    get_current_user,
-    get_current_active_user,
-    get_current_superuser,
+    get_current_active_principal,
+    get_current_superprincipal,
 )
+from auth.src.app.core.config import settings
+from auth.src.app.core.principal_cache import principal_cache
+from auth.src.app.core.security import hash_passwords_async
 from auth.src.app.db.database import get_async_session
 from auth.src.app.exceptions import UserNotFoundError
 from auth.src.app.models.user import User
-from auth.src.app.repositories import UserRepository
-from auth.src.app.schemas import UserRead, UserUpdate, UserCreate
+from auth.src.app.repositories import EnrollmentRepository, UserRepository
+from auth.src.app.schemas import (
+    UserRead,
+    UserUpdate,
+    UserCreate,
+    UserImportRow,
+    UserImportRowResult,
+    UserImportResponse,
+)
 
 
 logger = logging. getLogger(__name__)
 router = APIRouter()
 
+IMPORT_REQUIRED_COLUMNS = ("email", "first_name", "last_name", "phone_number")
+
 
 @router. get(
     "/me",
@@ -34,7 +52,7 @@ router = APIRouter()
     response_model_exclude_none=True,
 )
 async def get_current_user_info(
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserRead = Depends(get_current_active_principal),
 ) -> UserRead:
     """
     Get information about the currently authenticated user.
@@ -46,7 +64,7 @@ async def get_current_user_info(
         UserRead: Current user information
     """
     logger.info(f"User info requested: {current_user.email}")
-    return UserRead.model_validate(current_user)
+    return current_user
 
 
 @router.patch(
@@ -58,7 +76,7 @@ async def get_current_user_info(
 )
 async def update_current_user(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserRead = Depends(get_current_active_principal),
     session: AsyncSession = Depends(get_async_session),
 ) -> UserRead:
     """
@@ -76,6 +94,7 @@ async def update_current_user(
     
     update_data = user_update.model_dump(exclude_unset=True)
     updated_user = await user_repo. update(current_user.id, **update_data)
+    principal_cache.invalidate(current_user.id)
     
     logger.info(f"User updated: {updated_user.email}")
     
@@ -90,17 +109,23 @@ async def update_current_user(
     response_model_exclude_none=True,
 )
 async def get_all_users(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
-    current_user: User = Depends(get_current_superuser),
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
+    current_user: UserRead = Depends(get_current_superprincipal),
     session: AsyncSession = Depends(get_async_session),
 ) -> List[UserRead]:
     """
-    Get list of all users. Only accessible by superusers.
+    Get a page of users ordered by registration date. Only accessible by superusers.
+    
+    The cursor of the next page is returned in the X-Next-Cursor header.
     
     Args:
-        skip: Number of records to skip
+        response: HTTP response
+        cursor: Cursor returned with the previous page
         limit: Maximum number of records to return
+        skip: Deprecated offset, ignored when cursor is given
         current_user: Current authenticated superuser
         session: Database session
         
@@ -109,13 +134,242 @@ async def get_all_users(
     """
     user_repo = UserRepository(session)
     
-    users = await user_repo.list(skip=skip, limit=limit)
+    users, next_cursor = await user_repo.paginate(
+        cursor=cursor,
+        limit=limit,
+        sort_columns=[User.created_at, User.id],
+        descending=False,
+        skip=skip
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     logger.info(f"Admin {current_user.email} retrieved {len(users)} users")
     
     return [UserRead.model_validate(user) for user in users]
 
 
+def _format_validation_error(exc: ValidationError) -> str:
+    """Flatten a validation error into a single line for the import report."""
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+async def _import_users_batch(
+    session: AsyncSession,
+    batch: List[Tuple[int, Dict[str, Optional[str]]]],
+    seen_emails: Set[str],
+    seen_phone_numbers: Set[str],
+    result: UserImportResponse,
+) -> None:
+    """
+    Validate, hash and insert one batch of CSV rows.
+    
+    Existing emails and phone numbers are looked up with one IN query each
+    and the new users are inserted with one statement. If that insert hits
+    a unique constraint (a user registered concurrently), the batch is
+    retried row by row to report the offending rows.
+    
+    Args:
+        session: Database session
+        batch: (row number, CSV row) pairs
+        seen_emails: Emails of the previous rows of the file
+        seen_phone_numbers: Phone numbers of the previous rows of the file
+        result: Import report to add the row outcomes to
+    """
+    user_repo = UserRepository(session)
+    
+    candidates: List[Tuple[int, UserImportRow]] = []
+    for row_number, raw in batch:
+        email = (raw.get("email") or "").strip() or None
+        try:
+            row = UserImportRow.model_validate({
+                "email": email,
+                "first_name": raw.get("first_name"),
+                "last_name": raw.get("last_name"),
+                "phone_number": raw.get("phone_number"),
+                "password": raw.get("password") or None,
+            })
+        except ValidationError as e:
+            result.rows.append(UserImportRowResult(
+                row=row_number, status="error", email=email, error=_format_validation_error(e)
+            ))
+            continue
+        
+        if row.email in seen_emails:
+            error = "Duplicate email in file"
+        elif row.phone_number in seen_phone_numbers:
+            error = "Duplicate phone number in file"
+        else:
+            seen_emails.add(row.email)
+            seen_phone_numbers.add(row.phone_number)
+            candidates.append((row_number, row))
+            continue
+        result.rows.append(UserImportRowResult(row=row_number, status="error", email=row.email, error=error))
+    
+    existing_emails = await user_repo.get_existing_emails([row.email for _, row in candidates])
+    existing_phone_numbers = await user_repo.get_existing_phone_numbers([row.phone_number for _, row in candidates])
+    
+    new_rows: List[Tuple[int, UserImportRow]] = []
+    for row_number, row in candidates:
+        if row.email in existing_emails:
+            error = "User with this email already exists"
+        elif row.phone_number in existing_phone_numbers:
+            error = "User with this phone number already exists"
+        else:
+            new_rows.append((row_number, row))
+            continue
+        result.rows.append(UserImportRowResult(row=row_number, status="error", email=row.email, error=error))
+    
+    if not new_rows:
+        return
+    
+    # Rows without a password get a generated one that is returned in the report
+    passwords = [row.password or secrets.token_urlsafe(12) for _, row in new_rows]
+    hashed_passwords = await hash_passwords_async(passwords)
+    
+    users = [
+        {
+            "id": uuid4(),
+            "email": row.email,
+            "hashed_password": hashed_password,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "phone_number": row.phone_number,
+            "is_active": True,
+            "is_superuser": False,
+            "is_verified": False,
+        }
+        for (_, row), hashed_password in zip(new_rows, hashed_passwords)
+    ]
+    
+    try:
+        await user_repo.bulk_create(users)
+        inserted = list(range(len(users)))
+    except IntegrityError:
+        logger.warning("Bulk insert of imported users failed, retrying row by row")
+        inserted = []
+        for index, user in enumerate(users):
+            try:
+                await user_repo.bulk_create([user])
+                inserted.append(index)
+            except IntegrityError:
+                row_number, row = new_rows[index]
+                result.rows.append(UserImportRowResult(
+                    row=row_number,
+                    status="error",
+                    email=row.email,
+                    error="User with this email or phone number already exists"
+                ))
+    
+    for index in inserted:
+        row_number, row = new_rows[index]
+        result.rows.append(UserImportRowResult(
+            row=row_number,
+            status="created",
+            email=row.email,
+            user_id=users[index]["id"],
+            initial_password=None if row.password else passwords[index]
+        ))
+    
+    if result.course_id and inserted:
+        enrollment_repo = EnrollmentRepository(session)
+        enrolled = await enrollment_repo.enroll(result.course_id, [users[index]["id"] for index in inserted])
+        result.enrolled += len(enrolled)
+
+
+@router.post(
+    "/import",
+    status_code=status.HTTP_200_OK,
+    response_model=UserImportResponse,
+    description="Import users from a CSV file (admin only)",
+    response_model_exclude_none=True,
+)
+async def import_users(
+    file: UploadFile = File(..., description="CSV with email, first_name, last_name, phone_number and optional password columns"),
+    course_id: Optional[str] = Form(None, description="Course to enroll the created users in"),
+    current_user: UserRead = Depends(get_current_superprincipal),
+    session: AsyncSession = Depends(get_async_session),
+) -> UserImportResponse:
+    """
+    Create user accounts from a CSV file. Only accessible by superusers.
+    
+    The file is read in batches of USER_IMPORT_BATCH_SIZE rows, each
+    committed on its own, so a bad row never rejects the whole file. Rows
+    without a password get a generated one, returned once in the report.
+    Reading stops after USER_IMPORT_MAX_ROWS rows (truncated is set).
+    
+    Args:
+        file: CSV file with a header row
+        course_id: Course to enroll the created users in
+        current_user: Current authenticated superuser
+        session: Database session
+        
+    Returns:
+        UserImportResponse: Per-row outcome and totals
+        
+    Raises:
+        HTTPException: If the file is not a CSV with the required columns
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig", newline=""))
+    
+    try:
+        fieldnames = await asyncio.to_thread(lambda: reader.fieldnames)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid CSV file: {e}"
+        )
+    
+    reader.fieldnames = [name.strip().lower() for name in fieldnames or []]
+    missing = [column for column in IMPORT_REQUIRED_COLUMNS if column not in reader.fieldnames]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Missing CSV columns: {', '.join(missing)}"
+        )
+    
+    result = UserImportResponse(total_rows=0, created=0, failed=0, course_id=course_id)
+    seen_emails: Set[str] = set()
+    seen_phone_numbers: Set[str] = set()
+    # Rows are numbered by their line in the file, as a spreadsheet shows them
+    numbered_rows = ((reader.line_num, raw) for raw in reader)
+    
+    while not result.truncated:
+        try:
+            batch = await asyncio.to_thread(list, islice(numbered_rows, settings.USER_IMPORT_BATCH_SIZE))
+        except (UnicodeDecodeError, csv.Error) as e:
+            result.rows.append(UserImportRowResult(
+                row=reader.line_num, status="error", error=f"Malformed CSV: {e}"
+            ))
+            result.truncated = True
+            break
+        
+        if not batch:
+            break
+        
+        remaining = settings.USER_IMPORT_MAX_ROWS - result.total_rows
+        if len(batch) > remaining:
+            batch = batch[:remaining]
+            result.truncated = True
+        result.total_rows += len(batch)
+        
+        await _import_users_batch(session, batch, seen_emails, seen_phone_numbers, result)
+    
+    result.rows.sort(key=lambda row_result: row_result.row)
+    result.created = sum(1 for row_result in result.rows if row_result.status == "created")
+    result.failed = len(result.rows) - result.created
+    
+    logger.info(
+        f"Admin {current_user.email} imported {result.created} users from {file.filename} "
+        f"({result.failed} failed, {result.enrolled} enrolled in course {course_id})"
+    )
+    
+    return result
+
+
 @router.get(
     "/{user_id}",
     status_code=status.HTTP_200_OK,
@@ -125,7 +379,7 @@ async def get_all_users(
 )
 async def get_user_by_id(
     user_id: UUID,
-    current_user: User = Depends(get_current_superuser),
+    current_user: UserRead = Depends(get_current_superprincipal),
     session: AsyncSession = Depends(get_async_session),
 ) -> UserRead:
     """
@@ -164,7 +418,7 @@ async def get_user_by_id(
 async def update_user_by_id(
     user_id: UUID,
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_superuser),
+    current_user: UserRead = Depends(get_current_superprincipal),
     session: AsyncSession = Depends(get_async_session),
 ) -> UserRead:
     """
@@ -191,6 +445,7 @@ async def update_user_by_id(
     
     update_data = user_update.model_dump(exclude_unset=True)
     updated_user = await user_repo.update(user_id, **update_data)
+    principal_cache.invalidate(user_id)
     
     logger.info(f"Admin {current_user.email} updated user: {updated_user.email}")
     
@@ -204,7 +459,7 @@ async def update_user_by_id(
 )
 async def delete_user_by_id(
     user_id: UUID,
-    current_user: User = Depends(get_current_superuser),
+    current_user: UserRead = Depends(get_current_superprincipal),
     session: AsyncSession = Depends(get_async_session),
 ):
     """
@@ -232,6 +487,7 @@ async def delete_user_by_id(
         raise UserNotFoundError()
     
     await user_repo.delete(user_id)
+    principal_cache.invalidate(user_id)
     
     logger.info(f"Admin {current_user.email} deleted user: {user.email}")
 
@@ -20,6 +20,28 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     ROOT_PATH: str = ""
     
+    # Password Hashing Settings
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4  # bcrypt releases the GIL, so threads run hashes in parallel
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # hashes allowed to wait for a worker before 503
+    PASSWORD_HASH_CALIBRATE_ON_STARTUP: bool = True
+    
+    # Principal Cache Settings
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 30  # seconds; bounds staleness across worker processes
+    
+    # Pagination Settings
+    DEFAULT_PAGE_SIZE: int = 100
+    MAX_PAGE_SIZE: int = 1000
+    
+    # Enrollment Settings
+    BULK_ENROLLMENT_MAX_USERS: int = 10000  # one IN list per statement; keep below the bind parameter limit
+    
+    # User Import Settings
+    USER_IMPORT_BATCH_SIZE: int = 500  # CSV rows per lookup/hash/insert batch
+    USER_IMPORT_MAX_ROWS: int = 5000
+    USER_IMPORT_HASH_WORKERS: int = 2  # separate from PASSWORD_HASH_WORKERS so imports do not starve logins
+    
     # CORS Settings
     ALLOWED_ORIGINS: List[str] = [
         "http://localhost:3000",
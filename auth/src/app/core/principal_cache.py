@@ -0,0 +1,99 @@
+"""In-process cache of authenticated user principals."""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from auth.src.app.core.config import settings
+from auth.src.app.schemas.user import UserRead
+
+logger = logging.getLogger(__name__)
+
+
+class PrincipalCache:
+    """
+    Short-TTL LRU cache of user snapshots keyed by user ID.
+    
+    A snapshot carries everything the read-only endpoints need (id,
+    is_active, is_superuser, enrolled courses and the public profile), so
+    an authenticated request that hits the cache makes no database query.
+    Endpoints that change a user invalidate its entry explicitly; the TTL
+    bounds staleness for changes made through other worker processes.
+    """
+    
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[UUID, Tuple[UserRead, float]]" = OrderedDict()
+    
+    def get(self, user_id: UUID) -> Optional[UserRead]:
+        """
+        Get a cached principal if it is present and not expired.
+        
+        Args:
+            user_id: User UUID
+            
+        Returns:
+            Optional[UserRead]: Cached user snapshot or None
+        """
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        principal, cached_at = entry
+        if time.monotonic() - cached_at > self.ttl:
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return principal
+    
+    def put(self, principal: UserRead) -> None:
+        """
+        Store a principal, evicting the least recently used one if full.
+        
+        Args:
+            principal: User snapshot
+        """
+        self._entries[principal.id] = (principal, time.monotonic())
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, user_id: UUID) -> None:
+        """
+        Drop the cached principal of a user.
+        
+        Args:
+            user_id: User UUID
+        """
+        if self._entries.pop(user_id, None) is not None:
+            logger.debug(f"Invalidated principal for user {user_id}")
+    
+    def clear(self) -> None:
+        """Drop all cached principals and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """Cache size and hit/miss counters."""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL
+)
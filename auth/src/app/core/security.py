@@ -1,20 +1,32 @@
 """Security utilities for authentication and authorization."""
 
+import asyncio
 import hashlib
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import bcrypt
 import jwt
 
 from auth.src.app.core.config import settings
+from auth.src.app.exceptions import PasswordHashingOverloadedError
 
 logger = logging.getLogger(__name__)
 
 # JWT settings
 ALGORITHM = "HS256"
 
+# Password hashing pool (created lazily, see _run_hashing)
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_inflight = 0
+
+# Separate pool for bulk hashing (user import)
+_import_hash_executor: Optional[ThreadPoolExecutor] = None
+
 
 def create_access_token(
     subject: str,
@@ -207,9 +219,142 @@ def get_password_hash(password: str) -> str:
     try:
         prepared_password = _prepare_password(password)
         # Generate salt and hash password
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
         hashed = bcrypt.hashpw(prepared_password, salt)
         return hashed.decode('utf-8')
     except Exception as e:
         logger.error(f"Password hashing error: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    """Return the thread pool used for bcrypt calls."""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="bcrypt"
+        )
+    return _hash_executor
+
+
+async def _run_hashing(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a bcrypt call in the hashing pool instead of the event loop.
+    
+    At most PASSWORD_HASH_WORKERS hashes run at once and up to
+    PASSWORD_HASH_MAX_QUEUE more may wait for a worker; beyond that the
+    request fails immediately instead of queueing behind a login burst.
+    
+    Raises:
+        PasswordHashingOverloadedError: If the hashing queue is full
+    """
+    global _hash_inflight
+    if _hash_inflight >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE:
+        logger.warning(f"Password hashing queue is full ({_hash_inflight} in flight), rejecting request")
+        raise PasswordHashingOverloadedError()
+    
+    _hash_inflight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        _hash_inflight -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against a bcrypt hash without blocking the event loop.
+    
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Bcrypt hash to verify against
+        
+    Returns:
+        bool: True if password matches, False otherwise
+    """
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password using bcrypt without blocking the event loop.
+    
+    Args:
+        password: Plain text password to hash
+        
+    Returns:
+        str: Bcrypt hash of the password
+    """
+    return await _run_hashing(get_password_hash, password)
+
+
+def _get_import_hash_executor() -> ThreadPoolExecutor:
+    """Return the thread pool used for bulk bcrypt calls."""
+    global _import_hash_executor
+    if _import_hash_executor is None:
+        _import_hash_executor = ThreadPoolExecutor(
+            max_workers=settings.USER_IMPORT_HASH_WORKERS,
+            thread_name_prefix="bcrypt-import"
+        )
+    return _import_hash_executor
+
+
+async def hash_passwords_async(passwords: List[str]) -> List[str]:
+    """
+    Hash a batch of passwords using bcrypt without blocking the event loop.
+    
+    Runs in its own pool of USER_IMPORT_HASH_WORKERS threads and bypasses
+    the PASSWORD_HASH_MAX_QUEUE limit, so a bulk import neither occupies
+    the workers that serve logins nor makes them fail with 503.
+    
+    Args:
+        passwords: Plain text passwords to hash
+        
+    Returns:
+        List[str]: Bcrypt hashes in the same order
+    """
+    loop = asyncio.get_running_loop()
+    executor = _get_import_hash_executor()
+    return list(await asyncio.gather(*(
+        loop.run_in_executor(executor, get_password_hash, password)
+        for password in passwords
+    )))
+
+
+def calibrate_password_hashing(samples: int = 3) -> float:
+    """
+    Measure bcrypt throughput for the configured cost and log it.
+    
+    Args:
+        samples: Number of hashes to time
+        
+    Returns:
+        float: Hashes per second for a single worker
+    """
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    started = time.perf_counter()
+    for _ in range(samples):
+        bcrypt.hashpw(b"calibration-password", salt)
+    elapsed = time.perf_counter() - started
+    
+    per_worker = samples / elapsed
+    parallel = min(settings.PASSWORD_HASH_WORKERS, os.cpu_count() or 1)
+    logger.info(
+        f"bcrypt cost {settings.BCRYPT_ROUNDS}: {elapsed / samples * 1000:.0f} ms per hash, "
+        f"~{per_worker:.1f} hashes/sec per worker, "
+        f"~{per_worker * parallel:.1f} hashes/sec with {settings.PASSWORD_HASH_WORKERS} workers "
+        f"on {os.cpu_count()} CPUs"
+    )
+    return per_worker
+
+
+def shutdown_password_hashing() -> None:
+    """Shut down the hashing pools (application shutdown)."""
+    global _hash_executor, _import_hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+    if _import_hash_executor is not None:
+        _import_hash_executor.shutdown(wait=False, cancel_futures=True)
+        _import_hash_executor = None
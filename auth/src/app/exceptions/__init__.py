@@ -45,6 +45,27 @@ class InvalidCredentialsError(HTTPException):
         )
 
 
+class InvalidCursorError(HTTPException):
+    """Exception raised when a pagination cursor cannot be decoded."""
+    
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+class PasswordHashingOverloadedError(HTTPException):
+    """Exception raised when the password hashing queue is full."""
+    
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry",
+            headers={"Retry-After": "1"}
+        )
+
+
 # Exception Handlers
 async def validation_error_handler(
     request: Request,
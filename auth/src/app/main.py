@@ -1,5 +1,6 @@
 """Main FastAPI application for authentication service."""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import Request
@@ -14,6 +15,10 @@ from starlette.middleware.gzip import GZipMiddleware
 
 from auth.src.app.api import api_router
 from auth.src.app.core.config import settings
+from auth.src.app.core.principal_cache import principal_cache
+from auth.src.app.core.security import calibrate_password_hashing, shutdown_password_hashing
+from auth.src.app.db.database import engine
+from auth.src.app.repositories.base import SUPPORTED_DIALECTS
 from auth.src.app.exceptions import (
     validation_error_handler,
     integrity_error_handler,
@@ -40,8 +45,26 @@ logging.getLogger('uvicorn.access').setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown."""
+    if engine.dialect.name not in SUPPORTED_DIALECTS:
+        raise RuntimeError(
+            f"Unsupported database dialect {engine.dialect.name}; "
+            f"DATABASE_URL must use one of: {', '.join(SUPPORTED_DIALECTS)}"
+        )
+    if settings.PASSWORD_HASH_CALIBRATE_ON_STARTUP:
+        try:
+            await asyncio.to_thread(calibrate_password_hashing)
+        except Exception as e:
+            logger.warning(f"Password hashing calibration failed: {e}")
+    yield
+    shutdown_password_hashing()
+
+
 # Create FastAPI application
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.APP_NAME,
     description="Authentication API",
     version="1.0.0",
@@ -59,6 +82,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Custom Middlewares
@@ -93,7 +117,8 @@ async def health_check():
     return {
         "status": "healthy",
         "app": settings.APP_NAME,
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "principal_cache": principal_cache.stats()
     }
 
 
@@ -0,0 +1,33 @@
+"""Course enrollment models."""
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, ForeignKey, Index, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from auth.src.app.db.database import Base
+
+
+class UserCourseEnrollment(Base):
+    """Enrollment of a user in a course.
+    
+    The primary key serves the user -> courses lookups, the
+    (course_id, user_id) index serves the course -> members listing.
+    """
+    
+    __tablename__ = "user_course_enrollment"
+    __table_args__ = (
+        Index("ix_user_course_enrollment_course_id_user_id", "course_id", "user_id"),
+    )
+    
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    course_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
@@ -1,15 +1,18 @@
 """User models for the authentication system."""
-import json
 from datetime import datetime
 from typing import Optional, List
 from fastapi_users.db import SQLAlchemyBaseUserTableUUID
-from sqlalchemy import DateTime, func, Text, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, Index, func, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from auth.src.app.db.database import Base
+from auth.src.app.models.enrollment import UserCourseEnrollment
 
 class User(SQLAlchemyBaseUserTableUUID, Base):
     """User model with UUID primary key."""
     __tablename__ = "user"
+    __table_args__ = (
+        Index("ix_user_created_at_id", "created_at", "id"),
+    )
     
     # New fields
     first_name: Mapped[Optional[str]] = mapped_column(
@@ -26,11 +29,11 @@ class User(SQLAlchemyBaseUserTableUUID, Base):
         unique=True
     )
     
-    # Additional fields - stored as JSON text for SQLite compatibility
-    _enrolled_courses: Mapped[Optional[str]] = mapped_column(
-        "enrolled_courses",
-        Text,
-        nullable=True
+    # Loaded together with the user so that UserRead can be built without lazy loads
+    enrollments: Mapped[List[UserCourseEnrollment]] = relationship(
+        lazy="selectin",
+        cascade="all, delete-orphan",
+        order_by=(UserCourseEnrollment.created_at, UserCourseEnrollment.course_id)
     )
     
     created_at: Mapped[datetime] = mapped_column(
@@ -47,18 +50,5 @@ class User(SQLAlchemyBaseUserTableUUID, Base):
     
     @property
     def enrolled_courses(self) -> List[str]:
-        """Get enrolled courses as list."""
-        if not self._enrolled_courses:
-            return []
-        try:
-            return json.loads(self._enrolled_courses)
-        except json.JSONDecodeError:
-            return []
-    
-    @enrolled_courses.setter
-    def enrolled_courses(self, value: Optional[List[str]]):
-        """Set enrolled courses from list."""
-        if value is None or value == []:
-            self._enrolled_courses = None
-        else:
-            self._enrolled_courses = json.dumps(value)
\ No newline at end of file
+        """Get enrolled course IDs as list."""
+        return [enrollment.course_id for enrollment in self.enrollments]
@@ -2,5 +2,6 @@
 
 from auth.src.app.repositories.user import UserRepository
 from auth.src.app.repositories.session import SessionRepository
+from auth.src.app.repositories.enrollment import EnrollmentRepository
 
-__all__ = ["UserRepository", "SessionRepository"]
\ No newline at end of file
+__all__ = ["UserRepository", "SessionRepository", "EnrollmentRepository"]
\ No newline at end of file
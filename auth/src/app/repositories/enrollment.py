@@ -0,0 +1,132 @@
+"""Enrollment repository."""
+import logging
+from typing import List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import String, delete, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from auth.src.app.models.enrollment import UserCourseEnrollment
+from auth.src.app.models.user import User
+from auth.src.app.repositories.base import dialect_insert, keyset_paginate
+
+logger = logging.getLogger(__name__)
+
+class EnrollmentRepository:
+    """Repository for UserCourseEnrollment model."""
+    
+    def __init__(self, session: AsyncSession):
+        """
+        Initialize enrollment repository.
+        
+        Args:
+            session: Async database session
+        """
+        self.session = session
+    
+    async def get_course_ids(self, user_id: UUID) -> List[str]:
+        """
+        Get IDs of the courses a user is enrolled in.
+        
+        Args:
+            user_id: User UUID
+        
+        Returns:
+            List[str]: Course IDs in enrollment order
+        """
+        result = await self.session.execute(
+            select(UserCourseEnrollment.course_id)
+            .where(UserCourseEnrollment.user_id == user_id)
+            .order_by(UserCourseEnrollment.created_at, UserCourseEnrollment.course_id)
+        )
+        return list(result.scalars().all())
+    
+    async def enroll(self, course_id: str, user_ids: Sequence[UUID]) -> List[UUID]:
+        """
+        Enroll users in a course with a single INSERT ... SELECT.
+        
+        Unknown user IDs and users that are already enrolled are skipped.
+        
+        Args:
+            course_id: Course ID
+            user_ids: IDs of the users to enroll
+        
+        Returns:
+            List[UUID]: IDs of the users that were enrolled by this call
+        """
+        if not user_ids:
+            return []
+        
+        stmt = (
+            dialect_insert(self.session, UserCourseEnrollment)
+            .from_select(
+                ["user_id", "course_id"],
+                select(User.id, literal(course_id, String)).where(User.id.in_(set(user_ids)))
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+            .returning(UserCourseEnrollment.user_id)
+        )
+        result = await self.session.execute(stmt)
+        enrolled = list(result.scalars().all())
+        await self.session.commit()
+        
+        logger.info(f"Enrolled {len(enrolled)} of {len(user_ids)} users in course {course_id}")
+        
+        return enrolled
+    
+    async def unenroll(self, course_id: str, user_ids: Sequence[UUID]) -> List[UUID]:
+        """
+        Unenroll users from a course with a single DELETE.
+        
+        Args:
+            course_id: Course ID
+            user_ids: IDs of the users to unenroll
+        
+        Returns:
+            List[UUID]: IDs of the users that were unenrolled by this call
+        """
+        if not user_ids:
+            return []
+        
+        stmt = (
+            delete(UserCourseEnrollment)
+            .where(
+                UserCourseEnrollment.course_id == course_id,
+                UserCourseEnrollment.user_id.in_(set(user_ids))
+            )
+            .returning(UserCourseEnrollment.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        unenrolled = list(result.scalars().all())
+        await self.session.commit()
+        
+        logger.info(f"Unenrolled {len(unenrolled)} of {len(user_ids)} users from course {course_id}")
+        
+        return unenrolled
+    
+    async def list_members(
+        self,
+        course_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[UserCourseEnrollment], Optional[str]]:
+        """
+        Get a page of the enrollments of a course ordered by user ID.
+        
+        Seeks through the (course_id, user_id) index.
+        
+        Args:
+            course_id: Course ID
+            cursor: Cursor returned with the previous page
+            limit: Maximum number of records to return
+        
+        Returns:
+            Tuple[List[UserCourseEnrollment], Optional[str]]: Enrollments and next page cursor
+        """
+        return await keyset_paginate(
+            self.session,
+            select(UserCourseEnrollment).where(UserCourseEnrollment.course_id == course_id),
+            [UserCourseEnrollment.user_id],
+            cursor=cursor,
+            limit=limit,
+            descending=False
+        )
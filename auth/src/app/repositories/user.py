@@ -1,8 +1,8 @@
 """User repository."""
 import logging
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Set
 from uuid import UUID
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from auth.src.app.models.user import User
 from auth.src.app.repositories.base import BaseRepository
@@ -77,4 +77,62 @@ class UserRepository(BaseRepository[User]):
             bool: True if email exists
         """
         user = await self.get_by_email(email)
-        return user is not None
\ No newline at end of file
+        return user is not None
+    
+    async def get_existing_emails(self, emails: List[str]) -> Set[str]:
+        """
+        Get which of the given emails are already registered.
+        
+        Args:
+            emails: Emails to check
+            
+        Returns:
+            Set[str]: Registered emails
+        """
+        if not emails:
+            return set()
+        result = await self.session.execute(
+            select(User.email).where(User.email.in_(set(emails)))
+        )
+        return set(result.scalars().all())
+    
+    async def get_existing_phone_numbers(self, phone_numbers: List[str]) -> Set[str]:
+        """
+        Get which of the given phone numbers are already registered.
+        
+        Args:
+            phone_numbers: Phone numbers to check
+            
+        Returns:
+            Set[str]: Registered phone numbers
+        """
+        if not phone_numbers:
+            return set()
+        result = await self.session.execute(
+            select(User.phone_number).where(User.phone_number.in_(set(phone_numbers)))
+        )
+        return set(result.scalars().all())
+    
+    async def bulk_create(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert many users with a single executemany INSERT.
+        
+        Rows must include the id. Either all rows are inserted or, on a
+        constraint violation, none are and the transaction is rolled back.
+        
+        Args:
+            rows: User attributes, one dict per user
+            
+        Raises:
+            IntegrityError: If a row violates a unique constraint
+        """
+        if not rows:
+            return
+        try:
+            await self.session.execute(insert(User), rows)
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        
+        logger.info(f"Bulk created {len(rows)} users")
@@ -5,6 +5,9 @@ from auth.src.app.schemas.user import (
     UserRead,
     UserUpdate,
     GrantAdminRequest,
+    UserImportRow,
+    UserImportRowResult,
+    UserImportResponse,
 )
 from auth.src.app. schemas.token import (
     TokenOut,
@@ -17,6 +20,9 @@ from auth.src.app.schemas.enrollment import (
     EnrollmentResponse,
     CourseEnrollmentStatus,
     MyCoursesResponse,
+    BulkEnrollmentRequest,
+    BulkEnrollmentResponse,
+    CourseMember,
 )
 
 __all__ = [
@@ -29,7 +35,13 @@ __all__ = [
     "PasswordChangeRequest",
     "PasswordResetRequest",
     "GrantAdminRequest",
+    "UserImportRow",
+    "UserImportRowResult",
+    "UserImportResponse",
     "EnrollmentResponse",
     "CourseEnrollmentStatus",
     "MyCoursesResponse",
+    "BulkEnrollmentRequest",
+    "BulkEnrollmentResponse",
+    "CourseMember",
 ]
\ No newline at end of file
@@ -1,8 +1,12 @@
 """Enrollment schemas for course registration."""
 
+from datetime import datetime
 from typing import List, Optional
+from uuid import UUID
 from pydantic import BaseModel, Field
 
+from auth.src.app.core.config import settings
+
 
 class EnrollmentResponse(BaseModel):
     """Response schema for enrollment operations."""
@@ -45,3 +49,53 @@ class MyCoursesResponse(BaseModel):
                 "enrolled_courses": ["1", "2", "3"]
             }
         }
+
+
+class BulkEnrollmentRequest(BaseModel):
+    """Request schema for bulk enrollment operations."""
+    
+    user_ids: List[UUID] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BULK_ENROLLMENT_MAX_USERS,
+        description="IDs of the users to enroll or unenroll"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "user_ids": ["3fa85f64-5717-4562-b3fc-2c963f66afa6"]
+            }
+        }
+
+
+class BulkEnrollmentResponse(BaseModel):
+    """Response schema for bulk enrollment operations."""
+    
+    message: str = Field(..., description="Operation result message")
+    course_id: str = Field(..., description="Course ID")
+    requested: int = Field(..., description="Number of distinct user IDs in the request")
+    changed_user_ids: List[UUID] = Field(
+        default_factory=list,
+        description="Users that were actually enrolled or unenrolled; the rest were unknown or unchanged"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "message": "Enrolled 1 of 2 users",
+                "course_id": "1",
+                "requested": 2,
+                "changed_user_ids": ["3fa85f64-5717-4562-b3fc-2c963f66afa6"]
+            }
+        }
+
+
+class CourseMember(BaseModel):
+    """Schema for a member of a course."""
+    
+    user_id: UUID = Field(..., description="User ID")
+    enrolled_at: datetime = Field(..., validation_alias="created_at", description="Enrollment time")
+    
+    class Config:
+        from_attributes = True
@@ -1,6 +1,6 @@
 """User schemas."""
 from datetime import datetime
-from typing import Optional, List
+from typing import Literal, Optional, List
 from uuid import UUID
 from pydantic import BaseModel, EmailStr, Field, field_validator
 import re
@@ -15,23 +15,13 @@ class UserBase(BaseModel):
     is_superuser: bool = False
     is_verified: bool = False
 
-class UserCreate(BaseModel):
-    """Schema for creating a user."""
+class UserRegistrationFields(BaseModel):
+    """Profile fields required to create a user, shared by registration and CSV import."""
     email: EmailStr
-    password: str = Field(..., min_length=8, max_length=100)
-    confirm_password: str = Field(..., min_length=8, max_length=100)
     first_name: str = Field(..., min_length=1, max_length=100)
     last_name: str = Field(..., min_length=1, max_length=100)
     phone_number: str = Field(..., min_length=10, max_length=20)
     
-    @field_validator('confirm_password')
-    @classmethod
-    def passwords_match(cls, v, info):
-        """Validate that passwords match."""
-        if 'password' in info.data and v != info.data['password']:
-            raise ValueError('Passwords do not match')
-        return v
-    
     @field_validator('phone_number')
     @classmethod
     def validate_phone_number(cls, v):
@@ -52,6 +42,19 @@ class UserCreate(BaseModel):
             raise ValueError('Name cannot be empty or only whitespace')
         return v.strip() if v else v
 
+class UserCreate(UserRegistrationFields):
+    """Schema for creating a user."""
+    password: str = Field(..., min_length=8, max_length=100)
+    confirm_password: str = Field(..., min_length=8, max_length=100)
+    
+    @field_validator('confirm_password')
+    @classmethod
+    def passwords_match(cls, v, info):
+        """Validate that passwords match."""
+        if 'password' in info.data and v != info.data['password']:
+            raise ValueError('Passwords do not match')
+        return v
+
 class UserUpdate(BaseModel):
     """Schema for updating a user."""
     email: Optional[EmailStr] = None
@@ -104,4 +107,27 @@ class UserInDB(UserBase):
 
 class GrantAdminRequest(BaseModel):
     """Schema for granting admin role."""
-    user_id: UUID
\ No newline at end of file
+    user_id: UUID
+
+class UserImportRow(UserRegistrationFields):
+    """Schema for a row of a user import CSV."""
+    password: Optional[str] = Field(None, min_length=8, max_length=100)
+
+class UserImportRowResult(BaseModel):
+    """Schema for the outcome of one imported CSV row."""
+    row: int
+    status: Literal["created", "error"]
+    email: Optional[str] = None
+    user_id: Optional[UUID] = None
+    initial_password: Optional[str] = None
+    error: Optional[str] = None
+
+class UserImportResponse(BaseModel):
+    """Schema for the result of a user import."""
+    total_rows: int
+    created: int
+    failed: int
+    enrolled: int = 0
+    course_id: Optional[str] = None
+    truncated: bool = False
+    rows: List[UserImportRowResult] = []
@@ -0,0 +1,7 @@
+-- Indexes for keyset pagination of the core /bot/* list endpoints
+
+-- /bot/streaks/all: ORDER BY current_streak DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_user_streaks_current_streak_id ON user_streaks(current_streak, id);
+
+-- /bot/homework/user/{user_id}: ORDER BY date DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_user_homework_user_date_id ON user_homework(user_id, date, id);
@@ -85,6 +85,8 @@ class APIService:
             
             logger.info(f"Uploading {filename} ({len(file_data)} bytes) as {mime_type}")
             
+            # Proxied through Core API rather than a presigned upload:
+            # only this path hashes the content and deduplicates it
             files = {'file': (filename, file_data, mime_type)}
             data = {'user_id': user_id}
             
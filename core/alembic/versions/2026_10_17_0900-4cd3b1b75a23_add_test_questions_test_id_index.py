@@ -0,0 +1,33 @@
+"""Add index on test_questions.test_id
+
+Revision ID: 4cd3b1b75a23
+Revises: adc433a87627
+Create Date: 2026-10-17 09:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4cd3b1b75a23'
+down_revision: Union[str, Sequence[str], None] = 'adc433a87627'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Index questions by test for counts and sampling"""
+    op.create_index(
+        op.f('ix_test_questions_test_id'),
+        'test_questions',
+        ['test_id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - Remove test_questions.test_id index"""
+    op.drop_index(op.f('ix_test_questions_test_id'), table_name='test_questions')
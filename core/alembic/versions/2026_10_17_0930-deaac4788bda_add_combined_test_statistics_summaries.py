@@ -0,0 +1,99 @@
+"""Add combined test statistics summaries
+
+Revision ID: deaac4788bda
+Revises: 4cd3b1b75a23
+Create Date: 2026-10-17 09:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'deaac4788bda'
+down_revision: Union[str, Sequence[str], None] = '4cd3b1b75a23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Add and backfill per-user statistics summaries"""
+    # ---------- combined_test_user_statistics ----------
+    op.create_table(
+        'combined_test_user_statistics',
+        sa.Column('user_id', sa.String(36), primary_key=True),
+        sa.Column('total_attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_questions', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_score', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('best_score', sa.Integer(), nullable=True),
+        sa.Column('worst_score', sa.Integer(), nullable=True),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=True,
+        ),
+    )
+
+    # ---------- combined_test_user_topic_statistics ----------
+    op.create_table(
+        'combined_test_user_topic_statistics',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.String(36), nullable=False),
+        sa.Column('test_id', sa.BigInteger(), nullable=False),
+        sa.Column('total_answered', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('correct_answers', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(
+            ['test_id'],
+            ['tests.id'],
+            ondelete='CASCADE',
+        ),
+        sa.UniqueConstraint(
+            'user_id',
+            'test_id',
+            name='uq_combined_test_user_topic_statistics_user_test',
+        ),
+    )
+
+    op.create_index(
+        op.f('ix_combined_test_user_topic_statistics_user_id'),
+        'combined_test_user_topic_statistics',
+        ['user_id'],
+    )
+
+    # Backfill from existing completed attempts
+    op.execute(
+        """
+        INSERT INTO combined_test_user_statistics
+            (user_id, total_attempts, total_questions, total_score, best_score, worst_score)
+        SELECT user_id, COUNT(id), SUM(total_questions), SUM(score), MAX(score), MIN(score)
+        FROM combined_test_attempts
+        WHERE completed_at IS NOT NULL
+        GROUP BY user_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO combined_test_user_topic_statistics
+            (user_id, test_id, total_answered, correct_answers)
+        SELECT a.user_id, q.test_id, COUNT(ans.id),
+               SUM(CASE WHEN ans.is_correct THEN 1 ELSE 0 END)
+        FROM combined_test_answers ans
+        JOIN combined_test_attempts a ON a.id = ans.attempt_id
+        JOIN test_questions q ON q.id = ans.question_id
+        WHERE a.completed_at IS NOT NULL
+        GROUP BY a.user_id, q.test_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - Remove statistics summaries"""
+    op.drop_index(
+        op.f('ix_combined_test_user_topic_statistics_user_id'),
+        table_name='combined_test_user_topic_statistics',
+    )
+    op.drop_table('combined_test_user_topic_statistics')
+    op.drop_table('combined_test_user_statistics')
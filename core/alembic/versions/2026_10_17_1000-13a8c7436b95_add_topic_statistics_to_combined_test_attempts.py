@@ -0,0 +1,32 @@
+"""Add topic_statistics to combined_test_attempts
+
+Revision ID: 13a8c7436b95
+Revises: deaac4788bda
+Create Date: 2026-10-17 10:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '13a8c7436b95'
+down_revision: Union[str, Sequence[str], None] = 'deaac4788bda'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Add persisted per-attempt topic breakdown"""
+    # Existing attempts are filled in batches by
+    # python -m core.src.app.commands.backfill_attempt_topics
+    op.add_column('combined_test_attempts',
+        sa.Column('topic_statistics', sa.Text(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - Remove topic_statistics column"""
+    op.drop_column('combined_test_attempts', 'topic_statistics')
@@ -0,0 +1,38 @@
+"""Add keyset pagination indexes
+
+Revision ID: 56f6ae6742db
+Revises: 13a8c7436b95
+Create Date: 2026-10-17 11:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '56f6ae6742db'
+down_revision: Union[str, Sequence[str], None] = '13a8c7436b95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Add (filter, sort key, id) indexes used by cursor pagination"""
+    op.create_index('ix_test_attempts_user_started_id', 'test_attempts',
+                    ['user_id', 'started_at', 'id'], unique=False)
+    op.create_index('ix_combined_test_attempts_user_started_id', 'combined_test_attempts',
+                    ['user_id', 'started_at', 'id'], unique=False)
+    op.create_index('ix_course_media_created_id', 'course_media',
+                    ['created_at', 'id'], unique=False)
+    op.create_index('ix_course_media_user_created_id', 'course_media',
+                    ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema - Remove cursor pagination indexes"""
+    op.drop_index('ix_course_media_user_created_id', table_name='course_media')
+    op.drop_index('ix_course_media_created_id', table_name='course_media')
+    op.drop_index('ix_combined_test_attempts_user_started_id', table_name='combined_test_attempts')
+    op.drop_index('ix_test_attempts_user_started_id', table_name='test_attempts')
@@ -0,0 +1,62 @@
+"""Add media upload sessions
+
+Revision ID: 8b41f2c6d0a3
+Revises: 56f6ae6742db
+Create Date: 2026-10-17 12:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b41f2c6d0a3'
+down_revision: Union[str, Sequence[str], None] = '56f6ae6742db'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Add persisted state for resumable multipart uploads"""
+    op.create_table(
+        'media_upload_sessions',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('s3_key', sa.String(), nullable=False),
+        sa.Column('upload_id', sa.String(), nullable=False),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('custom_name', sa.String(), nullable=True),
+        sa.Column('content_type', sa.String(), nullable=False),
+        sa.Column('media_type', sa.String(), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('part_size', sa.Integer(), nullable=False),
+        sa.Column('course_id', sa.Integer(), nullable=True),
+        sa.Column('lesson_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('media_id', sa.String(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('s3_key'),
+    )
+    op.create_table(
+        'media_upload_parts',
+        sa.Column('session_id', sa.String(), nullable=False),
+        sa.Column('part_number', sa.Integer(), nullable=False),
+        sa.Column('etag', sa.String(), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['media_upload_sessions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('session_id', 'part_number'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - Remove resumable upload tables"""
+    op.drop_table('media_upload_parts')
+    op.drop_table('media_upload_sessions')
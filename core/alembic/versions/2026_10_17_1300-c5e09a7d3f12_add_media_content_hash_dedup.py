@@ -0,0 +1,52 @@
+"""Add media content hash deduplication
+
+Revision ID: c5e09a7d3f12
+Revises: 8b41f2c6d0a3
+Create Date: 2026-10-17 13:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e09a7d3f12'
+down_revision: Union[str, Sequence[str], None] = '8b41f2c6d0a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Share S3 objects between identical uploads"""
+    op.create_table(
+        'media_objects',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('s3_key', sa.String(), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('content_hash'),
+        sa.UniqueConstraint('s3_key'),
+    )
+
+    op.add_column('course_media', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_course_media_content_hash', 'course_media', ['content_hash'], unique=False)
+
+    # Несколько записей могут ссылаться на один объект
+    op.drop_index('ix_course_media_s3_key', table_name='course_media')
+    op.create_index('ix_course_media_s3_key', 'course_media', ['s3_key'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema - Remove content hash deduplication"""
+    op.drop_index('ix_course_media_s3_key', table_name='course_media')
+    op.create_index('ix_course_media_s3_key', 'course_media', ['s3_key'], unique=True)
+
+    op.drop_index('ix_course_media_content_hash', table_name='course_media')
+    op.drop_column('course_media', 'content_hash')
+
+    op.drop_table('media_objects')
@@ -0,0 +1,32 @@
+"""Add unique index on s3_key of unhashed media
+
+Revision ID: e7a2b9c4d815
+Revises: c5e09a7d3f12
+Create Date: 2026-10-17 14:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a2b9c4d815'
+down_revision: Union[str, Sequence[str], None] = 'c5e09a7d3f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Keep s3_key unique for media without content hash"""
+    op.create_index(
+        'ux_course_media_s3_key_unhashed', 'course_media', ['s3_key'], unique=True,
+        postgresql_where=sa.text('content_hash IS NULL'),
+        sqlite_where=sa.text('content_hash IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - Drop unique index on unhashed media keys"""
+    op.drop_index('ux_course_media_s3_key_unhashed', table_name='course_media')
@@ -10,6 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.src.app.db.database import get_async_session
 from core.src.app.core.config import settings
+from core.src.app.services.auth_client import AuthServiceUnavailableError, fetch_current_user
+from core.src.app.services.token_cache import admin_token_cache, token_cache
 
 logger = logging.getLogger(__name__)
 
@@ -44,9 +46,13 @@ async def get_bot_db_session() -> AsyncGenerator[AsyncSession, None]:
 async def get_current_user_id(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> str:
-    """Get current authenticated user ID from JWT token."""
+    """Get current authenticated user ID from JWT token (verified tokens are cached until exp)."""
     token = credentials.credentials
     
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
+    
     try:
         payload = jwt.decode(
             token,
@@ -62,6 +68,8 @@ async def get_current_user_id(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        exp = payload.get("exp")
+        token_cache.put(token, str(user_id_str), float(exp) if isinstance(exp, (int, float)) else None)
         return str(user_id_str)  # Возвращаем UUID как строку
         
     except JWTError as e:
@@ -70,4 +78,37 @@ async def get_current_user_id(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
-        )
\ No newline at end of file
+        )
+
+
+async def get_current_admin_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user_id: str = Depends(get_current_user_id),
+) -> str:
+    """
+    Get current user ID, requiring the user to be an active superuser.
+    
+    The JWT carries no roles, so the auth service is asked once per token;
+    confirmed superuser tokens are cached for ADMIN_CHECK_CACHE_TTL seconds.
+    """
+    token = credentials.credentials
+    if admin_token_cache.get(token) == user_id:
+        return user_id
+    
+    try:
+        user = await fetch_current_user(token)
+    except AuthServiceUnavailableError as e:
+        logger.error(f"Superuser check failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authorization service unavailable",
+        )
+    
+    if not user or not user.get("is_superuser") or str(user.get("id")) != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    
+    admin_token_cache.put(token, user_id)
+    return user_id
@@ -1,6 +1,6 @@
 """API endpoints for accessing Bot database data."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select, func, and_, or_, desc, Integer, cast
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
@@ -23,7 +23,11 @@ if str(project_root) not in sys.path:
 from bot.src.models.homework_model import UserHomework, UserStreak, UserGuarantee
 from bot.src.models.reminder_types_model import ReminderType, ReminderMessagePool
 
-from core.src.app.api.deps import get_db_session
+from core.src.app.api.deps import get_current_admin_user_id, get_db_session
+from core.src.app.core.config import settings
+from core.src.app.db.bot_db import bot_async_session_maker
+from core.src.app.repositories.base import keyset_paginate
+from core.src.app.services.export_service import ExportFormat, export_response
 from core.src.app.schemas.bot_data import (
     UserHomeworkResponse,
     UserStreakResponse,
@@ -41,8 +45,10 @@ router = APIRouter()
 @router.get("/homework/user/{user_id}", response_model=List[UserHomeworkResponse])
 async def get_user_homework(
     user_id: str,
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, le=1000),
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     completed_only: Optional[bool] = None,
@@ -59,10 +65,11 @@ async def get_user_homework(
     if completed_only is not None:
         query = query.where(UserHomework.is_complete == completed_only)
     
-    query = query.order_by(desc(UserHomework.date)).offset(skip).limit(limit)
-    
-    result = await db.execute(query)
-    homework_list = result.scalars().all()
+    homework_list, next_cursor = await keyset_paginate(
+        db, query, [UserHomework.date, UserHomework.id], cursor=cursor, limit=limit, skip=skip
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     return [UserHomeworkResponse.model_validate(hw) for hw in homework_list]
 
@@ -70,17 +77,46 @@ async def get_user_homework(
 @router.get("/homework/date/{homework_date}", response_model=List[UserHomeworkResponse])
 async def get_homework_by_date(
     homework_date: date,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_bot_db_session),
 ):
-    """Get all homework submissions for a specific date."""
+    """Get homework submissions for a specific date, paginated by X-Next-Cursor."""
     
     query = select(UserHomework).where(UserHomework.date == homework_date)
-    result = await db.execute(query)
-    homework_list = result.scalars().all()
+    homework_list, next_cursor = await keyset_paginate(
+        db, query, [UserHomework.id], cursor=cursor, limit=limit, descending=False
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     return [UserHomeworkResponse.model_validate(hw) for hw in homework_list]
 
 
+@router.get("/homework/export", dependencies=[Depends(get_current_admin_user_id)])
+async def export_homework(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    user_id: Optional[str] = None,
+    completed_only: Optional[bool] = None,
+):
+    """Stream homework submissions as NDJSON or CSV through a server-side cursor (superusers only)."""
+    query = select(*UserHomework.__table__.columns).order_by(UserHomework.date, UserHomework.id)
+    
+    if start_date:
+        query = query.where(UserHomework.date >= start_date)
+    if end_date:
+        query = query.where(UserHomework.date <= end_date)
+    if user_id:
+        query = query.where(UserHomework.user_id == user_id)
+    if completed_only is not None:
+        query = query.where(UserHomework.is_complete == completed_only)
+    
+    return export_response(bot_async_session_maker, query, export_format, "homework")
+
+
 @router.get("/homework/statistics", response_model=HomeworkStatistics)
 async def get_homework_statistics(
     start_date: Optional[date] = None,
@@ -163,20 +199,24 @@ async def get_streak_leaderboard(
 
 @router.get("/streaks/all", response_model=List[UserStreakResponse])
 async def get_all_streaks(
+    response: Response,
     min_streak: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_bot_db_session),
 ):
-    """Get all user streaks with optional minimum filter."""
+    """Get user streaks with optional minimum filter, paginated by X-Next-Cursor."""
     
     query = select(UserStreak)
     
     if min_streak > 0:
         query = query.where(UserStreak.current_streak >= min_streak)
     
-    query = query.order_by(desc(UserStreak.current_streak))
-    
-    result = await db.execute(query)
-    streaks = result.scalars().all()
+    streaks, next_cursor = await keyset_paginate(
+        db, query, [UserStreak.current_streak, UserStreak.id], cursor=cursor, limit=limit
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     return [UserStreakResponse.model_validate(s) for s in streaks]
 
@@ -203,13 +243,19 @@ async def get_user_guarantee(
 @router.get("/guarantee/status/{has_guarantee}", response_model=List[UserGuaranteeResponse])
 async def get_guarantees_by_status(
     has_guarantee: bool,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_bot_db_session),
 ):
-    """Get all users with specific guarantee status."""
+    """Get users with specific guarantee status, paginated by X-Next-Cursor."""
     
     query = select(UserGuarantee).where(UserGuarantee.has_guarantee == has_guarantee)
-    result = await db.execute(query)
-    guarantees = result.scalars().all()
+    guarantees, next_cursor = await keyset_paginate(
+        db, query, [UserGuarantee.id], cursor=cursor, limit=limit, descending=False
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     return [UserGuaranteeResponse.model_validate(g) for g in guarantees]
 
@@ -2,14 +2,15 @@
 
 import json
 import random
-from datetime import datetime, timezone
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date, datetime, timezone
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from core.src.app.db.database import get_async_session
-from core.src.app.api.deps import get_current_user_id
+from core.src.app.core.config import settings
+from core.src.app.db.database import async_session_maker, get_async_session
+from core.src.app.api.deps import get_current_admin_user_id, get_current_user_id
 from core.src.app.models.course import TestType
 from core.src.app.schemas.combined_test import (
     CombinedTestGenerateRequest,
@@ -33,8 +34,12 @@ from core.src.app.repositories.combined_test import (
     CombinedTestQuestionRepository,
     CombinedTestAttemptRepository,
     CombinedTestAnswerRepository,
+    CombinedTestStatisticsRepository,
 )
 from core.src.app.schemas.media_schema import CourseMediaResponse
+from core.src.app.services.answer_key_cache import answer_key_cache
+from core.src.app.services.export_service import ExportFormat, date_bounds, export_response
+from core.src.app.services.response_snapshot_cache import response_snapshot_cache
 from core.src.app.repositories.course import (
     TestRepository,
     TestQuestionRepository,
@@ -63,10 +68,10 @@ async def get_available_tests_for_combining(
             "id": test.id,
             "title": test.title,
             "description": test.description,
-            "total_questions": len(test.questions) if hasattr(test, 'questions') else 0,
+            "total_questions": question_count,
             "test_type": test.test_type.value
         }
-        for test in tests
+        for test, question_count in tests
     ]
 
 
@@ -80,9 +85,11 @@ async def generate_combined_test(
     
     # Verify all source tests exist and are FOR_COMBINED type
     test_repo = TestRepository(session)
+    test_rows = await test_repo.get_question_counts(request.source_test_ids)
+    tests_by_id = {row.id: row for row in test_rows}
     source_tests = []
     for test_id in request.source_test_ids:
-        test = await test_repo.get_with_questions(test_id)
+        test = tests_by_id.get(test_id)
         if not test:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -96,7 +103,7 @@ async def generate_combined_test(
                 detail=f"Test '{test.title}' (type: {test.test_type.value}) is not available for combining. Only FOR_COMBINED tests can be used."
             )
         
-        if not test.questions:
+        if not test.question_count:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Test '{test.title}' has no questions"
@@ -104,7 +111,7 @@ async def generate_combined_test(
         source_tests.append(test)
     
     # Calculate questions per test
-    total_available = sum(len(test.questions) for test in source_tests)
+    total_available = sum(test.question_count for test in source_tests)
     if request.questions_count > total_available:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -116,7 +123,7 @@ async def generate_combined_test(
     remaining = request.questions_count
     
     for i, test in enumerate(source_tests):
-        available = len(test.questions)
+        available = test.question_count
         if i == len(source_tests) - 1:
             # Last test gets remaining questions
             count = min(remaining, available)
@@ -133,7 +140,7 @@ async def generate_combined_test(
         for test in source_tests:
             if remaining == 0:
                 break
-            if questions_per_test[test.id] < len(test.questions):
+            if questions_per_test[test.id] < test.question_count:
                 questions_per_test[test.id] += 1
                 remaining -= 1
     
@@ -148,39 +155,50 @@ async def generate_combined_test(
     await session.flush()
     
     # Add source test records
-    for test in source_tests:
-        source = CombinedTestSource(
-            combined_test_id=combined_test.id,
-            source_test_id=test.id,
-            questions_count=questions_per_test[test.id]
-        )
-        session.add(source)
+    await CombinedTestSourceRepository(session).bulk_create(
+        [
+            {
+                "combined_test_id": combined_test.id,
+                "source_test_id": test.id,
+                "questions_count": questions_per_test[test.id]
+            }
+            for test in source_tests
+        ],
+        commit=False
+    )
     
-    # Select random questions from each test
-    selected_questions = []
+    # Select random question IDs from the cached per-test ID arrays
+    answer_keys = await answer_key_cache.get_or_compile_many(
+        session,
+        questions_per_test.keys(),
+        expected_counts={test.id: test.question_count for test in source_tests}
+    )
+    selected_question_ids = []
     for test in source_tests:
         count = questions_per_test[test.id]
-        test_questions = random.sample(test.questions, count)
-        selected_questions.extend(test_questions)
+        selected_question_ids.extend(random.sample(answer_keys[test.id].question_ids, count))
     
     # Shuffle all selected questions
-    random.shuffle(selected_questions)
+    random.shuffle(selected_question_ids)
     
     # Add questions to combined test
-    for idx, question in enumerate(selected_questions):
-        ctq = CombinedTestQuestion(
-            combined_test_id=combined_test.id,
-            question_id=question.id,
-            order_index=idx
-        )
-        session.add(ctq)
+    await CombinedTestQuestionRepository(session).bulk_create(
+        [
+            {
+                "combined_test_id": combined_test.id,
+                "question_id": question_id,
+                "order_index": idx
+            }
+            for idx, question_id in enumerate(selected_question_ids)
+        ],
+        commit=False
+    )
     
     await session.commit()
-    await session.refresh(combined_test)
     
     # Build response
     combined_test_repo = CombinedTestRepository(session)
-    test_with_sources = await combined_test_repo. get_with_questions(combined_test. id)
+    test_with_sources = await combined_test_repo.get_with_sources(combined_test.id)
 
     source_responses = [
         CombinedTestSourceResponse(
@@ -233,10 +251,21 @@ async def get_my_combined_tests(
 @router.get("/{test_id}", response_model=CombinedTestDetailResponse)
 async def get_combined_test(
     test_id: int,
+    request: Request,
     user_id: str = Depends(get_current_user_id),
     session: AsyncSession = Depends(get_async_session)
 ):
     """Get a combined test with all questions."""
+    snapshot_key = ("combined_test", test_id)
+    snapshot = response_snapshot_cache.get(snapshot_key)
+    if snapshot is not None:
+        if snapshot.owner_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have access to this test"
+            )
+        return snapshot.to_response(request)
+    
     repo = CombinedTestRepository(session)
     test = await repo.get_with_questions(test_id)
     
@@ -299,7 +328,7 @@ async def get_combined_test(
         for source in test.source_tests
     ]
     
-    return CombinedTestDetailResponse(
+    response = CombinedTestDetailResponse(
         id=test.id,
         user_id=test.user_id,
         title=test.title,
@@ -308,6 +337,15 @@ async def get_combined_test(
         source_tests=source_responses,
         questions=questions
     )
+    
+    # Generated tests never change, keep the serialized response until
+    # one of the referenced questions or source tests is edited
+    tags = [("combined_test", test.id)]
+    tags += [("question", ctq.question_id) for ctq in test.questions]
+    tags += [("test", ctq.question.test_id) for ctq in test.questions]
+    tags += [("test", source.source_test_id) for source in test.source_tests]
+    snapshot = response_snapshot_cache.put(snapshot_key, response, test.user_id, tags)
+    return snapshot.to_response(request)
 
 
 @router.post("/{test_id}/submit", response_model=CombinedTestResult)
@@ -319,9 +357,9 @@ async def submit_combined_test(
 ):
     """Submit answers for a combined test."""
     
-    # Get combined test with questions
+    # Get combined test with its sources
     combined_repo = CombinedTestRepository(session)
-    combined_test = await combined_repo.get_with_questions(test_id)
+    combined_test = await combined_repo.get_with_sources(test_id)
     
     if not combined_test:
         raise HTTPException(
@@ -335,58 +373,57 @@ async def submit_combined_test(
             detail="You don't have access to this test"
         )
     
-    # Create attempt
-    attempt_repo = CombinedTestAttemptRepository(session)
-    attempt = await attempt_repo.create(
-        combined_test_id=test_id,
-        user_id=user_id,
-        score=0,
-        total_questions=combined_test.total_questions,
-        started_at=datetime.now(timezone.utc)
-    )
+    # Reuse the compiled answer keys of the source tests
+    source_titles = {
+        source.source_test_id: source.source_test.title
+        for source in combined_test.source_tests
+    }
+    answer_keys = await answer_key_cache.get_or_compile_many(session, source_titles.keys())
+    question_ids = set(await CombinedTestQuestionRepository(session).get_question_ids(test_id))
+    
+    # Create question map
+    question_map = {
+        question_id: question
+        for answer_key in answer_keys.values()
+        for question_id, question in answer_key.questions.items()
+        if question_id in question_ids
+    }
+    
+    started_at = datetime.now(timezone.utc)
     
     # Process answers
     score = 0
+    answer_rows = []
     answer_results = []
-    answer_repo = CombinedTestAnswerRepository(session)
-    
-    # Create question map
-    question_map = {ctq.question_id: ctq.question for ctq in combined_test.questions}
+    topics = {}
     
     for answer_submit in submission.answers:
         question = question_map.get(answer_submit.question_id)
         if not question:
             continue
         
-        is_correct = False
-        points_earned = 0
+        is_correct = question.grade(answer_submit.selected_option_ids)
+        points_earned = question.points if is_correct else 0
+        score += points_earned
         
-        # Check answer based on question type
-        if question.question_type.value in ["single_choice", "multiple_choice"]:
-            if answer_submit.selected_option_ids:
-                correct_option_ids = {opt.id for opt in question.options if opt.is_correct}
-                selected_option_ids = set(answer_submit.selected_option_ids)
-                
-                if correct_option_ids == selected_option_ids:
-                    is_correct = True
-                    points_earned = question.points
-                    score += points_earned
+        # Per-source-test totals for the statistics summaries
+        answered, correct = topics.get(question.test_id, (0, 0))
+        topics[question.test_id] = (answered + 1, correct + int(is_correct))
         
-        # Save answer
-        await answer_repo.create(
-            attempt_id=attempt.id,
-            question_id=question.id,
-            selected_option_ids=json.dumps(answer_submit.selected_option_ids) if answer_submit.selected_option_ids else None,
-            text_answer=answer_submit.text_answer,
-            is_correct=is_correct,
-            points_earned=points_earned
-        )
+        # Collect answer for a single bulk insert
+        answer_rows.append({
+            "question_id": question.id,
+            "selected_option_ids": json.dumps(answer_submit.selected_option_ids) if answer_submit.selected_option_ids else None,
+            "text_answer": answer_submit.text_answer,
+            "is_correct": is_correct,
+            "points_earned": points_earned
+        })
         
         answer_results.append(
             CombinedTestAnswerResult(
                 question_id=question.id,
                 question_text=question.question_text,
-                source_test_title=question.test.title,
+                source_test_title=source_titles[question.test_id],
                 selected_option_ids=answer_submit.selected_option_ids,
                 text_answer=answer_submit.text_answer,
                 is_correct=is_correct,
@@ -395,12 +432,28 @@ async def submit_combined_test(
             )
         )
     
-    # Update attempt
+    # Save attempt with final score and all answers in one transaction
     completed_at = datetime.now(timezone.utc)
-    await attempt_repo.update(
-        attempt.id,
+    attempt_repo = CombinedTestAttemptRepository(session)
+    topic_statistics = [
+        {
+            "test_id": source_test_id,
+            "test_title": source_titles[source_test_id],
+            "total_questions_answered": answered,
+            "correct_answers": correct
+        }
+        for source_test_id, (answered, correct) in topics.items()
+    ]
+    attempt = await attempt_repo.create_with_answers(
+        answer_rows,
+        topics,
+        combined_test_id=test_id,
+        user_id=user_id,
         score=score,
-        completed_at=completed_at
+        total_questions=combined_test.total_questions,
+        started_at=started_at,
+        completed_at=completed_at,
+        topic_statistics=json.dumps(topic_statistics)
     )
     
     percentage = (score / combined_test.total_questions * 100) if combined_test.total_questions > 0 else 0.0
@@ -411,7 +464,7 @@ async def submit_combined_test(
         score=score,
         total_questions=combined_test.total_questions,
         percentage=percentage,
-        started_at=attempt.started_at,
+        started_at=started_at,
         completed_at=completed_at,
         answers=answer_results
     )
@@ -419,14 +472,22 @@ async def submit_combined_test(
 
 @router.get("/attempts/history", response_model=List[CombinedTestAttemptResponse])
 async def get_attempts_history(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
     user_id: str = Depends(get_current_user_id),
     session: AsyncSession = Depends(get_async_session)
 ):
-    """Get all test attempts for the current user."""
+    """
+    Get test attempts for the current user, newest first.
+    
+    Pass the X-Next-Cursor response header as cursor to get the next page.
+    """
     repo = CombinedTestAttemptRepository(session)
-    attempts = await repo.get_user_attempts(user_id, skip, limit)
+    attempts, next_cursor = await repo.get_user_attempts(user_id, cursor, limit, skip)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     return [
         CombinedTestAttemptResponse(
@@ -444,13 +505,45 @@ async def get_attempts_history(
     ]
 
 
+@router.get("/attempts/export", dependencies=[Depends(get_current_admin_user_id)])
+async def export_combined_attempts(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    combined_test_id: Optional[int] = None,
+    source_test_id: Optional[int] = None,
+    user_id: Optional[str] = None,
+):
+    """
+    Stream combined test attempts with their answers as NDJSON or CSV (superusers only).
+    
+    One row per answer; rows are read through a server-side cursor.
+    """
+    started_from, started_before = date_bounds(start_date, end_date)
+    stmt = CombinedTestAttemptRepository.export_query(
+        started_from, started_before, combined_test_id, source_test_id, user_id
+    )
+    return export_response(async_session_maker, stmt, export_format, "combined_test_attempts")
+
+
 @router.get("/attempts/{attempt_id}", response_model=CombinedTestAttemptDetailResponse)
 async def get_attempt_details(
     attempt_id: int,
+    request: Request,
     user_id: str = Depends(get_current_user_id),
     session: AsyncSession = Depends(get_async_session)
 ):
     """Get detailed information about a specific attempt."""
+    snapshot_key = ("combined_attempt", attempt_id)
+    snapshot = response_snapshot_cache.get(snapshot_key)
+    if snapshot is not None:
+        if snapshot.owner_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have access to this attempt"
+            )
+        return snapshot.to_response(request)
+    
     repo = CombinedTestAttemptRepository(session)
     attempt = await repo.get_with_answers(attempt_id)
     
@@ -520,7 +613,7 @@ async def get_attempt_details(
         for source in attempt.combined_test.source_tests
     ]
     
-    return CombinedTestAttemptDetailResponse(
+    response = CombinedTestAttemptDetailResponse(
         id=attempt.id,
         combined_test_id=attempt.combined_test_id,
         combined_test_title=attempt.combined_test.title,
@@ -533,6 +626,14 @@ async def get_attempt_details(
         answers=answers,
         source_tests=source_responses
     )
+    
+    # Submitted attempts never change, see get_combined_test
+    tags = [("combined_test", attempt.combined_test_id)]
+    tags += [("question", answer.question_id) for answer in attempt.answers]
+    tags += [("test", answer.question.test_id) for answer in attempt.answers]
+    tags += [("test", source.source_test_id) for source in attempt.combined_test.source_tests]
+    snapshot = response_snapshot_cache.put(snapshot_key, response, attempt.user_id, tags)
+    return snapshot.to_response(request)
 
 
 @router.get("/statistics/attempt/{attempt_id}", response_model=AttemptTopicStatistics)
@@ -543,7 +644,7 @@ async def get_attempt_statistics(
 ):
     """Get topic statistics for a specific attempt."""
     repo = CombinedTestAttemptRepository(session)
-    attempt = await repo.get_with_answers(attempt_id)
+    attempt = await repo.get_with_combined_test(attempt_id)
     
     if not attempt:
         raise HTTPException(
@@ -557,33 +658,22 @@ async def get_attempt_statistics(
             detail="You don't have access to this attempt"
         )
     
-    # Calculate topic statistics
-    topic_stats = {}
-    for answer in attempt.answers:
-        test_id = answer.question.test_id
-        test_title = answer.question.test.title
-        
-        if test_id not in topic_stats:
-            topic_stats[test_id] = {
-                "test_id": test_id,
-                "test_title": test_title,
-                "total": 0,
-                "correct": 0
-            }
-        
-        topic_stats[test_id]["total"] += 1
-        if answer.is_correct:
-            topic_stats[test_id]["correct"] += 1
+    # Topic statistics are written at submit; older attempts are computed once
+    if attempt.topic_statistics is not None:
+        topic_stats = json.loads(attempt.topic_statistics)
+    else:
+        computed = await repo.compute_topic_statistics([attempt.id])
+        topic_stats = computed[attempt.id]
+        if attempt.completed_at is not None:
+            attempt.topic_statistics = json.dumps(topic_stats)
+            await session.commit()
     
     topics = [
         TopicStatistics(
-            test_id=stats["test_id"],
-            test_title=stats["test_title"],
-            total_questions_answered=stats["total"],
-            correct_answers=stats["correct"],
-            percentage=(stats["correct"] / stats["total"] * 100) if stats["total"] > 0 else 0.0
+            **stats,
+            percentage=(stats["correct_answers"] / stats["total_questions_answered"] * 100) if stats["total_questions_answered"] > 0 else 0.0
         )
-        for stats in topic_stats.values()
+        for stats in topic_stats
     ]
     
     return AttemptTopicStatistics(
@@ -601,7 +691,7 @@ async def get_overall_statistics(
     session: AsyncSession = Depends(get_async_session)
 ):
     """Get overall statistics across all attempts."""
-    repo = CombinedTestAttemptRepository(session)
+    repo = CombinedTestStatisticsRepository(session)
     stats = await repo.get_user_statistics(user_id)
     
     topics = [
@@ -643,5 +733,10 @@ async def delete_combined_test(
             detail="You don't have access to this test"
         )
     
-    await repo.delete(test_id)
+    # Deleted attempts no longer count towards the user's statistics;
+    # the delete and the rebuild are committed together
+    await repo.delete(test_id, commit=False)
+    await CombinedTestStatisticsRepository(session).rebuild(user_id, commit=False)
+    await session.commit()
+    response_snapshot_cache.invalidate_combined_test(test_id)
     return None
\ No newline at end of file
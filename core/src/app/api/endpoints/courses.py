@@ -12,6 +12,7 @@ from core.src.app.schemas.course import (
     CourseWithModules,
 )
 from core.src.app.repositories.course import CourseRepository
+from core.src.app.services import media_batch
 
 router = APIRouter()
 
@@ -107,10 +108,14 @@ async def delete_course(
 ):
     """Delete a course."""
     repository = CourseRepository(session)
-    deleted = await repository.delete(course_id)
-    if not deleted:
+    if not await repository.get(course_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Course with id {course_id} not found"
         )
+    
+    # Медиа курса и его уроков удаляем в одной транзакции с курсом, S3 - после commit
+    deleted_media = await media_batch.delete_media_rows(session, media_batch.media_scope(course_id=course_id))
+    await repository.delete(course_id)
+    await media_batch.purge_deleted_media(deleted_media)
     return None
@@ -15,6 +15,7 @@ from core.src.app.schemas.course import (
 from core.src.app.repositories.course import LessonRepository
 from core.src.app.schemas.media_schema import CourseMediaResponse  # ДОБАВЬТЕ если нужно
 from core.src.app.services.media_s3_service import media_s3_service
+from core.src.app.services import media_batch
 router = APIRouter()
 
 @router.post("/", response_model=LessonResponse, status_code=status.HTTP_201_CREATED)
@@ -96,12 +97,16 @@ async def delete_lesson(
 ):
     """Delete a lesson."""
     repository = LessonRepository(session)
-    deleted = await repository.delete(lesson_id)
-    if not deleted:
+    if not await repository.get(lesson_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Lesson with id {lesson_id} not found"
         )
+    
+    # Медиа урока удаляем в одной транзакции с уроком, S3 - после commit
+    deleted_media = await media_batch.delete_media_rows(session, media_batch.media_scope(lesson_id=lesson_id))
+    await repository.delete(lesson_id)
+    await media_batch.purge_deleted_media(deleted_media)
     return None
 
 
@@ -124,7 +129,8 @@ async def get_lesson_with_all_media(
     response_data = LessonWithAllMedia.model_validate(lesson)
     
     # Добавляем download URLs для S3 файлов
+    urls = media_s3_service.generate_presigned_urls(media.s3_key for media in response_data.lesson_media)
     for media in response_data.lesson_media:
-        media.download_url = media_s3_service.generate_presigned_url(media.s3_key)
+        media.download_url = urls[media.s3_key]
     
     return response_data
\ No newline at end of file
@@ -12,6 +12,7 @@ from core.src.app.schemas.course import (
     ModuleWithLessons,
 )
 from core.src.app.repositories.course import CourseModuleRepository
+from core.src.app.services import media_batch
 
 router = APIRouter()
 
@@ -94,10 +95,14 @@ async def delete_module(
 ):
     """Delete a course module."""
     repository = CourseModuleRepository(session)
-    deleted = await repository.delete(module_id)
-    if not deleted:
+    if not await repository.get(module_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Module with id {module_id} not found"
         )
+    
+    # Медиа уроков модуля удаляем в одной транзакции с модулем, S3 - после commit
+    deleted_media = await media_batch.delete_media_rows(session, media_batch.media_scope(module_id=module_id))
+    await repository.delete(module_id)
+    await media_batch.purge_deleted_media(deleted_media)
     return None
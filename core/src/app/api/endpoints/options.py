@@ -11,6 +11,9 @@ from core.src.app.schemas.course import (
     QuestionOptionResponse,
 )
 from core.src.app.repositories.course import QuestionOptionRepository
+from core.src.app.services import media_batch
+from core.src.app.services.answer_key_cache import answer_key_cache
+from core.src.app.services.response_snapshot_cache import response_snapshot_cache
 
 router = APIRouter()
 
@@ -25,6 +28,8 @@ async def create_option(
     
     # Создаём опцию
     option = await repository.create(**option_data.model_dump())
+    answer_key_cache.invalidate_question(option.question_id)
+    response_snapshot_cache.invalidate_question(option.question_id)
     
     # Перезагружаем с медиа для корректной сериализации
     option_with_media = await repository.get_with_media(option.id)
@@ -105,6 +110,8 @@ async def update_option(
     
     await session.commit()
     await session.refresh(option)
+    answer_key_cache.invalidate_question(option.question_id)
+    response_snapshot_cache.invalidate_question(option.question_id)
     
     # Перезагружаем с медиа
     updated_option = await repository.get_with_media(option_id)
@@ -119,14 +126,23 @@ async def delete_option(
 ):
     """Delete a question option."""
     repository = QuestionOptionRepository(session)
-    deleted = await repository.delete(option_id)
+    option = await repository.get(option_id)
     
-    if not deleted:
+    if not option:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Option with id {option_id} not found"
         )
     
+    question_id = option.question_id
+    
+    # Изображения описания варианта удаляем в одной транзакции с вариантом, S3 - после commit
+    deleted_media = await media_batch.delete_media_rows(session, media_batch.media_scope(option_id=option_id))
+    await repository.delete(option_id)
+    answer_key_cache.invalidate_question(question_id)
+    response_snapshot_cache.invalidate_question(question_id)
+    await media_batch.purge_deleted_media(deleted_media)
+    
     return None
 
 
@@ -1,6 +1,6 @@
 """Photo upload endpoints for Telegram bot"""
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form, Query, status
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Union
@@ -8,19 +8,28 @@ import io
 import logging
 
 from core.src.app.api.deps import get_db_session as get_db
+from core.src.app.core.config import settings
+from core.src.app.repositories.base import keyset_paginate
 from core.src.app.models.course_media import CourseMedia
 from core.src.app.schemas.media_schema import (
     CourseMediaResponse,
     MediaListResponse,
     MediaUploadResponse,
+    PhotoPresignedUploadRequest,
+    PresignedUploadResponse,
+    UploadFinalizeRequest,
 )
 from core.src.app. services.media_s3_service import media_s3_service
+from core.src.app.services.media_uploads import create_upload, decode_upload_token, finalize_upload
+from core.src.app.services.image_variants import image_variant_service
+from core.src.app.services.media_dedup import release_media, store_media
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/upload", response_model=MediaUploadResponse)
 async def upload_user_photo(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(... ),
     user_id: Union[int, str] = Form(... ),  # ← ИЗМЕНИ: принимаем int ИЛИ str (UUID)
     db: AsyncSession = Depends(get_db),
@@ -41,7 +50,7 @@ async def upload_user_photo(
         file.file.seek(0)
         
         # Валидация файла (только изображения)
-        is_valid, error_msg = media_s3_service. validate_file(
+        is_valid, error_msg = media_s3_service.validate_file(
             file_size, 
             file.content_type, 
             file.filename,
@@ -58,11 +67,13 @@ async def upload_user_photo(
         
         # Загружаем в S3
         try:
-            s3_key, metadata = media_s3_service.upload_media(
+            s3_key, metadata, content_hash = await store_media(
+                db,
                 file_obj=file.file,
                 filename=file.filename or f"user_{user_id}_photo",
                 media_type='image',
                 content_type=file.content_type,
+                size=file_size,
                 user_id=user_id
             )
         except Exception as e:
@@ -82,6 +93,7 @@ async def upload_user_photo(
                 content_type=file.content_type or "image/jpeg",
                 media_type='image',
                 s3_key=s3_key,
+                content_hash=content_hash,
                 user_id=user_id,
                 width=metadata.get('width'),
                 height=metadata.get('height'),
@@ -92,6 +104,7 @@ async def upload_user_photo(
             await db.refresh(db_media)
             
             logger.info(f"Photo uploaded successfully:  {db_media.id} for user {user_id}")
+            background_tasks.add_task(image_variant_service.pregenerate, db_media.id, db_media.s3_key)
             
             # Генерируем presigned URL
             download_url = media_s3_service.generate_presigned_url(s3_key)
@@ -105,9 +118,10 @@ async def upload_user_photo(
             )
             
         except Exception as e:
-            # Откатываем S3 при ошибке БД
+            # Откатываем S3 при ошибке БД (общий объект не трогаем)
             try:
-                media_s3_service.delete_media(s3_key)
+                if not metadata.get('deduplicated'):
+                    await media_s3_service.delete_media_async(s3_key)
             except:  
                 pass
             
@@ -126,11 +140,76 @@ async def upload_user_photo(
             detail=f"Неожиданная ошибка: {str(e)}"
         )
 
+@router.post("/uploads/presign", response_model=PresignedUploadResponse)
+async def presign_user_photo_upload(data: PhotoPresignedUploadRequest):
+    """Получить presigned POST/PUT для загрузки фото напрямую в S3"""
+    try:
+        user_id = data.user_id
+        if isinstance(user_id, str):
+            try:
+                user_id = int(user_id)
+            except ValueError:
+                user_id = abs(hash(user_id)) % (2**31)
+        
+        return create_upload(
+            filename=data.filename,
+            content_type=data.content_type,
+            size=data.size,
+            media_type='image',
+            method=data.method,
+            user_id=user_id,
+            custom_name=f"User {user_id} Photo"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Presign photo upload error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка подготовки загрузки: {str(e)}"
+        )
+
+
+@router.post("/uploads/finalize", response_model=MediaUploadResponse)
+async def finalize_user_photo_upload(
+    data: UploadFinalizeRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
+    """Завершить прямую загрузку фото пользователя"""
+    try:
+        claims = decode_upload_token(data.upload_token)
+        if claims.get("user_id") is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Токен загрузки не относится к фото пользователя"
+            )
+        
+        db_media = await finalize_upload(db, data.upload_token)
+        background_tasks.add_task(image_variant_service.pregenerate, db_media.id, db_media.s3_key)
+        
+        response = CourseMediaResponse.from_orm(db_media)
+        response.download_url = media_s3_service.generate_presigned_url(db_media.s3_key)
+        
+        return MediaUploadResponse(
+            media=response,
+            message="Фото успешно загружено"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Finalize photo upload error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка завершения загрузки: {str(e)}"
+        )
+
 @router.get("/user/{user_id}", response_model=MediaListResponse)
 async def get_user_photos(
     user_id: Union[int, str],  # ← ИЗМЕНИ: принимаем int ИЛИ str
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
     db: AsyncSession = Depends(get_db),
 ):
     """Получить все фото пользователя"""
@@ -146,10 +225,16 @@ async def get_user_photos(
         query = select(CourseMedia).where(
             CourseMedia.user_id == user_id,
             CourseMedia.media_type == 'image'
-        ).order_by(CourseMedia.created_at.desc())
+        )
         
-        result = await db.execute(query. offset(skip).limit(limit))
-        media_list = result.scalars().all()
+        media_list, next_cursor = await keyset_paginate(
+            db,
+            query,
+            [CourseMedia.created_at, CourseMedia.id],
+            cursor=cursor,
+            limit=limit,
+            skip=skip
+        )
         
         # Считаем общее количество
         count_query = select(func.count()).select_from(CourseMedia).where(
@@ -160,19 +245,23 @@ async def get_user_photos(
         total_count = total.scalar_one()
         
         # Добавляем presigned URLs
+        urls = media_s3_service.generate_presigned_urls(media.s3_key for media in media_list)
         media_responses = []
         for media in media_list:  
             response = CourseMediaResponse.from_orm(media)
-            response. download_url = media_s3_service.generate_presigned_url(media.s3_key)
+            response.download_url = urls[media.s3_key]
             media_responses.append(response)
         
         logger.info(f"Retrieved {len(media_responses)} photos for user {user_id}")
         
         return MediaListResponse(
             media=media_responses,
-            total=total_count
+            total=total_count,
+            next_cursor=next_cursor
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching user photos: {e}")
         raise HTTPException(
@@ -200,13 +289,14 @@ async def delete_user_photo(
         
         user_id = media.user_id
         
-        # Удаляем из S3
-        media_s3_service.delete_media(media.s3_key)
-        
-        # Удаляем из БД
+        # Удаляем из БД; объект в S3 - только если на него больше никто не ссылается
+        s3_key = await release_media(db, media)
         await db.delete(media)
         await db.commit()
         
+        if s3_key:
+            await media_s3_service.delete_media_async(s3_key)
+        
         logger.info(f"Photo {photo_id} deleted for user {user_id}")
         
         return {"message": "Фото успешно удалено"}
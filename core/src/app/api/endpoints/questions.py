@@ -1,7 +1,7 @@
 """API endpoints for test question management with media support."""
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 import io
 
@@ -14,7 +14,13 @@ from core.src.app.schemas.course import (
     QuestionWithOptions,
 )
 from core.src.app.repositories.course import TestQuestionRepository
+from core.src.app.repositories.combined_test import CombinedTestStatisticsRepository
 from core.src.app.services.media_s3_service import media_s3_service
+from core.src.app.services.image_variants import image_variant_service
+from core.src.app.services.media_dedup import release_media, store_media
+from core.src.app.services import media_batch
+from core.src.app.services.answer_key_cache import answer_key_cache
+from core.src.app.services.response_snapshot_cache import response_snapshot_cache
 from core.src.app.models.course_media import CourseMedia
 from core.src.app.schemas.media_schema import CourseMediaResponse
 
@@ -28,6 +34,7 @@ async def create_question(
     """Create a new test question."""
     repository = TestQuestionRepository(session)
     question = await repository.create(**question_data.model_dump())
+    answer_key_cache.invalidate_test(question.test_id)
     return question
 
 
@@ -52,13 +59,16 @@ async def get_questions_by_test_with_media(
     repository = TestQuestionRepository(session)
     questions = await repository.get_by_test_with_media(test_id)
     
-    # Добавляем presigned URLs для медиа
-    response_questions = []
-    for question in questions:
-        response_data = TestQuestionWithMedia.model_validate(question)
+    # Добавляем presigned URLs для медиа, подписывая все ссылки теста одним пакетом
+    response_questions = [TestQuestionWithMedia.model_validate(question) for question in questions]
+    urls = media_s3_service.generate_presigned_urls(
+        media.s3_key
+        for response_data in response_questions
+        for media in response_data.description_media
+    )
+    for response_data in response_questions:
         for media in response_data.description_media:
-            media.download_url = media_s3_service.generate_presigned_url(media.s3_key)
-        response_questions.append(response_data)
+            media.download_url = urls[media.s3_key]
     
     return response_questions
 
@@ -98,8 +108,9 @@ async def get_question_with_media(
     response_data = TestQuestionWithMedia.model_validate(question)
     
     # Добавляем download URLs для S3 файлов
+    urls = media_s3_service.generate_presigned_urls(media.s3_key for media in response_data.description_media)
     for media in response_data.description_media:
-        media.download_url = media_s3_service.generate_presigned_url(media.s3_key)
+        media.download_url = urls[media.s3_key]
     
     return response_data
 
@@ -135,6 +146,8 @@ async def update_question(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Question with id {question_id} not found"
         )
+    answer_key_cache.invalidate_test(question.test_id)
+    response_snapshot_cache.invalidate_question(question_id)
     return question
 
 
@@ -145,12 +158,26 @@ async def delete_question(
 ):
     """Delete a test question."""
     repository = TestQuestionRepository(session)
-    deleted = await repository.delete(question_id)
-    if not deleted:
+    question = await repository.get(question_id)
+    if not question:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Question with id {question_id} not found"
         )
+    
+    test_id = question.test_id
+    
+    # Изображения вопроса и его вариантов ответа удаляем в одной транзакции с вопросом, S3 - после commit
+    deleted_media = await media_batch.delete_media_rows(session, media_batch.media_scope(question_id=question_id))
+    await repository.delete(question_id, commit=False)
+    
+    # Answers to the question are gone, recompute the topic totals of its test in the same transaction
+    await CombinedTestStatisticsRepository(session).rebuild_topics_for_test(test_id)
+    await session.commit()
+    
+    answer_key_cache.invalidate_test(test_id)
+    response_snapshot_cache.invalidate_question(question_id)
+    await media_batch.purge_deleted_media(deleted_media)
     return None
 
 
@@ -158,6 +185,7 @@ async def delete_question(
 @router.post("/{question_id}/upload-description-image", response_model=CourseMediaResponse)
 async def upload_question_description_image(
     question_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     custom_name: str = Form(None),
     session: AsyncSession = Depends(get_async_session)
@@ -193,11 +221,13 @@ async def upload_question_description_image(
     
     try:
         # Загружаем в S3
-        s3_key, metadata = media_s3_service.upload_media(
+        s3_key, metadata, content_hash = await store_media(
+            session,
             file_obj=file.file,
             filename=file.filename or "question_description_image",
             media_type='image',
-            content_type=file.content_type
+            content_type=file.content_type,
+            size=file_size
         )
         
         # Сохраняем в БД с привязкой к вопросу
@@ -209,6 +239,7 @@ async def upload_question_description_image(
             content_type=file.content_type or "image/jpeg",
             media_type='image',
             s3_key=s3_key,
+            content_hash=content_hash,
             test_question_id=question_id,
             width=metadata.get('width'),
             height=metadata.get('height'),
@@ -217,6 +248,8 @@ async def upload_question_description_image(
         session.add(db_media)
         await session.commit()
         await session.refresh(db_media)
+        response_snapshot_cache.invalidate_question(question_id)
+        background_tasks.add_task(image_variant_service.pregenerate, db_media.id, db_media.s3_key)
         
         # Генерируем presigned URL
         download_url = media_s3_service.generate_presigned_url(s3_key)
@@ -227,9 +260,10 @@ async def upload_question_description_image(
         return response
         
     except Exception as e:
-        # Откатываем S3 при ошибке БД
+        # Откатываем S3 при ошибке БД (общий объект не трогаем)
         try:
-            media_s3_service.delete_media(s3_key)
+            if not metadata.get('deduplicated'):
+                await media_s3_service.delete_media_async(s3_key)
         except:
             pass
         
@@ -265,13 +299,15 @@ async def delete_question_description_image(
         )
     
     try:
-        # Удаляем из S3
-        media_s3_service.delete_media(media.s3_key)
-        
-        # Удаляем из БД
+        # Удаляем из БД; объект в S3 - только если на него больше никто не ссылается
+        s3_key = await release_media(session, media)
         await session.delete(media)
         await session.commit()
         
+        if s3_key:
+            await media_s3_service.delete_media_async(s3_key)
+        response_snapshot_cache.invalidate_question(question_id)
+        
         return None
         
     except Exception as e:
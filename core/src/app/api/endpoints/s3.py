@@ -1,29 +1,54 @@
 # app/api/routes/media.py
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, UploadFile, File, Form, Query, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Literal
+import asyncio
 import io
 import logging
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import quote
 
-from core.src.app.api.deps import get_db_session as get_db
+from core.src.app.api.deps import get_current_admin_user_id, get_db_session as get_db
+from core.src.app.core.config import settings
 from core.src.app.models.course_media import CourseMedia
 from core.src.app.schemas.media_schema import (
     CourseMediaResponse,
     MediaListResponse,
     MediaUploadResponse,
     CourseMediaUpdate,
-    MediaConfigResponse
+    MediaConfigResponse,
+    PresignedUploadRequest,
+    PresignedUploadResponse,
+    UploadFinalizeRequest,
+    UploadSessionCreate,
+    UploadSessionResponse,
+    UploadPartResponse,
+    MediaBatchRequest,
+    MediaBatchDeleteResponse,
+    MediaBatchPresignResponse,
 )
+from core.src.app.models.course import QuestionOption
 from core.src.app.services.media_s3_service import media_s3_service
+from core.src.app.services.storage_backends import LocalStorageBackend
+from core.src.app.services.media_dedup import release_media, store_media
+from core.src.app.services.media_uploads import create_upload, finalize_upload
+from core.src.app.services import media_batch, upload_sessions
+from core.src.app.services.image_variants import image_variant_service
+from core.src.app.services.media_reconciler import media_reconciler
+from core.src.app.db.database import async_session_maker
+from core.src.app.services.response_snapshot_cache import response_snapshot_cache
 from core.src.app.repositories.media_s3_config import media_s3_settings
+from core.src.app.repositories.base import keyset_paginate
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/upload", response_model=MediaUploadResponse)
 async def upload_media(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     media_type: Literal['image', 'video'] = Form(...),
     course_id: Optional[int] = Form(None),
@@ -56,11 +81,13 @@ async def upload_media(
         
         # Загружаем в S3
         try:
-            s3_key, metadata = media_s3_service.upload_media(
+            s3_key, metadata, content_hash = await store_media(
+                db,
                 file_obj=file.file,
                 filename=file.filename or f"unnamed_{media_type}",
                 media_type=media_type,
                 content_type=file.content_type,
+                size=file_size,
                 course_id=course_id,
                 lesson_id=lesson_id
             )
@@ -81,6 +108,7 @@ async def upload_media(
                 content_type=file.content_type or "application/octet-stream",
                 media_type=media_type,
                 s3_key=s3_key,
+                content_hash=content_hash,
                 course_id=course_id,
                 lesson_id=lesson_id,
                 width=metadata.get('width'),
@@ -93,6 +121,8 @@ async def upload_media(
             await db.refresh(db_media)
             
             logger.info(f"Media uploaded successfully: {db_media.id}")
+            if media_type == 'image':
+                background_tasks.add_task(image_variant_service.pregenerate, db_media.id, db_media.s3_key)
             
             # Генерируем presigned URL
             download_url = media_s3_service.generate_presigned_url(s3_key)
@@ -106,9 +136,10 @@ async def upload_media(
             )
             
         except Exception as e:
-            # Откатываем S3 при ошибке БД
+            # Откатываем S3 при ошибке БД (общий объект не трогаем)
             try:
-                media_s3_service.delete_media(s3_key)
+                if not metadata.get('deduplicated'):
+                    await media_s3_service.delete_media_async(s3_key)
             except:
                 pass
             
@@ -129,6 +160,189 @@ async def upload_media(
     
 
 
+@router.post("/uploads/presign", response_model=PresignedUploadResponse)
+async def presign_media_upload(data: PresignedUploadRequest):
+    """Получить presigned POST/PUT для загрузки файла напрямую в S3"""
+    try:
+        return create_upload(
+            filename=data.filename,
+            content_type=data.content_type,
+            size=data.size,
+            media_type=data.media_type,
+            method=data.method,
+            course_id=data.course_id,
+            lesson_id=data.lesson_id,
+            custom_name=data.custom_name
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Presign upload error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка подготовки загрузки: {str(e)}"
+        )
+
+
+@router.post("/uploads/finalize", response_model=MediaUploadResponse)
+async def finalize_media_upload(
+    data: UploadFinalizeRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
+    """Завершить прямую загрузку: проверить объект в S3 и создать запись"""
+    try:
+        db_media = await finalize_upload(db, data.upload_token)
+        if db_media.media_type == 'image':
+            background_tasks.add_task(image_variant_service.pregenerate, db_media.id, db_media.s3_key)
+        
+        response = CourseMediaResponse.from_orm(db_media)
+        response.download_url = media_s3_service.generate_presigned_url(db_media.s3_key)
+        
+        return MediaUploadResponse(
+            media=response,
+            message=f"{db_media.media_type.capitalize()} успешно загружен"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Finalize upload error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка завершения загрузки: {str(e)}"
+        )
+
+
+def _session_response(session) -> UploadSessionResponse:
+    return UploadSessionResponse(
+        id=session.id,
+        s3_key=session.s3_key,
+        filename=session.filename,
+        size=session.size,
+        part_size=session.part_size,
+        total_parts=session.total_parts,
+        max_parallel_parts=media_s3_settings.MULTIPART_MAX_PARALLEL_PARTS,
+        uploaded_parts=[part.part_number for part in session.parts],
+        status=session.status,
+        media_id=session.media_id,
+        expires_at=session.expires_at,
+    )
+
+
+@router.post("/uploads/sessions", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    data: UploadSessionCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Начать возобновляемую загрузку по частям"""
+    try:
+        session = await upload_sessions.create_session(
+            db,
+            filename=data.filename,
+            content_type=data.content_type,
+            size=data.size,
+            media_type=data.media_type,
+            course_id=data.course_id,
+            lesson_id=data.lesson_id,
+            custom_name=data.custom_name
+        )
+        return _session_response(session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Upload session error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка создания сессии загрузки: {str(e)}"
+        )
+
+
+@router.get("/uploads/sessions/{session_id}", response_model=UploadSessionResponse)
+async def get_upload_session(
+    session_id: str,
+    db: AsyncSession = Depends(get_db),
+):
+    """Состояние сессии: какие части уже загружены (для возобновления)"""
+    session = await upload_sessions.get_session(db, session_id)
+    return _session_response(session)
+
+
+@router.put("/uploads/sessions/{session_id}/parts/{part_number}", response_model=UploadPartResponse)
+async def upload_session_part(
+    session_id: str,
+    part_number: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """Загрузить часть N (тело запроса - байты части); части можно слать параллельно"""
+    try:
+        content_length = request.headers.get("content-length")
+        part = await upload_sessions.upload_part(
+            db,
+            session_id,
+            part_number,
+            request.stream(),
+            content_length=int(content_length) if content_length and content_length.isdigit() else None
+        )
+        return UploadPartResponse(part_number=part.part_number, etag=part.etag, size=part.size)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Upload part error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка загрузки части: {str(e)}"
+        )
+
+
+@router.post("/uploads/sessions/{session_id}/complete", response_model=MediaUploadResponse)
+async def complete_upload_session(
+    session_id: str,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
+    """Завершить загрузку по частям и создать запись медиа"""
+    try:
+        db_media = await upload_sessions.complete_session(db, session_id)
+        if db_media.media_type == 'image':
+            background_tasks.add_task(image_variant_service.pregenerate, db_media.id, db_media.s3_key)
+        
+        response = CourseMediaResponse.from_orm(db_media)
+        response.download_url = media_s3_service.generate_presigned_url(db_media.s3_key)
+        
+        return MediaUploadResponse(
+            media=response,
+            message=f"{db_media.media_type.capitalize()} успешно загружен"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Complete upload session error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка завершения загрузки: {str(e)}"
+        )
+
+
+@router.delete("/uploads/sessions/{session_id}")
+async def abort_upload_session(
+    session_id: str,
+    db: AsyncSession = Depends(get_db),
+):
+    """Отменить загрузку по частям"""
+    try:
+        await upload_sessions.abort_session(db, session_id)
+        return {"message": "Загрузка отменена"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Abort upload session error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка отмены загрузки: {str(e)}"
+        )
+
+
 @router.get("/media/{media_id}", response_model=CourseMediaResponse)
 async def get_media_by_id(
     media_id: str,
@@ -165,10 +379,351 @@ async def get_media_by_id(
             detail=f"Ошибка получения медиа: {str(e)}"
         )
 
+@router.post("/media/batch/metadata", response_model=MediaListResponse)
+async def get_media_batch(
+    data: MediaBatchRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Метаданные и ссылки для набора медиа (по ID или по курсу/уроку/вопросу)"""
+    try:
+        scope = media_batch.media_scope(data.media_ids, data.course_id, data.lesson_id, data.question_id)
+        media_list = await media_batch.get_media(db, scope)
+        
+        urls = media_s3_service.generate_presigned_urls(media.s3_key for media in media_list)
+        response_list = []
+        for media in media_list:
+            response = CourseMediaResponse.from_orm(media)
+            response.download_url = urls[media.s3_key]
+            response_list.append(response)
+        
+        return MediaListResponse(media=response_list, total=len(response_list))
+        
+    except Exception as e:
+        logger.error(f"Error fetching media batch: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка получения медиа: {str(e)}"
+        )
+
+
+@router.post("/media/batch/presign", response_model=MediaBatchPresignResponse)
+async def presign_media_batch(
+    data: MediaBatchRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Presigned URL для набора медиа"""
+    try:
+        scope = media_batch.media_scope(data.media_ids, data.course_id, data.lesson_id, data.question_id)
+        result = await db.execute(select(CourseMedia.id, CourseMedia.s3_key).where(scope))
+        rows = result.all()
+        
+        urls = media_s3_service.generate_presigned_urls(row.s3_key for row in rows)
+        return MediaBatchPresignResponse(urls={row.id: urls[row.s3_key] for row in rows})
+        
+    except Exception as e:
+        logger.error(f"Error presigning media batch: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка генерации ссылок: {str(e)}"
+        )
+
+
+@router.post("/media/batch/delete", response_model=MediaBatchDeleteResponse)
+async def delete_media_batch(
+    data: MediaBatchRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Удалить набор медиа (S3 DeleteObjects пачками до 1000 ключей)"""
+    try:
+        scope = media_batch.media_scope(data.media_ids, data.course_id, data.lesson_id, data.question_id)
+        result = await media_batch.delete_media(db, scope)
+        
+        return MediaBatchDeleteResponse(deleted=len(result['deleted_ids']), **result)
+        
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error deleting media batch: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка удаления медиа: {str(e)}"
+        )
+
+
+@router.get("/media/{media_id}/variant")
+async def get_media_variant(
+    media_id: str,
+    width: int = Query(..., ge=1),
+    format: Literal['webp', 'jpeg'] = 'webp',
+    db: AsyncSession = Depends(get_db),
+):
+    """Уменьшенная копия изображения (ширина округляется до ближайшей поддерживаемой)"""
+    try:
+        result = await db.execute(
+            select(CourseMedia.s3_key, CourseMedia.media_type).where(CourseMedia.id == media_id)
+        )
+        media = result.one_or_none()
+        
+        if not media:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Медиа с ID {media_id} не найдено"
+            )
+        if media.media_type != 'image':
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Варианты доступны только для изображений"
+            )
+        
+        path = await image_variant_service.get_variant(media_id, media.s3_key, width, format)
+        
+        # Объект в S3 под этим ID не меняется, поэтому вариант можно кэшировать надолго
+        return FileResponse(
+            path,
+            media_type=f"image/{format}",
+            headers={"Cache-Control": "private, max-age=31536000, immutable"}
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error rendering media variant: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка получения варианта изображения: {str(e)}"
+        )
+
+async def _stream_object(
+    s3_key: str,
+    filename: Optional[str],
+    content_type: Optional[str],
+    size: Optional[int],
+    range_header: Optional[str],
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str]
+) -> Response:
+    """Ответ с телом объекта: 200/206 потоком, 304/416 без тела"""
+    # Другие единицы диапазона по RFC 9110 просто игнорируются
+    if range_header and not range_header.strip().lower().startswith("bytes="):
+        range_header = None
+    
+    modified_since = None
+    if if_modified_since and not if_none_match:
+        try:
+            modified_since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            modified_since = None
+    
+    status_code, s3_response = await media_s3_service.open_media_stream_async(
+        s3_key,
+        range_header=range_header,
+        if_none_match=if_none_match,
+        if_modified_since=modified_since
+    )
+    
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": "private, max-age=3600"}
+    
+    if status_code == status.HTTP_304_NOT_MODIFIED:
+        for name in ("etag", "last-modified"):
+            if name in s3_response:
+                headers[name] = s3_response[name]
+        return Response(status_code=status_code, headers=headers)
+    if status_code == status.HTTP_416_RANGE_NOT_SATISFIABLE:
+        content_range = f"bytes */{size}" if size is not None else s3_response.get("content-range")
+        if content_range:
+            headers["Content-Range"] = content_range
+        return Response(status_code=status_code, headers=headers)
+    if status_code == status.HTTP_404_NOT_FOUND:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Файл не найден в хранилище"
+        )
+    
+    headers["Content-Length"] = str(s3_response["ContentLength"])
+    if filename:
+        headers["Content-Disposition"] = f"inline; filename*=UTF-8''{quote(filename)}"
+    if s3_response.get("ContentRange"):
+        headers["Content-Range"] = s3_response["ContentRange"]
+    if s3_response.get("ETag"):
+        headers["ETag"] = s3_response["ETag"]
+    if s3_response.get("LastModified"):
+        headers["Last-Modified"] = format_datetime(s3_response["LastModified"].astimezone(timezone.utc), usegmt=True)
+    
+    return StreamingResponse(
+        media_s3_service.iter_media_stream(s3_response["Body"]),
+        status_code=status_code,
+        media_type=s3_response.get("ContentType") or content_type,
+        headers=headers
+    )
+
+
+@router.get("/media/{media_id}/stream")
+async def stream_media(
+    media_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Отдать файл через API (когда presigned URL клиенту недоступен)
+    
+    Range передаётся в хранилище как есть, поэтому перемотка видео работает
+    без скачивания файла целиком; тело отдаётся кусками по S3_STREAM_CHUNK_SIZE.
+    """
+    try:
+        result = await db.execute(
+            select(
+                CourseMedia.s3_key,
+                CourseMedia.content_type,
+                CourseMedia.original_filename,
+                CourseMedia.size
+            ).where(CourseMedia.id == media_id)
+        )
+        media = result.one_or_none()
+        
+        if not media:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Медиа с ID {media_id} не найдено"
+            )
+        
+        return await _stream_object(
+            media.s3_key,
+            media.original_filename,
+            media.content_type,
+            media.size,
+            range_header,
+            if_none_match,
+            if_modified_since
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error streaming media: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка скачивания медиа: {str(e)}"
+        )
+
+
+def _local_storage(s3_key: str) -> LocalStorageBackend:
+    """Подписанные ссылки /local работают только с локальным хранилищем и допустимыми ключами"""
+    if not isinstance(media_s3_service.storage, LocalStorageBackend):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Локальное хранилище не используется"
+        )
+    try:
+        media_s3_service.storage.check_key(s3_key)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return media_s3_service.storage
+
+
+@router.get("/local/{s3_key:path}")
+async def get_local_object(
+    s3_key: str,
+    expires: int,
+    signature: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+):
+    """Скачивание по подписанной ссылке локального хранилища (аналог presigned GET)"""
+    storage = _local_storage(s3_key)
+    if not storage.verify_signature('get', s3_key, expires, signature):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Недействительная или просроченная ссылка"
+        )
+    
+    try:
+        return await _stream_object(s3_key, None, None, None, range_header, if_none_match, if_modified_since)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error serving local object: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка скачивания медиа: {str(e)}"
+        )
+
+
+@router.put("/local/{s3_key:path}")
+async def put_local_object(
+    s3_key: str,
+    request: Request,
+    expires: int,
+    content_type: str,
+    size: int,
+    signature: str,
+):
+    """Загрузка по подписанной ссылке локального хранилища (аналог presigned PUT)"""
+    storage = _local_storage(s3_key)
+    if (
+        not storage.verify_signature('put', s3_key, expires, signature, content_type, str(size))
+        or request.headers.get("content-type") != content_type
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Недействительная или просроченная ссылка"
+        )
+    
+    try:
+        await storage.receive_object(s3_key, content_type, request.stream(), size, size)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return Response(status_code=status.HTTP_200_OK)
+
+
+@router.post("/local/{s3_key:path}")
+async def post_local_object(
+    s3_key: str,
+    expires: int,
+    content_type: str,
+    size: int,
+    signature: str,
+    file: UploadFile = File(...),
+):
+    """Загрузка формой по подписанной ссылке локального хранилища (аналог presigned POST)"""
+    storage = _local_storage(s3_key)
+    if not storage.verify_signature('post', s3_key, expires, signature, content_type, str(size)):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Недействительная или просроченная ссылка"
+        )
+    if not 1 <= (file.size or 0) <= size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Размер файла должен быть от 1 до {size} байт"
+        )
+    
+    try:
+        await asyncio.to_thread(storage.put_object, s3_key, file.file, content_type, {})
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
 @router.get("/media", response_model=MediaListResponse)
 async def get_all_media(
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
     media_type: Optional[Literal['image', 'video']] = None,
     course_id: Optional[int] = None,
     lesson_id: Optional[int] = None,
@@ -185,8 +740,14 @@ async def get_all_media(
         if lesson_id:
             query = query.where(CourseMedia.lesson_id == lesson_id)
         
-        result = await db.execute(query.offset(skip).limit(limit))
-        media_list = result.scalars().all()
+        media_list, next_cursor = await keyset_paginate(
+            db,
+            query,
+            [CourseMedia.created_at, CourseMedia.id],
+            cursor=cursor,
+            limit=limit,
+            skip=skip
+        )
         
         count_query = select(func.count()).select_from(CourseMedia)
         if media_type:
@@ -200,17 +761,21 @@ async def get_all_media(
         total_count = total.scalar_one()
         
         # Добавляем presigned URLs
+        urls = media_s3_service.generate_presigned_urls(media.s3_key for media in media_list)
         media_responses = []
         for media in media_list:
             response = CourseMediaResponse.from_orm(media)
-            response.download_url = media_s3_service.generate_presigned_url(media.s3_key)
+            response.download_url = urls[media.s3_key]
             media_responses.append(response)
         
         return MediaListResponse(
             media=media_responses,
-            total=total_count
+            total=total_count,
+            next_cursor=next_cursor
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching media: {e}")
         raise HTTPException(
@@ -234,13 +799,23 @@ async def delete_media(
                 detail="Медиа не найдено"
             )
         
-        # Удаляем из S3
-        media_s3_service.delete_media(media.s3_key)
+        # Вопрос, в описании которого (или в описании ответа) было медиа
+        question_id = media.test_question_id
+        if question_id is None and media.question_option_id is not None:
+            option = await db.get(QuestionOption, media.question_option_id)
+            question_id = option.question_id if option else None
         
-        # Удаляем из БД
+        # Удаляем из БД; объект в S3 - только если на него больше никто не ссылается
+        s3_key = await release_media(db, media)
         await db.delete(media)
         await db.commit()
         
+        if s3_key:
+            await media_s3_service.delete_media_async(s3_key)
+        
+        if question_id is not None:
+            response_snapshot_cache.invalidate_question(question_id)
+        
         return {"message": "Медиа успешно удалено"}
         
     except HTTPException:
@@ -253,11 +828,37 @@ async def delete_media(
             detail=f"Ошибка удаления медиа: {str(e)}"
         )
 
+@router.post(
+    "/reconcile",
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(get_current_admin_user_id)]
+)
+async def start_reconciliation(
+    background_tasks: BackgroundTasks,
+    delete: bool = False,
+):
+    """Запустить сверку бакета с БД (по умолчанию только отчёт)"""
+    if media_reconciler.running:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Сверка уже выполняется"
+        )
+    
+    background_tasks.add_task(media_reconciler.run, async_session_maker, delete)
+    return {"message": "Сверка запущена", "delete": delete}
+
+
+@router.get("/reconcile", dependencies=[Depends(get_current_admin_user_id)])
+async def get_reconciliation_report():
+    """Отчёт последней сверки"""
+    return {"running": media_reconciler.running, "report": media_reconciler.last_report}
+
+
 @router.get("/config", response_model=MediaConfigResponse)
 async def get_media_config():
     """Получить конфигурацию медиа S3"""
     try:
-        connection_status = media_s3_service.check_connection()
+        connection_status = await media_s3_service.check_connection_async()
         
         return MediaConfigResponse(
             endpoint=media_s3_settings.S3_ENDPOINT,
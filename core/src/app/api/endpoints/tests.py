@@ -1,13 +1,14 @@
 """API endpoints for test management."""
 
 import json
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.src.app.db.database import get_async_session
-from core.src.app.api.deps import get_current_user_id
+from core.src.app.core.config import settings
+from core.src.app.db.database import async_session_maker, get_async_session
+from core.src.app.api.deps import get_current_admin_user_id, get_current_user_id
 from core.src.app.models.course import TestType
 from core.src.app.schemas.course import (
     TestCreate,
@@ -19,6 +20,10 @@ from core.src.app.schemas.course import (
     TestAttemptResponse,
     TestAnswerResult,
 )
+from core.src.app.services import media_batch
+from core.src.app.services.answer_key_cache import answer_key_cache
+from core.src.app.services.export_service import ExportFormat, date_bounds, export_response
+from core.src.app.services.response_snapshot_cache import response_snapshot_cache
 from core.src.app.repositories.course import (
     TestRepository,
     TestQuestionRepository,
@@ -133,6 +138,7 @@ async def update_test(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Test with id {test_id} not found"
         )
+    response_snapshot_cache.invalidate_test(test_id)
     return test
 
 
@@ -143,12 +149,18 @@ async def delete_test(
 ):
     """Delete a test."""
     repository = TestRepository(session)
-    deleted = await repository.delete(test_id)
-    if not deleted:
+    if not await repository.get(test_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Test with id {test_id} not found"
         )
+    
+    # Изображения вопросов и вариантов теста удаляем в одной транзакции с тестом, S3 - после commit
+    deleted_media = await media_batch.delete_media_rows(session, media_batch.media_scope(test_id=test_id))
+    await repository.delete(test_id)
+    answer_key_cache.invalidate_test(test_id)
+    response_snapshot_cache.invalidate_test(test_id)
+    await media_batch.purge_deleted_media(deleted_media)
     return None
 
 
@@ -193,68 +205,42 @@ async def submit_test(
     session: AsyncSession = Depends(get_async_session)
 ):
     """Submit test answers and get results."""
-    from core.src.app.models.course import TestAttempt, TestAnswer
-    
-    # Get test with questions and options
+    # Get test and its compiled answer key
     test_repo = TestRepository(session)
-    test = await test_repo.get_with_questions(test_id)
+    test = await test_repo.get(test_id)
     if not test:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Test with id {test_id} not found"
         )
+    answer_key = await answer_key_cache.get_or_compile(session, test_id)
     
-    # Create a new attempt
-    attempt_repo = TestAttemptRepository(session)
-    attempt = await attempt_repo.create(
-        user_id=user_id,
-        test_id=test_id,
-        score=0,
-        total_points=0,
-        passed=False,
-        started_at=datetime.now(timezone.utc)
-    )
+    started_at = datetime.now(timezone.utc)
     
     # Process answers
     total_score = 0
     total_points = 0
+    answer_rows = []
     answer_results = []
-    answer_repo = TestAnswerRepository(session)
-    
-    # Create a map of questions for quick lookup
-    question_map = {q.id: q for q in test.questions}
     
     for answer_submit in submission.answers:
-        question = question_map.get(answer_submit.question_id)
+        question = answer_key.questions.get(answer_submit.question_id)
         if not question:
             continue
         
         total_points += question.points
-        is_correct = False
-        points_earned = 0
-        
-        # Check answer based on question type
-        if question.question_type.value in ["single_choice", "multiple_choice"]:
-            if answer_submit.selected_option_ids:
-                # Get correct option IDs
-                correct_option_ids = {opt.id for opt in question.options if opt.is_correct}
-                selected_option_ids = set(answer_submit.selected_option_ids)
-                
-                # Check if answer is correct
-                if correct_option_ids == selected_option_ids:
-                    is_correct = True
-                    points_earned = question.points
-                    total_score += points_earned
+        is_correct = question.grade(answer_submit.selected_option_ids)
+        points_earned = question.points if is_correct else 0
+        total_score += points_earned
         
-        # Store the answer
-        await answer_repo.create(
-            attempt_id=attempt.id,
-            question_id=question.id,
-            selected_option_ids=json.dumps(answer_submit.selected_option_ids) if answer_submit.selected_option_ids else None,
-            text_answer=answer_submit.text_answer,
-            is_correct=is_correct,
-            points_earned=points_earned
-        )
+        # Collect the answer for a single bulk insert
+        answer_rows.append({
+            "question_id": question.id,
+            "selected_option_ids": json.dumps(answer_submit.selected_option_ids) if answer_submit.selected_option_ids else None,
+            "text_answer": answer_submit.text_answer,
+            "is_correct": is_correct,
+            "points_earned": points_earned
+        })
         
         answer_results.append(TestAnswerResult(
             question_id=question.id,
@@ -266,14 +252,19 @@ async def submit_test(
             points_possible=question.points
         ))
     
-    # Update attempt with results
+    # Store the attempt with its final score and all answers in one transaction
     passed = total_score >= test.passing_score
-    await attempt_repo.update(
-        attempt.id,
+    completed_at = datetime.now(timezone.utc)
+    attempt_repo = TestAttemptRepository(session)
+    attempt = await attempt_repo.create_with_answers(
+        answer_rows,
+        user_id=user_id,
+        test_id=test_id,
         score=total_score,
         total_points=total_points,
         passed=passed,
-        completed_at=datetime.now(timezone.utc)
+        started_at=started_at,
+        completed_at=completed_at
     )
     
     return TestResult(
@@ -284,8 +275,8 @@ async def submit_test(
         total_points=total_points,
         passing_score=test.passing_score,
         passed=passed,
-        started_at=attempt.started_at,
-        completed_at=datetime.now(timezone.utc),
+        started_at=started_at,
+        completed_at=completed_at,
         answers=answer_results
     )
 
@@ -313,26 +304,51 @@ async def get_test_attempts(
     return attempts
 
 
+@router.get("/attempts/export", dependencies=[Depends(get_current_admin_user_id)])
+async def export_test_attempts(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    test_id: Optional[int] = None,
+    user_id: Optional[str] = None,
+):
+    """
+    Stream test attempts with their answers as NDJSON or CSV (superusers only).
+    
+    One row per answer; rows are read through a server-side cursor.
+    """
+    started_from, started_before = date_bounds(start_date, end_date)
+    stmt = TestAttemptRepository.export_query(started_from, started_before, test_id, user_id)
+    return export_response(async_session_maker, stmt, export_format, "test_attempts")
+
+
 @router.get("/attempts/user/{user_id}", response_model=List[TestAttemptResponse])
 async def get_user_all_attempts(
     user_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
     session: AsyncSession = Depends(get_async_session)
 ):
-    """Get all test attempts for a specific user across all tests."""
-    # Get all attempts for the user
+    """
+    Get test attempts for a specific user across all tests, newest first.
+    
+    Pass the X-Next-Cursor response header as cursor to get the next page.
+    """
     attempt_repo = TestAttemptRepository(session)
-    attempts = await attempt_repo.get_all_by_user(user_id)
+    attempts, next_cursor = await attempt_repo.get_all_by_user(user_id, cursor, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     # Преобразуем в response с информацией о тесте
-    response = []
-    for attempt in attempts: 
-        response.append({
+    return [
+        {
             **TestAttemptResponse.model_validate(attempt).model_dump(),
             "test_title": attempt.test.title if hasattr(attempt, 'test') and attempt.test else None,
             "test_id": attempt.test_id
-        })
-    
-    return response
+        }
+        for attempt in attempts
+    ]
 
 
 @router.get("/{test_id}/result/{attempt_id}", response_model=TestResult)
@@ -367,12 +383,13 @@ async def get_test_result(
             detail="Attempt does not belong to this test"
         )
     
-    # Get test details
+    # Get test details and the grading projection of its questions
     test_repo = TestRepository(session)
-    test = await test_repo.get_with_questions(test_id)
+    test = await test_repo.get(test_id)
+    answer_key = await answer_key_cache.get_or_compile(session, test_id)
     
     # Build answer results
-    question_map = {q.id: q for q in test.questions}
+    question_map = answer_key.questions
     answer_results = []
     
     for answer in attempt.answers:
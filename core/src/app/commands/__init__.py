@@ -0,0 +1 @@
+"""Maintenance commands for the core service."""
@@ -0,0 +1,42 @@
+"""
+Backfill persisted topic statistics of combined test attempts.
+
+Computes the per-source-test breakdown of completed attempts submitted
+before it was written at submit time, in ID-ordered batches.
+
+Usage:
+    python -m core.src.app.commands.backfill_attempt_topics [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import logging
+
+from core.src.app.db.database import async_session_maker
+from core.src.app.models import course_media  # noqa: F401 - register CourseMedia mapper
+from core.src.app.repositories.combined_test import CombinedTestAttemptRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill_attempt_topics(batch_size: int = 500) -> int:
+    """Backfill topic statistics for all attempts that are missing them."""
+    async with async_session_maker() as session:
+        return await CombinedTestAttemptRepository(session).backfill_topic_statistics(batch_size)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill combined test attempt topic statistics")
+    parser.add_argument("--batch-size", type=int, default=500, help="Attempts per batch")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    backfilled = asyncio.run(backfill_attempt_topics(args.batch_size))
+    logger.info(f"Done, {backfilled} attempts backfilled")
+
+
+if __name__ == "__main__":
+    main()
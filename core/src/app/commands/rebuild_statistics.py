@@ -0,0 +1,42 @@
+"""
+Rebuild combined test statistics summaries.
+
+Recomputes the per-user and per-user-per-topic summary tables from completed
+attempts and their answers.
+
+Usage:
+    python -m core.src.app.commands.rebuild_statistics [--user-id USER_ID]
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Optional
+
+from core.src.app.db.database import async_session_maker
+from core.src.app.models import course_media  # noqa: F401 - register CourseMedia mapper
+from core.src.app.repositories.combined_test import CombinedTestStatisticsRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_statistics(user_id: Optional[str] = None) -> None:
+    """Rebuild statistics summaries for one user or for all users."""
+    async with async_session_maker() as session:
+        await CombinedTestStatisticsRepository(session).rebuild(user_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild combined test statistics summaries")
+    parser.add_argument("--user-id", default=None, help="Rebuild a single user only")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    asyncio.run(rebuild_statistics(args.user_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,26 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     ROOT_PATH: str = ""
     AUTH_SERVICE_URL: str = "http://auth:8000"
+    AUTH_CURRENT_USER_PATH: str = "/v1/user/me"
+    AUTH_SERVICE_TIMEOUT: float = 5.0
+    
+    # Authentication Settings
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_MAX_TTL: int = 3600  # upper bound for tokens without (or with a distant) exp
+    ADMIN_CHECK_CACHE_TTL: int = 60  # how long a confirmed superuser token skips the auth round trip
+    
+    # Grading Settings
+    ANSWER_KEY_CACHE_SIZE: int = 1024
+    ANSWER_KEY_CACHE_TTL: int = 300
+    RESPONSE_SNAPSHOT_CACHE_SIZE: int = 512
+    RESPONSE_SNAPSHOT_CACHE_TTL: int = 3600
+    
+    # Pagination Settings
+    DEFAULT_PAGE_SIZE: int = 100
+    MAX_PAGE_SIZE: int = 1000
+    
+    # Export Settings
+    EXPORT_BATCH_SIZE: int = 1000
     
     # CORS Settings
     ALLOWED_ORIGINS: List[str] = [
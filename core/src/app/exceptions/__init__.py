@@ -13,6 +13,17 @@ from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 logger = logging.getLogger(__name__)
 
 
+# Custom Exception Classes
+class InvalidCursorError(HTTPException):
+    """Exception raised when a pagination cursor cannot be decoded."""
+    
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
 # Exception Handlers
 async def validation_error_handler(
     request: Request,
@@ -13,7 +13,7 @@ from starlette.middleware.gzip import GZipMiddleware
 
 from core.src.app.api import api_router
 from core.src.app.core.config import settings
-from core.src.app.db.database import create_db_and_tables
+from core.src.app.db.database import async_session_maker, create_db_and_tables
 from core.src.app.exceptions import (
     validation_error_handler,
     integrity_error_handler,
@@ -22,6 +22,9 @@ from core.src.app.exceptions import (
     add_process_time_header,
     log_requests,
 )
+from core.src.app.repositories.media_s3_config import media_s3_settings
+from core.src.app.services.media_reconciler import media_reconciler
+from core.src.app.services.token_cache import token_cache
 
 # Configure logging
 logging.basicConfig(
@@ -40,6 +43,15 @@ logging.getLogger('uvicorn.access').setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background jobs."""
+    if media_s3_settings.RECONCILER_ENABLED:
+        media_reconciler.start(async_session_maker)
+    yield
+    await media_reconciler.stop()
+
+
 # Create FastAPI application
 app = FastAPI(
     title=settings.APP_NAME,
@@ -49,6 +61,7 @@ app = FastAPI(
     openapi_url="/core/openapi.json",
     docs_url="/core/docs",
     redoc_url="/core/redoc",
+    lifespan=lifespan,
 )
 
 # CORS Middleware
@@ -58,6 +71,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Custom Middlewares
@@ -93,5 +107,6 @@ async def health_check():
     return {
         "status": "healthy",
         "app": settings.APP_NAME,
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "token_cache": token_cache.stats()
     }
\ No newline at end of file
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import String, BigInteger, Integer, Boolean, DateTime, ForeignKey, Text, func
+from sqlalchemy import String, BigInteger, Integer, Boolean, DateTime, ForeignKey, Index, Text, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from core.src.app.db.database import Base
 
@@ -96,6 +96,9 @@ class CombinedTestAttempt(Base):
     """User attempt at a combined test."""
     
     __tablename__ = "combined_test_attempts"
+    __table_args__ = (
+        Index("ix_combined_test_attempts_user_started_id", "user_id", "started_at", "id"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     combined_test_id: Mapped[int] = mapped_column(
@@ -115,6 +118,7 @@ class CombinedTestAttempt(Base):
         DateTime(timezone=True),
         nullable=True
     )
+    topic_statistics: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON array, written at submit
     
     # Relationships
     combined_test: Mapped["CombinedTest"] = relationship(
@@ -157,5 +161,46 @@ class CombinedTestAnswer(Base):
     question: Mapped["TestQuestion"] = relationship("TestQuestion")
 
 
+class CombinedTestUserStatistics(Base):
+    """Per-user summary of completed combined test attempts, maintained on submit."""
+    
+    __tablename__ = "combined_test_user_statistics"
+    
+    user_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    total_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_questions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_score: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    best_score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    worst_score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=True
+    )
+
+
+class CombinedTestUserTopicStatistics(Base):
+    """Per-user, per-source-test answer totals, maintained on submit."""
+    
+    __tablename__ = "combined_test_user_topic_statistics"
+    __table_args__ = (
+        UniqueConstraint("user_id", "test_id", name="uq_combined_test_user_topic_statistics_user_test"),
+    )
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    test_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("tests.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    total_answered: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    correct_answers: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    
+    # Relationships
+    test: Mapped["Test"] = relationship("Test")
+
+
 # Import Test and TestQuestion to avoid circular imports
 from core.src.app.models.course import Test, TestQuestion
\ No newline at end of file
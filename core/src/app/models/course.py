@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional, List, TYPE_CHECKING
 from enum import Enum as PyEnum
 
-from sqlalchemy import String, Text, BigInteger, Integer, Boolean, DateTime, Enum, ForeignKey, Numeric, func
+from sqlalchemy import String, Text, BigInteger, Integer, Boolean, DateTime, Enum, ForeignKey, Index, Numeric, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from core.src.app.db.database import Base
 
@@ -214,7 +214,7 @@ class TestQuestion(Base):
     __tablename__ = "test_questions"
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    test_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("tests.id", ondelete="CASCADE"), nullable=False)
+    test_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("tests.id", ondelete="CASCADE"), nullable=False, index=True)
     question_text: Mapped[str] = mapped_column(Text, nullable=False)
     question_type: Mapped[QuestionType] = mapped_column(
         Enum(QuestionType, values_callable=lambda x: [e.value for e in x]),
@@ -287,6 +287,9 @@ class TestAttempt(Base):
     """Test attempt tracking model."""
     
     __tablename__ = "test_attempts"
+    __table_args__ = (
+        Index("ix_test_attempts_user_started_id", "user_id", "started_at", "id"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
@@ -1,6 +1,6 @@
 # core/src/app/models/course_media.py - обновленная модель с user_id для бота
 
-from sqlalchemy import Column, String, Integer, DateTime, BigInteger, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, BigInteger, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from core.src.app.db.database import Base
@@ -8,7 +8,18 @@ import uuid
 
 class CourseMedia(Base):
     __tablename__ = "course_media"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Индексы для keyset-пагинации списков медиа и фото пользователя
+        Index('ix_course_media_created_id', 'created_at', 'id'),
+        Index('ix_course_media_user_created_id', 'user_id', 'created_at', 'id'),
+        # Объект без хэша принадлежит ровно одной записи (общими бывают только объекты из media_objects)
+        Index(
+            'ux_course_media_s3_key_unhashed', 's3_key', unique=True,
+            postgresql_where=text('content_hash IS NULL'),
+            sqlite_where=text('content_hash IS NULL'),
+        ),
+        {'extend_existing': True},
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     filename = Column(String, nullable=False)
@@ -17,7 +28,8 @@ class CourseMedia(Base):
     size = Column(BigInteger, nullable=False)
     content_type = Column(String, nullable=False)
     media_type = Column(String, nullable=False)  # 'image' или 'video'
-    s3_key = Column(String, nullable=False, unique=True)
+    s3_key = Column(String, nullable=False, index=True)  # один объект может принадлежать нескольким записям
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 содержимого (см. MediaObject)
     
     # Привязка к курсу/уроку
     course_id = Column(Integer, ForeignKey('courses.id'), nullable=True)
@@ -63,6 +75,7 @@ class CourseMedia(Base):
             'content_type': self.content_type,
             'media_type': self.media_type,
             's3_key': self.s3_key,
+            'content_hash': self.content_hash,
             'course_id': self.course_id,
             'lesson_id': self.lesson_id,
             'question_option_id': self. question_option_id,
@@ -74,4 +87,75 @@ class CourseMedia(Base):
             'uploaded_by': self.uploaded_by,
             'created_at': self. created_at.isoformat() if self.created_at else None,
             'updated_at':  self.updated_at.isoformat() if self.updated_at else None,
-        }
\ No newline at end of file
+        }
+
+
+class MediaObject(Base):
+    """Объект в S3, общий для всех CourseMedia с одинаковым содержимым"""
+    __tablename__ = "media_objects"
+    __table_args__ = {'extend_existing': True}
+    
+    content_hash = Column(String(64), primary_key=True)  # SHA-256
+    s3_key = Column(String, nullable=False, unique=True)
+    size = Column(BigInteger, nullable=False)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    ref_count = Column(Integer, nullable=False, default=1)  # число CourseMedia, ссылающихся на объект
+    created_at = Column(DateTime, default=func.now())
+
+
+class MediaUploadSession(Base):
+    """Возобновляемая multipart-загрузка через API (состояние переживает рестарт)"""
+    __tablename__ = "media_upload_sessions"
+    __table_args__ = {'extend_existing': True}
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    s3_key = Column(String, nullable=False, unique=True)
+    upload_id = Column(String, nullable=False)  # UploadId multipart-загрузки в S3
+    filename = Column(String, nullable=False)
+    custom_name = Column(String, nullable=True)
+    content_type = Column(String, nullable=False)
+    media_type = Column(String, nullable=False)  # 'image' или 'video'
+    size = Column(BigInteger, nullable=False)
+    part_size = Column(Integer, nullable=False)
+    
+    course_id = Column(Integer, ForeignKey('courses.id', ondelete='SET NULL'), nullable=True)
+    lesson_id = Column(Integer, ForeignKey('lessons.id', ondelete='SET NULL'), nullable=True)
+    user_id = Column(Integer, nullable=True)
+    
+    status = Column(String, nullable=False, default='active')  # active / completed / aborted
+    media_id = Column(String, nullable=True)  # CourseMedia.id после complete
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    parts = relationship(
+        "MediaUploadPart",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        order_by="MediaUploadPart.part_number"
+    )
+    
+    @property
+    def total_parts(self) -> int:
+        return max(1, -(-self.size // self.part_size))
+    
+    def expected_part_size(self, part_number: int) -> int:
+        """Размер части: все, кроме последней, ровно part_size"""
+        if part_number < self.total_parts:
+            return self.part_size
+        return self.size - self.part_size * (self.total_parts - 1)
+
+
+class MediaUploadPart(Base):
+    """Часть multipart-загрузки, уже принятая S3"""
+    __tablename__ = "media_upload_parts"
+    __table_args__ = {'extend_existing': True}
+    
+    session_id = Column(String, ForeignKey('media_upload_sessions.id', ondelete='CASCADE'), primary_key=True)
+    part_number = Column(Integer, primary_key=True)
+    etag = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime, default=func.now())
+    
+    session = relationship("MediaUploadSession", back_populates="parts")
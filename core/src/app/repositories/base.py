@@ -1,19 +1,154 @@
 """Base repository with common database operations."""
 
+import base64
+import json
 import logging
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from datetime import date, datetime
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Select, insert, literal, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.src.app.db.database import Base
+from core.src.app.exceptions import InvalidCursorError
 
 logger = logging.getLogger(__name__)
 
 ModelType = TypeVar("ModelType", bound=Base)
 
 
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort key values of the last row of a page as an opaque cursor.
+    
+    Args:
+        values: Sort key values, the primary key last
+        
+    Returns:
+        str: URL-safe cursor string
+    """
+    payload = [
+        value.isoformat() if isinstance(value, (datetime, date))
+        else str(value) if isinstance(value, UUID)
+        else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor back into sort key values.
+    
+    Args:
+        cursor: Cursor string
+        columns: Sort key columns the cursor was built from
+        
+    Returns:
+        List[Any]: Sort key values converted to the column python types
+        
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return [_parse_cursor_value(value, column) for value, column in zip(values, columns)]
+    except (ValueError, TypeError):
+        raise InvalidCursorError()
+
+
+def _parse_cursor_value(value: Any, column: Any) -> Any:
+    """Convert a JSON cursor value to the python type of its column."""
+    if value is None:
+        return None
+    
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+async def keyset_paginate(
+    session: AsyncSession,
+    stmt: Select,
+    sort_columns: Sequence[Any],
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    descending: bool = True,
+    skip: int = 0
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of a query using keyset (seek) pagination.
+    
+    The page starts right after the row the cursor points to, so the
+    database seeks through the index on sort_columns instead of scanning
+    and discarding OFFSET rows. sort_columns must be non-nullable and end
+    with a unique column (normally the primary key) to make the order total.
+    
+    Args:
+        session: Async database session
+        stmt: SELECT of a single entity, without ORDER BY/LIMIT
+        sort_columns: Sort key columns, the unique column last
+        cursor: Cursor returned with the previous page
+        limit: Maximum number of rows to return
+        descending: Sort direction of every sort key column
+        skip: Deprecated OFFSET for clients that still page with skip;
+            ignored when a cursor is given
+        
+    Returns:
+        Tuple[List[Any], Optional[str]]: Page rows and the cursor of the next
+        page (None on the last page)
+    """
+    if cursor:
+        values = decode_cursor(cursor, sort_columns)
+        key = tuple_(*sort_columns)
+        bound = tuple_(*(literal(value, column.type) for value, column in zip(values, sort_columns)))
+        stmt = stmt.where(key < bound if descending else key > bound)
+    elif skip:
+        stmt = stmt.offset(skip)
+    
+    order_by = [column.desc() if descending else column.asc() for column in sort_columns]
+    result = await session.execute(stmt.order_by(*order_by).limit(limit + 1))
+    items = list(result.unique().scalars().all())
+    
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor([getattr(items[-1], column.key) for column in sort_columns])
+    
+    return items, next_cursor
+
+
+def dialect_insert(session: AsyncSession, model: Type[Base]):
+    """
+    Get a dialect-specific INSERT supporting ON CONFLICT clauses.
+    
+    Args:
+        session: Async database session
+        model: SQLAlchemy model class
+        
+    Returns:
+        Insert: PostgreSQL or SQLite INSERT construct
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_specific_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_specific_insert
+    
+    return dialect_specific_insert(model)
+
+
 class BaseRepository(Generic[ModelType]):
     """Base repository for database operations."""
     
@@ -28,6 +163,18 @@ class BaseRepository(Generic[ModelType]):
         self.model = model
         self.session = session
     
+    def dialect_insert(self, model: Optional[Type[Base]] = None):
+        """
+        Get a dialect-specific INSERT supporting ON CONFLICT clauses.
+        
+        Args:
+            model: SQLAlchemy model class (defaults to the repository model)
+            
+        Returns:
+            Insert: PostgreSQL or SQLite INSERT construct
+        """
+        return dialect_insert(self.session, model or self.model)
+    
     async def get(self, id_: Union[UUID, int]) -> Optional[ModelType]:
         """
         Get entity by ID.
@@ -63,6 +210,40 @@ class BaseRepository(Generic[ModelType]):
         )
         return list(result.scalars().all())
     
+    async def paginate(
+        self,
+        stmt: Optional[Select] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        sort_columns: Optional[Sequence[Any]] = None,
+        descending: bool = True,
+        skip: int = 0
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Get a page of entities using keyset pagination.
+        
+        Args:
+            stmt: Filtered SELECT of the model (defaults to all entities)
+            cursor: Cursor returned with the previous page
+            limit: Maximum number of records to return
+            sort_columns: Sort key columns ending with a unique column
+                (defaults to the primary key)
+            descending: Sort direction
+            skip: Deprecated OFFSET fallback, ignored when a cursor is given
+            
+        Returns:
+            Tuple[List[ModelType], Optional[str]]: Entities and next page cursor
+        """
+        return await keyset_paginate(
+            self.session,
+            stmt if stmt is not None else select(self.model),
+            sort_columns or [self.model.id],
+            cursor=cursor,
+            limit=limit,
+            descending=descending,
+            skip=skip
+        )
+    
     async def create(self, **kwargs: Any) -> ModelType:
         """
         Create new entity.
@@ -84,6 +265,31 @@ class BaseRepository(Generic[ModelType]):
         
         return instance
     
+    async def bulk_create(
+        self,
+        rows: List[Dict[str, Any]],
+        commit: bool = True
+    ) -> int:
+        """
+        Insert many entities with a single multi-row INSERT.
+        
+        Args:
+            rows: List of entity attribute dicts
+            commit: Commit the transaction after inserting
+            
+        Returns:
+            int: Number of inserted rows
+        """
+        if rows:
+            await self.session.execute(insert(self.model), rows)
+        
+        if commit:
+            await self.session.commit()
+        
+        logger.info(f"Bulk created {len(rows)} {self.model.__name__} rows")
+        
+        return len(rows)
+    
     async def update(self, id_: Union[UUID, int], **kwargs: Any) -> Optional[ModelType]:
         """
         Update entity.
@@ -111,12 +317,13 @@ class BaseRepository(Generic[ModelType]):
         
         return instance
     
-    async def delete(self, id_: Union[UUID, int]) -> bool:
+    async def delete(self, id_: Union[UUID, int], commit: bool = True) -> bool:
         """
         Delete entity.
         
         Args:
             id_: Entity ID (UUID or int)
+            commit: Commit the transaction after deleting
             
         Returns:
             bool: True if deleted, False if not found
@@ -127,7 +334,10 @@ class BaseRepository(Generic[ModelType]):
             return False
         
         await self.session.delete(instance)
-        await self.session.commit()
+        if commit:
+            await self.session.commit()
+        else:
+            await self.session.flush()
         
         logger.info(f"Deleted {self.model.__name__} with ID: {id_}")
         
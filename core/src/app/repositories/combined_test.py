@@ -1,7 +1,10 @@
 """Repository for combined test operations."""
 
-from typing import List, Optional
-from sqlalchemy import select, and_, func
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Select, select, and_, case, delete, func, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, joinedload
 
@@ -11,11 +14,16 @@ from core.src.app.models.combined_test import (
     CombinedTestQuestion,
     CombinedTestAttempt,
     CombinedTestAnswer,
+    CombinedTestUserStatistics,
+    CombinedTestUserTopicStatistics,
 )
 from core.src.app.models.course import Test, TestQuestion
 from core.src.app.repositories.base import BaseRepository
 from core.src.app.models.course import QuestionOption
 
+logger = logging.getLogger(__name__)
+
+
 class CombinedTestRepository(BaseRepository[CombinedTest]):
     """Repository for CombinedTest operations."""
     
@@ -57,6 +65,19 @@ class CombinedTestRepository(BaseRepository[CombinedTest]):
         )
         result = await self. session.execute(stmt)
         return result.unique().scalar_one_or_none()
+    
+    async def get_with_sources(self, test_id: int) -> Optional[CombinedTest]:
+        """Get combined test with source tests loaded, without questions."""
+        stmt = (
+            select(CombinedTest)
+            .options(
+                selectinload(CombinedTest.source_tests)
+                    .joinedload(CombinedTestSource.source_test)
+            )
+            .where(CombinedTest.id == test_id)
+        )
+        result = await self.session.execute(stmt)
+        return result.unique().scalar_one_or_none()
 
 
 class CombinedTestSourceRepository(BaseRepository[CombinedTestSource]):
@@ -81,6 +102,14 @@ class CombinedTestQuestionRepository(BaseRepository[CombinedTestQuestion]):
     
     def __init__(self, session: AsyncSession):
         super().__init__(CombinedTestQuestion, session)
+    
+    async def get_question_ids(self, combined_test_id: int) -> List[int]:
+        """Get IDs of all questions included in a combined test."""
+        stmt = select(CombinedTestQuestion.question_id).where(
+            CombinedTestQuestion.combined_test_id == combined_test_id
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
 
 
 class CombinedTestAttemptRepository(BaseRepository[CombinedTestAttempt]):
@@ -89,13 +118,68 @@ class CombinedTestAttemptRepository(BaseRepository[CombinedTestAttempt]):
     def __init__(self, session: AsyncSession):
         super().__init__(CombinedTestAttempt, session)
     
+    @staticmethod
+    def export_query(
+        started_from: Optional[datetime] = None,
+        started_before: Optional[datetime] = None,
+        combined_test_id: Optional[int] = None,
+        source_test_id: Optional[int] = None,
+        user_id: Optional[str] = None
+    ) -> Select:
+        """
+        Build a flat attempt/answer column query for bulk exports.
+        
+        One row per answer with the source test of its question. Filtering by
+        source_test_id keeps only answers to questions of that test.
+        """
+        source_test = Test.__table__.alias("source_test")
+        stmt = (
+            select(
+                CombinedTestAttempt.id.label("attempt_id"),
+                CombinedTestAttempt.combined_test_id,
+                CombinedTest.title.label("combined_test_title"),
+                CombinedTestAttempt.user_id,
+                CombinedTestAttempt.score,
+                CombinedTestAttempt.total_questions,
+                CombinedTestAttempt.started_at,
+                CombinedTestAttempt.completed_at,
+                CombinedTestAnswer.id.label("answer_id"),
+                CombinedTestAnswer.question_id,
+                TestQuestion.test_id.label("source_test_id"),
+                source_test.c.title.label("source_test_title"),
+                CombinedTestAnswer.selected_option_ids,
+                CombinedTestAnswer.text_answer,
+                CombinedTestAnswer.is_correct,
+                CombinedTestAnswer.points_earned,
+            )
+            .join(CombinedTest, CombinedTest.id == CombinedTestAttempt.combined_test_id)
+            .outerjoin(CombinedTestAnswer, CombinedTestAnswer.attempt_id == CombinedTestAttempt.id)
+            .outerjoin(TestQuestion, TestQuestion.id == CombinedTestAnswer.question_id)
+            .outerjoin(source_test, source_test.c.id == TestQuestion.test_id)
+            .order_by(CombinedTestAttempt.id, CombinedTestAnswer.id)
+        )
+        
+        if started_from:
+            stmt = stmt.where(CombinedTestAttempt.started_at >= started_from)
+        if started_before:
+            stmt = stmt.where(CombinedTestAttempt.started_at < started_before)
+        if combined_test_id:
+            stmt = stmt.where(CombinedTestAttempt.combined_test_id == combined_test_id)
+        if source_test_id:
+            stmt = stmt.where(TestQuestion.test_id == source_test_id)
+        if user_id:
+            stmt = stmt.where(CombinedTestAttempt.user_id == user_id)
+        
+        return stmt
+    
     async def get_user_attempts(
         self, 
         user_id: str,
-        skip: int = 0,
-        limit: int = 100
-    ) -> List:
-        """Get all attempts for a user."""
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        skip: int = 0
+    ) -> Tuple[List, Optional[str]]:
+        """Get a page of attempts for a user, newest first, and the next page cursor."""
         from core.src.app.models. combined_test import CombinedTestAttempt
         stmt = (
             select(CombinedTestAttempt)
@@ -103,12 +187,14 @@ class CombinedTestAttemptRepository(BaseRepository[CombinedTestAttempt]):
                 joinedload(CombinedTestAttempt.combined_test)
             )
             .where(CombinedTestAttempt. user_id == user_id)
-            .order_by(CombinedTestAttempt. started_at.desc())
-            .offset(skip)
-            .limit(limit)
         )
-        result = await self.session.execute(stmt)
-        return list(result.unique().scalars().all())
+        return await self.paginate(
+            stmt,
+            cursor=cursor,
+            limit=limit,
+            sort_columns=[CombinedTestAttempt.started_at, CombinedTestAttempt.id],
+            skip=skip
+        )
     
     async def get_with_answers(self, attempt_id:  int):
         """Get attempt with all answers and related data including media."""
@@ -139,25 +225,200 @@ class CombinedTestAttemptRepository(BaseRepository[CombinedTestAttempt]):
         result = await self.session.execute(stmt)
         return result.unique().scalar_one_or_none()
     
-    async def get_user_statistics(self, user_id: str) -> dict:
-        """Get overall statistics for a user."""
-        # Get all completed attempts
+    async def get_with_combined_test(self, attempt_id: int) -> Optional[CombinedTestAttempt]:
+        """Get attempt with its combined test joined in a single query."""
         stmt = (
             select(CombinedTestAttempt)
-            .options(
-                selectinload(CombinedTestAttempt.answers).joinedload(CombinedTestAnswer.question).joinedload(TestQuestion.test)
+            .options(joinedload(CombinedTestAttempt.combined_test))
+            .where(CombinedTestAttempt.id == attempt_id)
+        )
+        result = await self.session.execute(stmt)
+        return result.unique().scalar_one_or_none()
+    
+    async def compute_topic_statistics(self, attempt_ids: List[int]) -> Dict[int, List[dict]]:
+        """
+        Aggregate per-source-test totals of attempts from their answers.
+        
+        Returns:
+            Dict[int, List[dict]]: Attempt ID -> topic statistics entries
+        """
+        stmt = (
+            select(
+                CombinedTestAnswer.attempt_id,
+                TestQuestion.test_id,
+                Test.title,
+                func.count(CombinedTestAnswer.id).label("total"),
+                func.sum(case((CombinedTestAnswer.is_correct == True, 1), else_=0)).label("correct"),
             )
-            .where(
-                and_(
-                    CombinedTestAttempt.user_id == user_id,
-                    CombinedTestAttempt.completed_at. isnot(None)
+            .join(TestQuestion, TestQuestion.id == CombinedTestAnswer.question_id)
+            .join(Test, Test.id == TestQuestion.test_id)
+            .where(CombinedTestAnswer.attempt_id.in_(attempt_ids))
+            .group_by(CombinedTestAnswer.attempt_id, TestQuestion.test_id, Test.title)
+            .order_by(CombinedTestAnswer.attempt_id, TestQuestion.test_id)
+        )
+        result = await self.session.execute(stmt)
+        
+        topic_statistics = {attempt_id: [] for attempt_id in attempt_ids}
+        for row in result.all():
+            topic_statistics[row.attempt_id].append({
+                "test_id": row.test_id,
+                "test_title": row.title,
+                "total_questions_answered": row.total,
+                "correct_answers": row.correct or 0,
+            })
+        return topic_statistics
+    
+    async def backfill_topic_statistics(self, batch_size: int = 500) -> int:
+        """
+        Persist topic statistics for completed attempts that do not have them.
+        
+        Attempts are processed in ID order, one batch and one commit at a time.
+        
+        Returns:
+            int: Number of backfilled attempts
+        """
+        backfilled = 0
+        last_id = 0
+        while True:
+            result = await self.session.execute(
+                select(CombinedTestAttempt.id)
+                .where(
+                    CombinedTestAttempt.id > last_id,
+                    CombinedTestAttempt.completed_at.isnot(None),
+                    CombinedTestAttempt.topic_statistics.is_(None)
                 )
+                .order_by(CombinedTestAttempt.id)
+                .limit(batch_size)
+            )
+            attempt_ids = list(result.scalars().all())
+            if not attempt_ids:
+                break
+            
+            topic_statistics = await self.compute_topic_statistics(attempt_ids)
+            await self.session.execute(
+                update(CombinedTestAttempt),
+                [
+                    {"id": attempt_id, "topic_statistics": json.dumps(topics)}
+                    for attempt_id, topics in topic_statistics.items()
+                ]
             )
+            await self.session.commit()
+            
+            backfilled += len(attempt_ids)
+            last_id = attempt_ids[-1]
+            logger.info(f"Backfilled topic statistics for {backfilled} attempts")
+        
+        return backfilled
+    
+    async def create_with_answers(
+        self,
+        answers: List[dict],
+        topics: Dict[int, Tuple[int, int]],
+        **kwargs
+    ) -> CombinedTestAttempt:
+        """
+        Create a graded attempt and all of its answers in one transaction.
+        
+        The attempt row is flushed to obtain its ID, the answers are written
+        with a single multi-row INSERT, the user's statistics summaries are
+        updated from ``topics`` (source test ID -> (answered, correct)) and
+        everything is committed once.
+        """
+        attempt = CombinedTestAttempt(**kwargs)
+        self.session.add(attempt)
+        await self.session.flush()
+        
+        await CombinedTestAnswerRepository(self.session).bulk_create(
+            [{**answer, "attempt_id": attempt.id} for answer in answers],
+            commit=False
         )
-        result = await self. session.execute(stmt)
-        attempts = list(result.unique().scalars().all())
+        await CombinedTestStatisticsRepository(self.session).record_attempt(attempt, topics)
+        await self.session.commit()
+        
+        logger.info(f"Created CombinedTestAttempt {attempt.id} with {len(answers)} answers")
         
-        if not attempts:
+        return attempt
+
+
+class CombinedTestAnswerRepository(BaseRepository[CombinedTestAnswer]):
+    """Repository for CombinedTestAnswer operations."""
+    
+    def __init__(self, session: AsyncSession):
+        super().__init__(CombinedTestAnswer, session)
+
+
+class CombinedTestStatisticsRepository(BaseRepository[CombinedTestUserStatistics]):
+    """
+    Repository for the per-user combined test statistics summaries.
+    
+    The summaries are updated incrementally by record_attempt when an attempt
+    is submitted and can be recomputed from attempts and answers by rebuild.
+    """
+    
+    def __init__(self, session: AsyncSession):
+        super().__init__(CombinedTestUserStatistics, session)
+    
+    async def record_attempt(
+        self,
+        attempt: CombinedTestAttempt,
+        topics: Dict[int, Tuple[int, int]]
+    ) -> None:
+        """Add a completed attempt to the user's summaries without committing."""
+        stats = CombinedTestUserStatistics
+        stmt = self.dialect_insert(stats).values(
+            user_id=attempt.user_id,
+            total_attempts=1,
+            total_questions=attempt.total_questions,
+            total_score=attempt.score,
+            best_score=attempt.score,
+            worst_score=attempt.score,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[stats.user_id],
+            set_={
+                "total_attempts": stats.total_attempts + 1,
+                "total_questions": stats.total_questions + stmt.excluded.total_questions,
+                "total_score": stats.total_score + stmt.excluded.total_score,
+                "best_score": case(
+                    (stats.best_score >= stmt.excluded.best_score, stats.best_score),
+                    else_=stmt.excluded.best_score
+                ),
+                "worst_score": case(
+                    (stats.worst_score <= stmt.excluded.worst_score, stats.worst_score),
+                    else_=stmt.excluded.worst_score
+                ),
+                "updated_at": func.now(),
+            }
+        )
+        await self.session.execute(stmt)
+        
+        if not topics:
+            return
+        
+        topic_stats = CombinedTestUserTopicStatistics
+        stmt = self.dialect_insert(topic_stats).values([
+            {
+                "user_id": attempt.user_id,
+                "test_id": test_id,
+                "total_answered": answered,
+                "correct_answers": correct,
+            }
+            for test_id, (answered, correct) in topics.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[topic_stats.user_id, topic_stats.test_id],
+            set_={
+                "total_answered": topic_stats.total_answered + stmt.excluded.total_answered,
+                "correct_answers": topic_stats.correct_answers + stmt.excluded.correct_answers,
+            }
+        )
+        await self.session.execute(stmt)
+    
+    async def get_user_statistics(self, user_id: str) -> dict:
+        """Get overall statistics for a user from the summary tables."""
+        stats = await self.get_by_user(user_id)
+        
+        if not stats or not stats.total_attempts:
             return {
                 "total_attempts": 0,
                 "total_questions": 0,
@@ -169,56 +430,123 @@ class CombinedTestAttemptRepository(BaseRepository[CombinedTestAttempt]):
                 "topics":  []
             }
         
-        # Calculate statistics
-        total_attempts = len(attempts)
-        total_questions = sum(a.total_questions for a in attempts)
-        correct_answers = sum(a.score for a in attempts)
-        scores = [a.score for a in attempts]
-        
-        # Topic statistics
-        topic_stats = {}
-        for attempt in attempts:
-            for answer in attempt.answers:
-                test_id = answer.question.test_id
-                test_title = answer.question.test. title
-                
-                if test_id not in topic_stats:
-                    topic_stats[test_id] = {
-                        "test_id": test_id,
-                        "test_title": test_title,
-                        "total":  0,
-                        "correct": 0
-                    }
-                
-                topic_stats[test_id]["total"] += 1
-                if answer.is_correct:
-                    topic_stats[test_id]["correct"] += 1
+        stmt = (
+            select(
+                CombinedTestUserTopicStatistics.test_id,
+                Test.title,
+                CombinedTestUserTopicStatistics.total_answered,
+                CombinedTestUserTopicStatistics.correct_answers,
+            )
+            .join(Test, Test.id == CombinedTestUserTopicStatistics.test_id)
+            .where(CombinedTestUserTopicStatistics.user_id == user_id)
+        )
+        result = await self.session.execute(stmt)
         
         topics = [
             {
-                "test_id": stats["test_id"],
-                "test_title": stats["test_title"],
-                "total_questions_answered": stats["total"],
-                "correct_answers": stats["correct"],
-                "percentage": (stats["correct"] / stats["total"] * 100) if stats["total"] > 0 else 0.0
+                "test_id": row.test_id,
+                "test_title": row.title,
+                "total_questions_answered": row.total_answered,
+                "correct_answers": row.correct_answers,
+                "percentage": (row.correct_answers / row.total_answered * 100) if row.total_answered > 0 else 0.0
             }
-            for stats in topic_stats.values()
+            for row in result.all()
         ]
         
         return {
-            "total_attempts": total_attempts,
-            "total_questions": total_questions,
-            "correct_answers": correct_answers,
-            "overall_percentage":  (correct_answers / total_questions * 100) if total_questions > 0 else 0.0,
-            "best_score": max(scores),
-            "worst_score": min(scores),
-            "average_score": sum(scores) / len(scores),
+            "total_attempts": stats.total_attempts,
+            "total_questions": stats.total_questions,
+            "correct_answers": stats.total_score,
+            "overall_percentage": (stats.total_score / stats.total_questions * 100) if stats.total_questions > 0 else 0.0,
+            "best_score": stats.best_score,
+            "worst_score": stats.worst_score,
+            "average_score": stats.total_score / stats.total_attempts,
             "topics": topics
         }
-
-
-class CombinedTestAnswerRepository(BaseRepository[CombinedTestAnswer]):
-    """Repository for CombinedTestAnswer operations."""
     
-    def __init__(self, session: AsyncSession):
-        super().__init__(CombinedTestAnswer, session)
\ No newline at end of file
+    async def get_by_user(self, user_id: str) -> Optional[CombinedTestUserStatistics]:
+        """Get the summary row of a user."""
+        stmt = select(CombinedTestUserStatistics).where(
+            CombinedTestUserStatistics.user_id == user_id
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+    
+    async def rebuild(self, user_id: Optional[str] = None, commit: bool = True) -> None:
+        """
+        Recompute the summaries from completed attempts and their answers.
+        
+        Uses set-based INSERT ... SELECT statements, so the work is done by
+        the database regardless of history size.
+        
+        Args:
+            user_id: Rebuild a single user (all users if None)
+            commit: Commit the transaction (otherwise the caller commits)
+        """
+        user_filter = []
+        if user_id is not None:
+            user_filter.append(CombinedTestAttempt.user_id == user_id)
+        
+        delete_stats = delete(CombinedTestUserStatistics)
+        delete_topics = delete(CombinedTestUserTopicStatistics)
+        if user_id is not None:
+            delete_stats = delete_stats.where(CombinedTestUserStatistics.user_id == user_id)
+            delete_topics = delete_topics.where(CombinedTestUserTopicStatistics.user_id == user_id)
+        await self.session.execute(delete_stats)
+        await self.session.execute(delete_topics)
+        
+        await self.session.execute(
+            insert(CombinedTestUserStatistics).from_select(
+                ["user_id", "total_attempts", "total_questions", "total_score", "best_score", "worst_score"],
+                select(
+                    CombinedTestAttempt.user_id,
+                    func.count(CombinedTestAttempt.id),
+                    func.sum(CombinedTestAttempt.total_questions),
+                    func.sum(CombinedTestAttempt.score),
+                    func.max(CombinedTestAttempt.score),
+                    func.min(CombinedTestAttempt.score),
+                )
+                .where(CombinedTestAttempt.completed_at.isnot(None), *user_filter)
+                .group_by(CombinedTestAttempt.user_id)
+            )
+        )
+        await self.session.execute(
+            insert(CombinedTestUserTopicStatistics).from_select(
+                ["user_id", "test_id", "total_answered", "correct_answers"],
+                self._topic_totals_query(*user_filter)
+            )
+        )
+        if commit:
+            await self.session.commit()
+        
+        logger.info(f"Rebuilt combined test statistics for {user_id or 'all users'}")
+    
+    async def rebuild_topics_for_test(self, test_id: int) -> None:
+        """Recompute all users' topic totals of one source test without committing."""
+        await self.session.execute(
+            delete(CombinedTestUserTopicStatistics)
+            .where(CombinedTestUserTopicStatistics.test_id == test_id)
+        )
+        await self.session.execute(
+            insert(CombinedTestUserTopicStatistics).from_select(
+                ["user_id", "test_id", "total_answered", "correct_answers"],
+                self._topic_totals_query(TestQuestion.test_id == test_id)
+            )
+        )
+    
+    @staticmethod
+    def _topic_totals_query(*filters):
+        """Aggregate answers of completed attempts by user and source test."""
+        return (
+            select(
+                CombinedTestAttempt.user_id,
+                TestQuestion.test_id,
+                func.count(CombinedTestAnswer.id),
+                func.sum(case((CombinedTestAnswer.is_correct == True, 1), else_=0)),
+            )
+            .select_from(CombinedTestAnswer)
+            .join(CombinedTestAttempt, CombinedTestAttempt.id == CombinedTestAnswer.attempt_id)
+            .join(TestQuestion, TestQuestion.id == CombinedTestAnswer.question_id)
+            .where(CombinedTestAttempt.completed_at.isnot(None), *filters)
+            .group_by(CombinedTestAttempt.user_id, TestQuestion.test_id)
+        )
@@ -1,7 +1,9 @@
 """Repository for course-related database operations."""
 
-from typing import List, Optional
-from sqlalchemy import select, and_
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import Row, Select, select, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -22,6 +24,8 @@ from core.src.app.models.course import (
 )
 from core.src.app.repositories.base import BaseRepository
 
+logger = logging.getLogger(__name__)
+
 
 class CourseRepository(BaseRepository[Course]):
     """Repository for Course model."""
@@ -152,16 +156,52 @@ class TestRepository(BaseRepository[Test]):
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
     
-    async def get_for_combined(self) -> List[Test]:
-        """Get all tests available for combining with questions loaded."""
+    async def get_for_combined(self) -> List[Row]:
+        """
+        Get all tests available for combining with their question counts.
+        
+        Counts come from a GROUP BY subquery, question rows are never loaded.
+        Returns rows of (Test, question_count).
+        """
+        question_counts = (
+            select(
+                TestQuestion.test_id,
+                func.count(TestQuestion.id).label("question_count"),
+            )
+            .group_by(TestQuestion.test_id)
+            .subquery()
+        )
         stmt = (
-            select(Test)
+            select(
+                Test,
+                func.coalesce(question_counts.c.question_count, 0).label("question_count"),
+            )
+            .outerjoin(question_counts, question_counts.c.test_id == Test.id)
             .where(Test.test_type == TestType.FOR_COMBINED)
-            .options(selectinload(Test.questions))  # Добавьте эту строку!
             .order_by(Test.created_at.desc())
         )
         result = await self.session.execute(stmt)
-        return list(result.scalars().all())
+        return list(result.all())
+    
+    async def get_question_counts(self, test_ids: List[int]) -> List[Row]:
+        """
+        Get tests with their question counts in a single aggregate query.
+        
+        Returns plain rows with id, title, test_type and question_count.
+        """
+        stmt = (
+            select(
+                Test.id,
+                Test.title,
+                Test.test_type,
+                func.count(TestQuestion.id).label("question_count"),
+            )
+            .outerjoin(TestQuestion, TestQuestion.test_id == Test.id)
+            .where(Test.id.in_(test_ids))
+            .group_by(Test.id, Test.title, Test.test_type)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.all())
     
     async def get_weekly_tests(self) -> List[Test]:
         """Get all weekly tests."""
@@ -190,6 +230,36 @@ class TestRepository(BaseRepository[Test]):
         )
         result = await self.session.execute(stmt)
         return result.unique().scalar_one_or_none()
+    
+    async def get_grading_rows(self, test_ids: List[int]) -> List[Row]:
+        """
+        Get the grading projection for tests as plain rows.
+        
+        One row per question and correct option (``correct_option_id`` is
+        None for questions without correct options). No ORM entities and no
+        media relationships are loaded.
+        """
+        stmt = (
+            select(
+                TestQuestion.test_id,
+                TestQuestion.id.label("question_id"),
+                TestQuestion.question_text,
+                TestQuestion.question_type,
+                TestQuestion.points,
+                QuestionOption.id.label("correct_option_id"),
+            )
+            .outerjoin(
+                QuestionOption,
+                and_(
+                    QuestionOption.question_id == TestQuestion.id,
+                    QuestionOption.is_correct == True
+                )
+            )
+            .where(TestQuestion.test_id.in_(test_ids))
+            .order_by(TestQuestion.test_id, TestQuestion.id)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.all())
 
 
 # Import TestQuestion to avoid circular imports
@@ -350,18 +420,74 @@ class TestAttemptRepository(BaseRepository["TestAttempt"]):
         ).order_by(TestAttempt.started_at.desc())
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
-
-
-    async def get_all_by_user(self, user_id: str) -> List:
-            """Get all attempts for a user across all tests."""
-            from core. src.app.models.course import TestAttempt, Test
-            stmt = select(TestAttempt).options(
-                selectinload(TestAttempt.test)  # Загружаем связанный тест для получения его названия
-            ).where(
-                TestAttempt.user_id == user_id
-            ).order_by(TestAttempt.started_at.desc())
-            result = await self.session.execute(stmt)
-            return list(result.scalars().all())
+    
+    @staticmethod
+    def export_query(
+        started_from: Optional[datetime] = None,
+        started_before: Optional[datetime] = None,
+        test_id: Optional[int] = None,
+        user_id: Optional[str] = None
+    ) -> Select:
+        """
+        Build a flat attempt/answer column query for bulk exports.
+        
+        One row per answer, attempts without answers get a single row with
+        empty answer columns. Only plain columns are selected so rows can be
+        streamed without building ORM objects.
+        """
+        stmt = (
+            select(
+                TestAttempt.id.label("attempt_id"),
+                TestAttempt.user_id,
+                TestAttempt.test_id,
+                Test.title.label("test_title"),
+                TestAttempt.score,
+                TestAttempt.total_points,
+                TestAttempt.passed,
+                TestAttempt.started_at,
+                TestAttempt.completed_at,
+                TestAnswer.id.label("answer_id"),
+                TestAnswer.question_id,
+                TestAnswer.selected_option_ids,
+                TestAnswer.text_answer,
+                TestAnswer.is_correct,
+                TestAnswer.points_earned,
+            )
+            .join(Test, Test.id == TestAttempt.test_id)
+            .outerjoin(TestAnswer, TestAnswer.attempt_id == TestAttempt.id)
+            .order_by(TestAttempt.id, TestAnswer.id)
+        )
+        
+        if started_from:
+            stmt = stmt.where(TestAttempt.started_at >= started_from)
+        if started_before:
+            stmt = stmt.where(TestAttempt.started_at < started_before)
+        if test_id:
+            stmt = stmt.where(TestAttempt.test_id == test_id)
+        if user_id:
+            stmt = stmt.where(TestAttempt.user_id == user_id)
+        
+        return stmt
+    
+    async def get_all_by_user(
+        self,
+        user_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List, Optional[str]]:
+        """Get a page of attempts for a user across all tests and the next page cursor."""
+        from core.src.app.models.course import TestAttempt
+        stmt = select(TestAttempt).options(
+            selectinload(TestAttempt.test)  # Загружаем связанный тест для получения его названия
+        ).where(
+            TestAttempt.user_id == user_id
+        )
+        return await self.paginate(
+            stmt,
+            cursor=cursor,
+            limit=limit,
+            sort_columns=[TestAttempt.started_at, TestAttempt.id]
+        )
     
     async def get_with_answers(self, attempt_id: int):
         """Get attempt with answers loaded."""
@@ -373,6 +499,28 @@ class TestAttemptRepository(BaseRepository["TestAttempt"]):
         )
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
+    
+    async def create_with_answers(self, answers: List[dict], **kwargs):
+        """
+        Create a graded attempt and all of its answers in one transaction.
+        
+        The attempt row is flushed to obtain its ID, the answers are written
+        with a single multi-row INSERT and everything is committed once, so
+        the number of round trips does not depend on the number of answers.
+        """
+        attempt = self.model(**kwargs)
+        self.session.add(attempt)
+        await self.session.flush()
+        
+        await TestAnswerRepository(self.session).bulk_create(
+            [{**answer, "attempt_id": attempt.id} for answer in answers],
+            commit=False
+        )
+        await self.session.commit()
+        
+        logger.info(f"Created TestAttempt {attempt.id} with {len(answers)} answers")
+        
+        return attempt
 
 
 class TestAnswerRepository(BaseRepository["TestAnswer"]):
@@ -1,7 +1,7 @@
 # repositories/media_s3_config.py
 import os
 from pydantic_settings import BaseSettings
-from typing import Optional, Set
+from typing import List, Literal, Optional, Set
 
 class MediaS3Settings(BaseSettings):
     # Основные настройки S3
@@ -11,6 +11,13 @@ class MediaS3Settings(BaseSettings):
     S3_SECRET_KEY: str = os.getenv("S3_SECRET_KEY", "")
     S3_REGION: str = os.getenv("S3_REGION", "kz1")
     
+    # Хранилище объектов: 's3' или 'local' (каталог на диске, ссылки через /s3/local)
+    STORAGE_BACKEND: Literal['s3', 'local'] = os.getenv("STORAGE_BACKEND", "s3")
+    LOCAL_STORAGE_ROOT: str = os.getenv("LOCAL_STORAGE_ROOT", "./data/media")
+    LOCAL_STORAGE_BASE_URL: str = os.getenv("LOCAL_STORAGE_BASE_URL", "http://localhost:8000")  # внешний адрес core без пути
+    # Полный адрес /s3/local; пусто - LOCAL_STORAGE_BASE_URL + ROOT_PATH + API_PREFIX + /s3/local
+    LOCAL_STORAGE_PUBLIC_URL: str = os.getenv("LOCAL_STORAGE_PUBLIC_URL", "")
+    
     # Ограничения для изображений
     MAX_IMAGE_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_IMAGE_TYPES: Set[str] = {
@@ -32,6 +39,55 @@ class MediaS3Settings(BaseSettings):
     }
     ALLOWED_VIDEO_EXTENSIONS: Set[str] = {'mp4', 'webm', 'ogg', 'mov'}
     
+    # Пул потоков для S3-операций (boto3 синхронный, в event loop его не вызываем)
+    S3_MAX_CONCURRENCY: int = 16
+    S3_CONNECT_TIMEOUT: int = 10
+    S3_READ_TIMEOUT: int = 60
+    
+    # Таймауты операций, секунды (включая ожидание свободного потока)
+    S3_UPLOAD_TIMEOUT: int = 900
+    S3_DOWNLOAD_TIMEOUT: int = 300
+    S3_DELETE_TIMEOUT: int = 30
+    S3_HEAD_TIMEOUT: int = 10
+    
+    # Потоковая отдача через API (без presigned URL)
+    S3_STREAM_CHUNK_SIZE: int = 512 * 1024  # столько байт держим в памяти на один поток
+    
+    # Пакетные операции
+    S3_DELETE_BATCH_SIZE: int = 1000  # максимум ключей в одном DeleteObjects
+    MEDIA_BATCH_MAX_IDS: int = 1000
+    
+    # Прямая загрузка в бакет (presigned POST/PUT)
+    PRESIGNED_UPLOAD_EXPIRES: int = 3600
+    
+    # Возобновляемая multipart-загрузка через API
+    MULTIPART_PART_SIZE: int = 8 * 1024 * 1024  # 8MB (минимум S3 - 5MB)
+    MULTIPART_MAX_PARALLEL_PARTS: int = 4  # сколько частей клиент может слать одновременно
+    UPLOAD_SESSION_TTL: int = 7 * 24 * 3600  # неделя
+    
+    # Уменьшенные копии изображений (варианты по ширине)
+    IMAGE_VARIANT_WIDTHS: List[int] = [160, 320, 640, 1280]
+    IMAGE_VARIANT_PREGENERATE_WIDTHS: List[int] = [320, 640]  # готовим сразу после загрузки
+    IMAGE_VARIANT_QUALITY: int = 80
+    IMAGE_VARIANT_WORKERS: int = 2  # процессы для ресайза
+    IMAGE_VARIANT_TIMEOUT: int = 30
+    IMAGE_VARIANT_CACHE_DIR: str = "./data/image_variants"
+    IMAGE_VARIANT_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024  # 2GB
+    
+    # Сверка бакета с course_media (сироты в S3 и записи без объектов)
+    RECONCILER_ENABLED: bool = False  # включать на одном экземпляре core
+    RECONCILER_DELETE: bool = False  # False - только отчёт
+    RECONCILER_INTERVAL: int = 6 * 3600
+    RECONCILER_GRACE_PERIOD: int = 24 * 3600  # моложе - не трогаем (идущие загрузки)
+    RECONCILER_PAGE_SIZE: int = 1000
+    RECONCILER_PAGE_DELAY: float = 1.0  # пауза между страницами, чтобы не мешать запросам
+    RECONCILER_PREFIXES: List[str] = ['courses/', 'images/', 'videos/', 'user-photos/']
+    
+    # Presigned URL
+    PRESIGNED_URL_EXPIRES: int = 86400  # 24 часа
+    PRESIGNED_URL_SAFETY_MARGIN: int = 3600  # не отдавать ссылки, живущие меньше часа
+    PRESIGNED_URL_CACHE_SIZE: int = 20000
+    
     class Config:
         env_file = ".env"
 
@@ -1,9 +1,12 @@
 # schemas/api/media_schema.py
-from pydantic import BaseModel
-from typing import Optional, List, Literal
+from pydantic import BaseModel, Field, computed_field, model_validator
+from typing import Optional, List, Literal, Dict, Union
 from datetime import datetime
 import uuid
 
+from core.src.app.core.config import settings
+from core.src.app.repositories.media_s3_config import media_s3_settings
+
 class CourseMediaBase(BaseModel):
     filename: str
     original_filename: str
@@ -33,6 +36,17 @@ class CourseMediaResponse(CourseMediaBase):
     updated_at: datetime
     download_url: Optional[str] = None  # presigned URL
 
+    @computed_field
+    @property
+    def variant_urls(self) -> Optional[Dict[str, str]]:
+        """Уменьшенные копии изображения по ширине (WebP)"""
+        if self.media_type != 'image':
+            return None
+        return {
+            str(width): f"{settings.ROOT_PATH}{settings.API_PREFIX}/s3/media/{self.id}/variant?width={width}"
+            for width in media_s3_settings.IMAGE_VARIANT_WIDTHS
+        }
+
     class Config:
         from_attributes = True
 
@@ -43,6 +57,90 @@ class MediaUploadResponse(BaseModel):
 class MediaListResponse(BaseModel):
     media: List[CourseMediaResponse]
     total: int
+    next_cursor: Optional[str] = None  # курсор следующей страницы
+
+class PresignedUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+    size: int
+    media_type: Literal['image', 'video']
+    method: Literal['post', 'put'] = 'post'
+    course_id: Optional[int] = None
+    lesson_id: Optional[int] = None
+    custom_name: Optional[str] = None
+
+class PhotoPresignedUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+    size: int
+    user_id: Union[int, str]
+    method: Literal['post', 'put'] = 'post'
+
+class PresignedUploadResponse(BaseModel):
+    upload_token: str  # передаётся в finalize
+    s3_key: str
+    method: Literal['post', 'put']
+    url: str
+    fields: Dict[str, str] = {}  # поля формы для POST
+    headers: Dict[str, str] = {}  # заголовки для PUT
+    expires_in: int
+
+class UploadFinalizeRequest(BaseModel):
+    upload_token: str
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    content_type: str
+    size: int
+    media_type: Literal['image', 'video']
+    course_id: Optional[int] = None
+    lesson_id: Optional[int] = None
+    custom_name: Optional[str] = None
+
+class UploadSessionResponse(BaseModel):
+    id: str
+    s3_key: str
+    filename: str
+    size: int
+    part_size: int
+    total_parts: int
+    max_parallel_parts: int
+    uploaded_parts: List[int]  # номера уже принятых частей (для возобновления)
+    status: Literal['active', 'completed', 'aborted']
+    media_id: Optional[str] = None
+    expires_at: datetime
+
+class UploadPartResponse(BaseModel):
+    part_number: int
+    etag: str
+    size: int
+
+class MediaBatchRequest(BaseModel):
+    """Список ID и/или область (курс, урок, вопрос); хотя бы одно обязательно"""
+    media_ids: List[str] = Field(default=[], max_length=media_s3_settings.MEDIA_BATCH_MAX_IDS)
+    course_id: Optional[int] = None
+    lesson_id: Optional[int] = None
+    question_id: Optional[int] = None
+
+    @model_validator(mode='after')
+    def check_not_empty(self):
+        if not self.media_ids and self.course_id is None and self.lesson_id is None and self.question_id is None:
+            raise ValueError("Укажите media_ids, course_id, lesson_id или question_id")
+        return self
+
+class MediaDeleteError(BaseModel):
+    s3_key: str
+    code: str
+    message: str
+
+class MediaBatchDeleteResponse(BaseModel):
+    deleted: int
+    deleted_ids: List[str]
+    s3_deleted: int
+    failed: List[MediaDeleteError] = []  # объекты, которые S3 не удалил
+
+class MediaBatchPresignResponse(BaseModel):
+    urls: Dict[str, str]  # media_id -> presigned URL
 
 class MediaConfigResponse(BaseModel):
     endpoint: str
@@ -0,0 +1,225 @@
+"""In-process cache of compiled answer keys used for grading."""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.src.app.core.config import settings
+from core.src.app.models.course import QuestionType
+
+logger = logging.getLogger(__name__)
+
+CHOICE_QUESTION_TYPES = {QuestionType.SINGLE_CHOICE.value, QuestionType.MULTIPLE_CHOICE.value}
+
+
+class CompiledQuestion:
+    """
+    Grading data for a single question.
+
+    Every correct option of the question gets an ordinal (its bit position)
+    and the full set is folded into one integer mask. A submission is correct
+    when every selected option has an ordinal and the selected bits add up to
+    the mask, so grading is a handful of dict lookups and one integer
+    comparison.
+    """
+
+    __slots__ = (
+        "id",
+        "test_id",
+        "question_text",
+        "question_type",
+        "points",
+        "option_ordinals",
+        "correct_mask",
+    )
+
+    def __init__(
+        self,
+        question_id: int,
+        test_id: int,
+        question_text: str,
+        question_type: str,
+        points: int,
+        correct_option_ids: Iterable[int]
+    ):
+        self.id = question_id
+        self.test_id = test_id
+        self.question_text = question_text
+        self.question_type = question_type
+        self.points = points
+        self.option_ordinals = {
+            option_id: ordinal
+            for ordinal, option_id in enumerate(sorted(set(correct_option_ids)))
+        }
+        self.correct_mask = (1 << len(self.option_ordinals)) - 1
+
+    def grade(self, selected_option_ids: Optional[List[int]]) -> bool:
+        """Check whether the selected options exactly match the correct ones."""
+        if self.question_type not in CHOICE_QUESTION_TYPES or not selected_option_ids:
+            return False
+
+        selected_mask = 0
+        for option_id in selected_option_ids:
+            ordinal = self.option_ordinals.get(option_id)
+            if ordinal is None:
+                return False
+            selected_mask |= 1 << ordinal
+
+        return selected_mask == self.correct_mask
+
+
+class CompiledAnswerKey:
+    """Compiled answer key for all questions of one test."""
+
+    __slots__ = ("test_id", "questions", "question_ids", "compiled_at")
+
+    def __init__(self, test_id: int, questions: Dict[int, CompiledQuestion]):
+        self.test_id = test_id
+        self.questions = questions
+        self.question_ids = tuple(questions)
+        self.compiled_at = time.monotonic()
+
+    @classmethod
+    def from_rows(cls, test_id: int, rows: List[Row]) -> "CompiledAnswerKey":
+        """Compile an answer key from TestRepository.get_grading_rows rows."""
+        correct_option_ids: Dict[int, List[int]] = {}
+        question_rows = {}
+        for row in rows:
+            question_rows.setdefault(row.question_id, row)
+            options = correct_option_ids.setdefault(row.question_id, [])
+            if row.correct_option_id is not None:
+                options.append(row.correct_option_id)
+
+        questions = {
+            question_id: CompiledQuestion(
+                question_id=question_id,
+                test_id=test_id,
+                question_text=row.question_text,
+                question_type=QuestionType(row.question_type).value,
+                points=row.points,
+                correct_option_ids=correct_option_ids[question_id]
+            )
+            for question_id, row in question_rows.items()
+        }
+        return cls(test_id, questions)
+
+
+class AnswerKeyCache:
+    """
+    LRU cache of compiled answer keys keyed by test ID.
+
+    Keys are dropped explicitly by the question/option write endpoints and
+    additionally expire after ANSWER_KEY_CACHE_TTL seconds, which bounds
+    staleness across worker processes.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._keys: "OrderedDict[int, CompiledAnswerKey]" = OrderedDict()
+        self._question_tests: Dict[int, int] = {}
+
+    def get(self, test_id: int) -> Optional[CompiledAnswerKey]:
+        """Get a cached answer key if it is present and not expired."""
+        answer_key = self._keys.get(test_id)
+        if answer_key is None:
+            return None
+
+        if time.monotonic() - answer_key.compiled_at > self.ttl:
+            self.invalidate_test(test_id)
+            return None
+
+        self._keys.move_to_end(test_id)
+        return answer_key
+
+    def put(self, answer_key: CompiledAnswerKey) -> None:
+        """Store an answer key, evicting the least recently used one if full."""
+        self.invalidate_test(answer_key.test_id)
+        self._keys[answer_key.test_id] = answer_key
+        for question_id in answer_key.questions:
+            self._question_tests[question_id] = answer_key.test_id
+
+        while len(self._keys) > self.max_size:
+            oldest_test_id = next(iter(self._keys))
+            self.invalidate_test(oldest_test_id)
+
+    def invalidate_test(self, test_id: int) -> None:
+        """Drop the answer key of a test."""
+        answer_key = self._keys.pop(test_id, None)
+        if answer_key is None:
+            return
+
+        for question_id in answer_key.questions:
+            self._question_tests.pop(question_id, None)
+        logger.debug(f"Invalidated answer key for test {test_id}")
+
+    def invalidate_question(self, question_id: int) -> None:
+        """Drop the answer key of the test that contains a question."""
+        test_id = self._question_tests.get(question_id)
+        if test_id is not None:
+            self.invalidate_test(test_id)
+
+    def clear(self) -> None:
+        """Drop all cached answer keys."""
+        self._keys.clear()
+        self._question_tests.clear()
+
+    async def get_or_compile(
+        self,
+        session: AsyncSession,
+        test_id: int
+    ) -> Optional[CompiledAnswerKey]:
+        """Get the answer key of a test, compiling it on a cache miss."""
+        answer_keys = await self.get_or_compile_many(session, [test_id])
+        return answer_keys.get(test_id)
+
+    async def get_or_compile_many(
+        self,
+        session: AsyncSession,
+        test_ids: Iterable[int],
+        expected_counts: Optional[Dict[int, int]] = None
+    ) -> Dict[int, CompiledAnswerKey]:
+        """
+        Get answer keys for several tests, compiling the missing ones.
+
+        All missing keys are compiled from a single grading projection query.
+        Tests without questions get an empty key. When expected_counts is
+        given, a cached key whose question count differs (e.g. questions were
+        edited through another worker) is treated as a miss.
+        """
+        from core.src.app.repositories.course import TestRepository
+
+        answer_keys = {}
+        missing_test_ids = []
+        for test_id in test_ids:
+            answer_key = self.get(test_id)
+            if answer_key is not None and expected_counts is not None:
+                if len(answer_key.question_ids) != expected_counts.get(test_id):
+                    answer_key = None
+            if answer_key is None:
+                missing_test_ids.append(test_id)
+            else:
+                answer_keys[test_id] = answer_key
+
+        if missing_test_ids:
+            rows = await TestRepository(session).get_grading_rows(missing_test_ids)
+            rows_by_test: Dict[int, List[Row]] = {test_id: [] for test_id in missing_test_ids}
+            for row in rows:
+                rows_by_test[row.test_id].append(row)
+
+            for test_id, test_rows in rows_by_test.items():
+                answer_key = CompiledAnswerKey.from_rows(test_id, test_rows)
+                self.put(answer_key)
+                answer_keys[test_id] = answer_key
+
+        return answer_keys
+
+
+answer_key_cache = AnswerKeyCache(
+    max_size=settings.ANSWER_KEY_CACHE_SIZE,
+    ttl=settings.ANSWER_KEY_CACHE_TTL
+)
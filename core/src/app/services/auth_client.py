@@ -0,0 +1,46 @@
+"""Minimal client of the auth service used for authorization checks."""
+
+import asyncio
+import json
+import logging
+import urllib.error
+import urllib.request
+from typing import Optional
+
+from core.src.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AuthServiceUnavailableError(Exception):
+    """The auth service could not be reached or returned an unexpected response."""
+
+
+def _fetch_current_user(token: str) -> Optional[dict]:
+    request = urllib.request.Request(
+        settings.AUTH_SERVICE_URL.rstrip("/") + settings.AUTH_CURRENT_USER_PATH,
+        headers={"Authorization": f"Bearer {token}", "Accept": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=settings.AUTH_SERVICE_TIMEOUT) as response:
+            return json.load(response)
+    except urllib.error.HTTPError as e:
+        if e.code in (401, 403, 404):
+            return None
+        raise AuthServiceUnavailableError(f"auth service returned {e.code}") from e
+    except (urllib.error.URLError, TimeoutError, ValueError) as e:
+        raise AuthServiceUnavailableError(str(e)) from e
+
+
+async def fetch_current_user(token: str) -> Optional[dict]:
+    """
+    Get the user the token belongs to from the auth service.
+
+    Returns:
+        Optional[dict]: User data, or None if auth rejects the token or the
+        user is inactive
+
+    Raises:
+        AuthServiceUnavailableError: If the auth service cannot answer
+    """
+    return await asyncio.to_thread(_fetch_current_user, token)
@@ -0,0 +1,114 @@
+"""Streaming NDJSON/CSV exports backed by server-side cursors."""
+
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Any, AsyncIterator, Literal, Optional, Tuple
+from uuid import UUID
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.src.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize values json.dumps does not handle natively."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value: Any) -> Any:
+    """Format a value for a CSV cell."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def date_bounds(
+    start_date: Optional[date],
+    end_date: Optional[date]
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Convert an inclusive date range to [from, before) UTC datetime bounds."""
+    started_from = datetime.combine(start_date, time.min, tzinfo=timezone.utc) if start_date else None
+    started_before = (
+        datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=timezone.utc)
+        if end_date else None
+    )
+    return started_from, started_before
+
+
+async def stream_rows(
+    session_maker: async_sessionmaker[AsyncSession],
+    stmt: Select,
+    export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    """
+    Execute a column SELECT with a server-side cursor and yield encoded chunks.
+
+    The generator owns its session, so the cursor stays open for the whole
+    response regardless of request dependency teardown. Rows are fetched
+    EXPORT_BATCH_SIZE at a time and every batch is encoded into one chunk,
+    which keeps memory flat no matter how many rows are exported.
+    """
+    columns = [column.name for column in stmt.selected_columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    if export_format == "csv":
+        writer.writerow(columns)
+        yield buffer.getvalue().encode()
+
+    total = 0
+    async with session_maker() as session:
+        result = await session.stream(
+            stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        async for partition in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+
+            if export_format == "csv":
+                writer.writerows([_csv_value(value) for value in row] for row in partition)
+            else:
+                for row in partition:
+                    buffer.write(json.dumps(dict(zip(columns, row)), default=_json_default))
+                    buffer.write("\n")
+
+            total += len(partition)
+            yield buffer.getvalue().encode()
+
+    logger.info(f"Exported {total} rows as {export_format}")
+
+
+def export_response(
+    session_maker: async_sessionmaker[AsyncSession],
+    stmt: Select,
+    export_format: ExportFormat,
+    name: str
+) -> StreamingResponse:
+    """Build a streaming attachment response for an export query."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return StreamingResponse(
+        stream_rows(session_maker, stmt, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}_{timestamp}.{export_format}"'
+        }
+    )
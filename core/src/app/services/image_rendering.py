@@ -0,0 +1,40 @@
+# app/services/image_rendering.py
+"""Ресайз изображений; выполняется в отдельных процессах, поэтому зависит только от PIL."""
+
+import io
+from typing import Literal
+
+from PIL import Image, ImageOps
+
+VariantFormat = Literal['webp', 'jpeg']
+
+
+def render_variant(data: bytes, width: int, image_format: VariantFormat, quality: int) -> bytes:
+    """
+    Уменьшает изображение до ширины width (без увеличения) и кодирует в WebP/JPEG
+
+    Учитывает EXIF-поворот; у анимированных изображений берётся первый кадр.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+
+        if image.width > width:
+            image.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        if image_format == 'jpeg':
+            if has_alpha:
+                rgba = image.convert('RGBA')
+                image = Image.new('RGB', rgba.size, (255, 255, 255))
+                image.paste(rgba, mask=rgba.getchannel('A'))
+            else:
+                image = image.convert('RGB')
+        else:
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        output = io.BytesIO()
+        if image_format == 'jpeg':
+            image.save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+        else:
+            image.save(output, 'WEBP', quality=quality, method=4)
+        return output.getvalue()
@@ -0,0 +1,221 @@
+# app/services/image_variants.py
+"""Варианты изображений по ширине: рендер в пуле процессов и LRU-кэш на локальном диске."""
+
+import asyncio
+import bisect
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Optional
+
+from core.src.app.repositories.media_s3_config import media_s3_settings
+from core.src.app.services.image_rendering import VariantFormat, render_variant
+from core.src.app.services.media_s3_service import media_s3_service
+
+logger = logging.getLogger(__name__)
+
+
+class VariantDiskCache:
+    """
+    LRU-кэш готовых вариантов в каталоге на диске с ограничением по объёму
+
+    Порядок LRU восстанавливается при старте по mtime файлов, а при каждом
+    попадании mtime обновляется, так что он переживает рестарт. Несколько
+    воркеров могут делить каталог: файл, удалённый соседом, считается промахом.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Индексирует уже лежащие на диске варианты (старые - первыми)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.directory.glob("*/*"):
+            if path.name.startswith("."):
+                path.unlink(missing_ok=True)  # недописанный временный файл
+                continue
+            stat = path.stat()
+            entries.append((stat.st_mtime, str(path.relative_to(self.directory)), stat.st_size))
+
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self.total_bytes += size
+        self._evict()
+
+    def path_for(self, name: str) -> Path:
+        return self.directory / name
+
+    def get(self, name: str) -> Optional[Path]:
+        """Путь к варианту, если он есть в кэше"""
+        with self._lock:
+            if name not in self._files:
+                return None
+            self._files.move_to_end(name)
+
+        path = self.path_for(name)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.total_bytes -= self._files.pop(name, 0)
+            return None
+        return path
+
+    def put(self, name: str, data: bytes) -> Path:
+        """Атомарно записывает вариант и вытесняет самые давно использованные"""
+        path = self.path_for(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = path.parent / f".{uuid.uuid4().hex}.tmp"
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.total_bytes += len(data) - self._files.pop(name, 0)
+            self._files[name] = len(data)
+            self._evict()
+        return path
+
+    def _evict(self) -> None:
+        while self.total_bytes > self.max_bytes and self._files:
+            name, size = self._files.popitem(last=False)
+            self.total_bytes -= size
+            self.path_for(name).unlink(missing_ok=True)
+
+
+class ImageVariantService:
+    """
+    Выдаёт уменьшенные копии изображений CourseMedia
+
+    Запрошенная ширина округляется вверх до ближайшей из IMAGE_VARIANT_WIDTHS,
+    чтобы число вариантов на изображение было ограничено. Одновременные
+    запросы одного и того же варианта ждут один общий рендер.
+    """
+
+    def __init__(self):
+        self.widths = sorted(media_s3_settings.IMAGE_VARIANT_WIDTHS)
+        self._cache: Optional[VariantDiskCache] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    @property
+    def cache(self) -> VariantDiskCache:
+        if self._cache is None:
+            self._cache = VariantDiskCache(
+                media_s3_settings.IMAGE_VARIANT_CACHE_DIR,
+                media_s3_settings.IMAGE_VARIANT_CACHE_MAX_BYTES
+            )
+        return self._cache
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        # spawn: форк процесса с потоками boto3/пула S3 небезопасен
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=media_s3_settings.IMAGE_VARIANT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def bucket_width(self, width: int) -> int:
+        """Ближайшая поддерживаемая ширина не меньше запрошенной"""
+        index = bisect.bisect_left(self.widths, width)
+        return self.widths[min(index, len(self.widths) - 1)]
+
+    @staticmethod
+    def cache_name(media_id: str, width: int, image_format: VariantFormat) -> str:
+        return f"{media_id[:2]}/{media_id}_{width}.{image_format}"
+
+    async def get_variant(
+        self,
+        media_id: str,
+        s3_key: str,
+        width: int,
+        image_format: VariantFormat = 'webp'
+    ) -> Path:
+        """Путь к файлу варианта (рендерит при промахе)"""
+        width = self.bucket_width(width)
+        name = self.cache_name(media_id, width, image_format)
+
+        path = self.cache.get(name)
+        if path is not None:
+            return path
+
+        return await self._render_once(name, s3_key, width, image_format)
+
+    async def _render_once(
+        self,
+        name: str,
+        s3_key: str,
+        width: int,
+        image_format: VariantFormat,
+        data: Optional[bytes] = None
+    ) -> Path:
+        """Рендер с объединением одновременных запросов одного варианта"""
+        pending = self._pending.get(name)
+        if pending is None or pending.get_loop() is not asyncio.get_running_loop():
+            pending = asyncio.ensure_future(self._render(name, s3_key, width, image_format, data))
+            self._pending[name] = pending
+            pending.add_done_callback(
+                lambda done: self._pending.pop(name) if self._pending.get(name) is done else None
+            )
+        return await asyncio.shield(pending)
+
+    async def _render(
+        self,
+        name: str,
+        s3_key: str,
+        width: int,
+        image_format: VariantFormat,
+        data: Optional[bytes]
+    ) -> Path:
+        if data is None:
+            data = await media_s3_service.download_media_async(s3_key)
+
+        loop = asyncio.get_running_loop()
+        try:
+            rendered = await asyncio.wait_for(
+                loop.run_in_executor(
+                    self.pool, render_variant,
+                    data, width, image_format, media_s3_settings.IMAGE_VARIANT_QUALITY
+                ),
+                timeout=media_s3_settings.IMAGE_VARIANT_TIMEOUT
+            )
+        except BrokenProcessPool:
+            # Упавший воркер (например, OOM на огромной картинке) ломает весь пул
+            self._pool = None
+            raise
+        path = await asyncio.to_thread(self.cache.put, name, rendered)
+
+        logger.info(f"Rendered {name}: {len(data)} -> {len(rendered)} bytes")
+        return path
+
+    async def pregenerate(self, media_id: str, s3_key: str) -> None:
+        """Готовит ходовые варианты сразу после загрузки (фоновая задача, оригинал качается один раз)"""
+        data = None
+        try:
+            for width in media_s3_settings.IMAGE_VARIANT_PREGENERATE_WIDTHS:
+                width = self.bucket_width(width)
+                name = self.cache_name(media_id, width, 'webp')
+                if self.cache.get(name) is not None:
+                    continue
+                if data is None:
+                    data = await media_s3_service.download_media_async(s3_key)
+                await self._render_once(name, s3_key, width, 'webp', data)
+        except Exception as e:
+            logger.warning(f"Failed to pregenerate variants of {media_id}: {e}")
+
+
+image_variant_service = ImageVariantService()
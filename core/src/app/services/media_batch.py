@@ -0,0 +1,185 @@
+# app/services/media_batch.py
+"""Пакетные операции над медиа: выборка по списку ID или по курсу/уроку/тесту/вопросу/варианту."""
+
+import logging
+from collections import Counter
+from typing import List, Optional
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from core.src.app.models.course import CourseModule, Lesson, QuestionOption, TestQuestion
+from core.src.app.models.course_media import CourseMedia, MediaObject
+from core.src.app.services.media_s3_service import media_s3_service
+from core.src.app.services.response_snapshot_cache import response_snapshot_cache
+
+logger = logging.getLogger(__name__)
+
+
+def media_scope(
+    media_ids: Optional[List[str]] = None,
+    course_id: Optional[int] = None,
+    lesson_id: Optional[int] = None,
+    question_id: Optional[int] = None,
+    test_id: Optional[int] = None,
+    option_id: Optional[int] = None,
+    module_id: Optional[int] = None
+) -> ColumnElement[bool]:
+    """
+    Условие выборки CourseMedia
+
+    Курс и модуль включают медиа всех своих уроков, тест - медиа его
+    вопросов, вопрос - медиа описаний его вариантов ответа. Несколько заданных критериев
+    объединяются через OR.
+    """
+    conditions = []
+    if media_ids:
+        conditions.append(CourseMedia.id.in_(media_ids))
+    if course_id is not None:
+        course_lessons = (
+            select(Lesson.id)
+            .join(CourseModule, Lesson.module_id == CourseModule.id)
+            .where(CourseModule.course_id == course_id)
+        )
+        conditions.append(CourseMedia.course_id == course_id)
+        conditions.append(CourseMedia.lesson_id.in_(course_lessons))
+    if lesson_id is not None:
+        conditions.append(CourseMedia.lesson_id == lesson_id)
+    if question_id is not None:
+        question_options = select(QuestionOption.id).where(QuestionOption.question_id == question_id)
+        conditions.append(CourseMedia.test_question_id == question_id)
+        conditions.append(CourseMedia.question_option_id.in_(question_options))
+    if test_id is not None:
+        test_questions = select(TestQuestion.id).where(TestQuestion.test_id == test_id)
+        test_options = select(QuestionOption.id).where(QuestionOption.question_id.in_(test_questions))
+        conditions.append(CourseMedia.test_question_id.in_(test_questions))
+        conditions.append(CourseMedia.question_option_id.in_(test_options))
+    if option_id is not None:
+        conditions.append(CourseMedia.question_option_id == option_id)
+    if module_id is not None:
+        module_lessons = select(Lesson.id).where(Lesson.module_id == module_id)
+        conditions.append(CourseMedia.lesson_id.in_(module_lessons))
+
+    if not conditions:
+        raise ValueError("Media scope must not be empty")
+    return or_(*conditions)
+
+
+async def get_media(db: AsyncSession, scope: ColumnElement[bool]) -> List[CourseMedia]:
+    """Все медиа из выборки"""
+    result = await db.execute(
+        select(CourseMedia).where(scope).order_by(CourseMedia.created_at, CourseMedia.id)
+    )
+    return list(result.scalars().all())
+
+
+async def delete_media_rows(db: AsyncSession, scope: ColumnElement[bool]) -> dict:
+    """
+    Удаляет медиа из выборки одним DELETE и снимает их ссылки на общие объекты
+
+    Commit не делается: вызывающий код удаляет в той же транзакции
+    родительскую запись, фиксирует её и затем передаёт результат в
+    purge_deleted_media. Общие (дедуплицированные) объекты попадают в
+    s3_keys, только когда на них не остаётся ссылок.
+
+    Returns:
+        dict: deleted_ids, s3_keys, question_ids
+    """
+    result = await db.execute(
+        select(
+            CourseMedia.id,
+            CourseMedia.s3_key,
+            CourseMedia.content_hash,
+            CourseMedia.test_question_id,
+            CourseMedia.question_option_id,
+        ).where(scope)
+    )
+    rows = result.all()
+    if not rows:
+        return {'deleted_ids': [], 's3_keys': [], 'question_ids': []}
+
+    media_ids = [row.id for row in rows]
+    s3_keys = {row.s3_key for row in rows if row.content_hash is None}
+
+    # Снимаем ссылки на общие объекты
+    released = Counter(row.content_hash for row in rows if row.content_hash is not None)
+    if released:
+        objects = await db.execute(
+            select(MediaObject)
+            .where(MediaObject.content_hash.in_(list(released)))
+            .with_for_update()
+        )
+        for media_object in objects.scalars():
+            media_object.ref_count -= released[media_object.content_hash]
+            if media_object.ref_count <= 0:
+                s3_keys.add(media_object.s3_key)
+                await db.delete(media_object)
+
+    question_ids = {row.test_question_id for row in rows if row.test_question_id is not None}
+    option_ids = {row.question_option_id for row in rows if row.question_option_id is not None}
+    if option_ids:
+        options = await db.execute(
+            select(QuestionOption.question_id).where(QuestionOption.id.in_(option_ids))
+        )
+        question_ids.update(options.scalars())
+
+    await db.execute(
+        delete(CourseMedia)
+        .where(CourseMedia.id.in_(media_ids))
+        .execution_options(synchronize_session=False)
+    )
+
+    # Объекты, на которые всё ещё ссылаются другие записи, не трогаем
+    if s3_keys:
+        still_used = await db.execute(
+            select(CourseMedia.s3_key).where(CourseMedia.s3_key.in_(list(s3_keys))).distinct()
+        )
+        s3_keys.difference_update(still_used.scalars())
+
+    return {
+        'deleted_ids': media_ids,
+        's3_keys': sorted(s3_keys),
+        'question_ids': sorted(question_ids),
+    }
+
+
+async def purge_deleted_media(deleted: dict) -> dict:
+    """
+    Завершает удаление после commit: сбрасывает кэши и удаляет объекты из S3 через DeleteObjects
+
+    Ошибки S3 возвращаются по ключам: записи в БД к этому моменту уже
+    удалены, такие объекты подберёт сверка хранилища.
+
+    Returns:
+        dict: deleted_ids, s3_deleted, failed
+    """
+    for question_id in deleted['question_ids']:
+        response_snapshot_cache.invalidate_question(question_id)
+
+    s3_keys = deleted['s3_keys']
+    failed = await media_s3_service.delete_media_batch_async(s3_keys) if s3_keys else []
+
+    if deleted['deleted_ids']:
+        logger.info(
+            f"Batch deleted {len(deleted['deleted_ids'])} media rows, "
+            f"{len(s3_keys) - len(failed)} S3 objects, {len(failed)} failed"
+        )
+    return {
+        'deleted_ids': deleted['deleted_ids'],
+        's3_deleted': len(s3_keys) - len(failed),
+        'failed': failed,
+    }
+
+
+async def delete_media(db: AsyncSession, scope: ColumnElement[bool]) -> dict:
+    """
+    Удаляет медиа из выборки и их объекты из S3 (одна транзакция, затем DeleteObjects)
+
+    Returns:
+        dict: deleted_ids, s3_deleted, failed
+    """
+    deleted = await delete_media_rows(db, scope)
+    if deleted['deleted_ids']:
+        await db.commit()
+    return await purge_deleted_media(deleted)
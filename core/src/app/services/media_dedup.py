@@ -0,0 +1,129 @@
+# app/services/media_dedup.py
+"""Дедупликация загружаемых медиа по хэшу содержимого со счётчиком ссылок."""
+
+import logging
+from typing import BinaryIO, Literal, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.src.app.models.course_media import CourseMedia, MediaObject
+from core.src.app.repositories.base import dialect_insert
+from core.src.app.services.media_s3_service import media_s3_service
+
+logger = logging.getLogger(__name__)
+
+
+async def store_media(
+    db: AsyncSession,
+    file_obj: BinaryIO,
+    filename: str,
+    media_type: Literal['image', 'video'],
+    content_type: Optional[str] = None,
+    size: int = 0,
+    course_id: Optional[int] = None,
+    lesson_id: Optional[int] = None,
+    user_id: Optional[int] = None
+) -> tuple[str, dict, str]:
+    """
+    Загружает файл в S3, если такого содержимого ещё нет, иначе переиспользует объект
+
+    Счётчик ссылок меняется в транзакции вызывающего кода: он должен
+    добавить CourseMedia с возвращённым content_hash и сделать commit.
+    metadata['deduplicated'] = True означает, что объект уже был в S3 и
+    при откате его удалять нельзя.
+
+    Обе ветки атомарны: ссылка на существующий объект добавляется одним
+    UPDATE, новый объект регистрируется через INSERT ... ON CONFLICT DO
+    UPDATE. Если параллельная загрузка того же содержимого успела первой,
+    наша копия удаляется из S3 и используется её объект.
+
+    Returns:
+        tuple[str, dict, str]: (s3_key, metadata, content_hash)
+    """
+    content_hash = await media_s3_service.compute_content_hash_async(file_obj)
+
+    result = await db.execute(
+        update(MediaObject)
+        .where(MediaObject.content_hash == content_hash)
+        .values(ref_count=MediaObject.ref_count + 1)
+        .returning(MediaObject.s3_key, MediaObject.width, MediaObject.height, MediaObject.ref_count)
+        .execution_options(synchronize_session=False)
+    )
+    existing = result.one_or_none()
+    if existing is not None:
+        logger.info(f"Deduplicated upload {filename}: reusing {existing.s3_key} ({existing.ref_count} refs)")
+        return (
+            existing.s3_key,
+            {'width': existing.width, 'height': existing.height, 'deduplicated': True},
+            content_hash
+        )
+
+    s3_key, metadata = await media_s3_service.upload_media_async(
+        file_obj=file_obj,
+        filename=filename,
+        media_type=media_type,
+        content_type=content_type,
+        course_id=course_id,
+        lesson_id=lesson_id,
+        user_id=user_id
+    )
+    stmt = dialect_insert(db, MediaObject).values(
+        content_hash=content_hash,
+        s3_key=s3_key,
+        size=size,
+        width=metadata.get('width'),
+        height=metadata.get('height'),
+        ref_count=1,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MediaObject.content_hash],
+        set_={'ref_count': MediaObject.ref_count + 1}
+    ).returning(MediaObject.s3_key, MediaObject.width, MediaObject.height)
+    stored = (await db.execute(stmt)).one()
+
+    if stored.s3_key != s3_key:
+        # Параллельная загрузка того же содержимого зарегистрировала объект раньше
+        await media_s3_service.delete_media_async(s3_key)
+        logger.info(f"Deduplicated concurrent upload {filename}: dropped {s3_key}, reusing {stored.s3_key}")
+        return (
+            stored.s3_key,
+            {'width': stored.width, 'height': stored.height, 'deduplicated': True},
+            content_hash
+        )
+    return s3_key, metadata, content_hash
+
+
+async def release_media(db: AsyncSession, media: CourseMedia) -> Optional[str]:
+    """
+    Снимает ссылку записи на объект в S3
+
+    Returns:
+        Optional[str]: s3_key, который нужно удалить из S3 после commit,
+        или None, если на объект ещё ссылаются другие записи
+    """
+    if media.content_hash is None:
+        # Страховка от записей-дублей по одному ключу: удаляем объект,
+        # только если на него больше никто не ссылается
+        other = await db.execute(
+            select(CourseMedia.id).where(
+                CourseMedia.s3_key == media.s3_key,
+                CourseMedia.id != media.id
+            ).limit(1)
+        )
+        if other.first() is not None:
+            logger.info(f"Media {media.id} released, {media.s3_key} is still referenced")
+            return None
+        return media.s3_key
+
+    media_object = await db.get(MediaObject, media.content_hash, with_for_update=True)
+    if media_object is None:
+        return media.s3_key
+
+    media_object.ref_count -= 1
+    if media_object.ref_count > 0:
+        logger.info(f"Media {media.id} released, {media_object.s3_key} still has {media_object.ref_count} refs")
+        return None
+
+    await db.delete(media_object)
+    return media_object.s3_key
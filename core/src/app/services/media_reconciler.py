@@ -0,0 +1,326 @@
+# app/services/media_reconciler.py
+"""Фоновая сверка бакета S3 с таблицей course_media."""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List, Optional, Tuple
+
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.src.app.models.course_media import CourseMedia, MediaObject, MediaUploadSession
+from core.src.app.repositories.media_s3_config import media_s3_settings
+from core.src.app.services import media_batch
+from core.src.app.services.media_s3_service import media_s3_service
+
+logger = logging.getLogger(__name__)
+
+# Сколько примеров ключей/ID попадает в отчёт
+REPORT_SAMPLE_SIZE = 20
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class MediaReconciler:
+    """
+    Находит объекты в S3 без записей CourseMedia и записи без объектов
+
+    Листинг бакета (ListObjectsV2 отдаёт ключи по возрастанию байтов) и
+    course_media (ORDER BY s3_key с бинарной сортировкой) читаются
+    страницами и сливаются как два отсортированных потока, поэтому память
+    не зависит от размера бакета. Между страницами делается пауза
+    RECONCILER_PAGE_DELAY, а S3-запросы идут по одному, чтобы не отнимать
+    пул потоков у обычных запросов.
+    """
+
+    def __init__(self):
+        self.last_report: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def _throttle(self) -> None:
+        await asyncio.sleep(media_s3_settings.RECONCILER_PAGE_DELAY)
+
+    async def _iter_bucket(self, prefix: str) -> AsyncIterator[dict]:
+        token = None
+        while True:
+            objects, token = await media_s3_service.list_media_page_async(
+                prefix, media_s3_settings.RECONCILER_PAGE_SIZE, token
+            )
+            for obj in objects:
+                yield obj
+            if not token:
+                return
+            await self._throttle()
+
+    async def _iter_rows(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        prefix: str
+    ) -> AsyncIterator[Tuple[str, List[Tuple[str, datetime]]]]:
+        """(s3_key, [(media_id, created_at), ...]) по возрастанию s3_key"""
+        last: Optional[Tuple[str, str]] = None
+        group_key: Optional[str] = None
+        group: List[Tuple[str, datetime]] = []
+
+        while True:
+            async with session_maker() as db:
+                # Порядок должен совпадать с байтовым порядком S3
+                s3_key = CourseMedia.s3_key
+                if db.bind.dialect.name == 'postgresql':
+                    s3_key = s3_key.collate('C')
+
+                stmt = (
+                    select(CourseMedia.s3_key, CourseMedia.id, CourseMedia.created_at)
+                    .where(CourseMedia.s3_key.startswith(prefix, autoescape=True))
+                    .order_by(s3_key, CourseMedia.id)
+                    .limit(media_s3_settings.RECONCILER_PAGE_SIZE)
+                )
+                if last is not None:
+                    stmt = stmt.where(tuple_(s3_key, CourseMedia.id) > tuple_(*last))
+                rows = (await db.execute(stmt)).all()
+
+            for row in rows:
+                if row.s3_key != group_key:
+                    if group_key is not None:
+                        yield group_key, group
+                    group_key, group = row.s3_key, []
+                group.append((row.id, row.created_at))
+
+            if len(rows) < media_s3_settings.RECONCILER_PAGE_SIZE:
+                break
+            last = (rows[-1].s3_key, rows[-1].id)
+            await self._throttle()
+
+        if group_key is not None:
+            yield group_key, group
+
+    async def _delete_orphan_objects(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        s3_keys: List[str],
+        report: dict
+    ) -> None:
+        async with session_maker() as db:
+            # Блокируем общие объекты до проверки: store_media, добавляющий на них
+            # ссылку, либо уже закоммитил свою запись, либо ждёт нашего commit
+            await db.execute(
+                select(MediaObject.content_hash)
+                .where(MediaObject.s3_key.in_(s3_keys))
+                .with_for_update()
+            )
+
+            # Объект multipart-загрузки получает LastModified её начала и появляется
+            # в бакете до commit в complete_session - такие ключи не трогаем, пока
+            # сессия активна или недавно завершена
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=media_s3_settings.RECONCILER_GRACE_PERIOD)
+            result = await db.execute(
+                select(MediaUploadSession.s3_key, MediaUploadSession.status, MediaUploadSession.updated_at)
+                .where(
+                    MediaUploadSession.s3_key.in_(s3_keys),
+                    MediaUploadSession.status.in_(('active', 'completed'))
+                )
+                .with_for_update()
+            )
+            uploading = {
+                row.s3_key for row in result.all()
+                if row.status == 'active' or row.updated_at is None or _as_utc(row.updated_at) >= cutoff
+            }
+
+            # Запись могла появиться уже после листинга
+            result = await db.execute(
+                select(CourseMedia.s3_key).where(CourseMedia.s3_key.in_(s3_keys)).distinct()
+            )
+            s3_keys = sorted(set(s3_keys) - set(result.scalars()) - uploading)
+            if not s3_keys:
+                await db.commit()
+                return
+
+            # Объект пропадает - дедупликация не должна больше на него ссылаться
+            await db.execute(delete(MediaObject).where(MediaObject.s3_key.in_(s3_keys)))
+            await db.commit()
+
+        failed = await media_s3_service.delete_media_batch_async(s3_keys)
+        report['deleted_objects'] += len(s3_keys) - len(failed)
+        report['failed'].extend(failed[:REPORT_SAMPLE_SIZE - len(report['failed'])])
+
+    async def _delete_missing_rows(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        media_ids: List[str],
+        report: dict
+    ) -> None:
+        async with session_maker() as db:
+            result = await media_batch.delete_media(db, media_batch.media_scope(media_ids=media_ids))
+        report['deleted_rows'] += len(result['deleted_ids'])
+
+    async def _expire_upload_sessions(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        delete_orphans: bool,
+        report: dict
+    ) -> None:
+        """Отменяет multipart-загрузки просроченных сессий (их части не видны в листинге)"""
+        now = datetime.now(timezone.utc)
+        async with session_maker() as db:
+            result = await db.execute(
+                select(MediaUploadSession.id, MediaUploadSession.s3_key,
+                       MediaUploadSession.upload_id, MediaUploadSession.expires_at)
+                .where(MediaUploadSession.status == 'active')
+            )
+            expired = [row for row in result.all() if _as_utc(row.expires_at) <= now]
+            report['expired_sessions'] = len(expired)
+            if not expired or not delete_orphans:
+                return
+
+            for row in expired:
+                try:
+                    await media_s3_service.abort_multipart_upload_async(row.s3_key, row.upload_id)
+                except Exception as e:
+                    logger.warning(f"Failed to abort expired upload session {row.id}: {e}")
+                    continue
+                await db.execute(
+                    update(MediaUploadSession)
+                    .where(MediaUploadSession.id == row.id)
+                    .values(status='aborted')
+                )
+                await self._throttle()
+            await db.commit()
+
+    async def run(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        delete_orphans: Optional[bool] = None
+    ) -> dict:
+        """
+        Один проход сверки по всем RECONCILER_PREFIXES
+
+        Args:
+            session_maker: Фабрика сессий core БД
+            delete_orphans: Удалять найденное (по умолчанию RECONCILER_DELETE)
+
+        Returns:
+            dict: Отчёт о проходе (также сохраняется в last_report)
+        """
+        if delete_orphans is None:
+            delete_orphans = media_s3_settings.RECONCILER_DELETE
+
+        async with self._lock:
+            started_at = datetime.now(timezone.utc)
+            cutoff = started_at - timedelta(seconds=media_s3_settings.RECONCILER_GRACE_PERIOD)
+            report = {
+                'started_at': started_at.isoformat(),
+                'finished_at': None,
+                'delete': delete_orphans,
+                'objects_scanned': 0,
+                'rows_scanned': 0,
+                'orphan_objects': 0,
+                'orphan_bytes': 0,
+                'missing_rows': 0,
+                'deleted_objects': 0,
+                'deleted_rows': 0,
+                'expired_sessions': 0,
+                'orphan_object_samples': [],
+                'missing_row_samples': [],
+                'failed': [],
+            }
+            batch_size = media_s3_settings.S3_DELETE_BATCH_SIZE
+
+            for prefix in media_s3_settings.RECONCILER_PREFIXES:
+                orphan_keys: List[str] = []
+                missing_ids: List[str] = []
+
+                objects = self._iter_bucket(prefix)
+                rows = self._iter_rows(session_maker, prefix)
+                obj = await anext(objects, None)
+                row = await anext(rows, None)
+
+                while obj is not None or row is not None:
+                    if row is None or (obj is not None and obj['Key'] < row[0]):
+                        # Объект без записи
+                        report['objects_scanned'] += 1
+                        if _as_utc(obj['LastModified']) < cutoff:
+                            report['orphan_objects'] += 1
+                            report['orphan_bytes'] += obj.get('Size', 0)
+                            if len(report['orphan_object_samples']) < REPORT_SAMPLE_SIZE:
+                                report['orphan_object_samples'].append(obj['Key'])
+                            if delete_orphans:
+                                orphan_keys.append(obj['Key'])
+                        obj = await anext(objects, None)
+
+                    elif obj is None or row[0] < obj['Key']:
+                        # Записи без объекта
+                        s3_key, media_rows = row
+                        report['rows_scanned'] += len(media_rows)
+                        for media_id, created_at in media_rows:
+                            if created_at is not None and _as_utc(created_at) < cutoff:
+                                report['missing_rows'] += 1
+                                if len(report['missing_row_samples']) < REPORT_SAMPLE_SIZE:
+                                    report['missing_row_samples'].append(media_id)
+                                if delete_orphans:
+                                    missing_ids.append(media_id)
+                        row = await anext(rows, None)
+
+                    else:
+                        report['objects_scanned'] += 1
+                        report['rows_scanned'] += len(row[1])
+                        obj = await anext(objects, None)
+                        row = await anext(rows, None)
+
+                    if len(orphan_keys) >= batch_size:
+                        await self._delete_orphan_objects(session_maker, orphan_keys, report)
+                        orphan_keys = []
+                    if len(missing_ids) >= batch_size:
+                        await self._delete_missing_rows(session_maker, missing_ids, report)
+                        missing_ids = []
+
+                if orphan_keys:
+                    await self._delete_orphan_objects(session_maker, orphan_keys, report)
+                if missing_ids:
+                    await self._delete_missing_rows(session_maker, missing_ids, report)
+
+            await self._expire_upload_sessions(session_maker, delete_orphans, report)
+
+            report['finished_at'] = datetime.now(timezone.utc).isoformat()
+            self.last_report = report
+
+        logger.info(
+            f"Media reconciliation finished: {report['orphan_objects']} orphan objects "
+            f"({report['orphan_bytes']} bytes), {report['missing_rows']} rows without objects, "
+            f"deleted {report['deleted_objects']} objects / {report['deleted_rows']} rows"
+        )
+        return report
+
+    async def _loop(self, session_maker: async_sessionmaker[AsyncSession]) -> None:
+        while True:
+            try:
+                await self.run(session_maker)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Media reconciliation failed: {e}")
+            await asyncio.sleep(media_s3_settings.RECONCILER_INTERVAL)
+
+    def start(self, session_maker: async_sessionmaker[AsyncSession]) -> None:
+        """Запускает периодическую сверку в фоне"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop(session_maker))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+media_reconciler = MediaReconciler()
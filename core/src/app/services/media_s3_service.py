@@ -1,10 +1,15 @@
 # app/services/media_s3_service.py
-import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
-from botocore.config import Config
 from core.src.app.repositories.media_s3_config import media_s3_settings
-from typing import Optional, BinaryIO, Literal
+from core.src.app.services.presigned_urls import PresignedUrlCache
+from core.src.app.services.storage_backends import StorageBackend, create_storage_backend
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, BinaryIO, Literal
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
+import hashlib
 import logging
+import time
 import uuid
 import mimetypes
 import urllib3
@@ -17,23 +22,19 @@ logger = logging.getLogger(__name__)
 
 class MediaS3Service:
     def __init__(self):
-        self.config = Config(
-            retries={'max_attempts': 3},
-            max_pool_connections=50
-        )
+        # Хранилище объектов (S3 или локальный диск), см. STORAGE_BACKEND
+        self.storage: StorageBackend = create_storage_backend()
         
-        self.client = boto3.client(
-            's3',
-            endpoint_url=media_s3_settings.S3_ENDPOINT,
-            aws_access_key_id=media_s3_settings.S3_ACCESS_KEY,
-            aws_secret_access_key=media_s3_settings.S3_SECRET_KEY,
-            region_name=media_s3_settings.S3_REGION,
-            config=self.config,
-            verify=False,
-            use_ssl=False
+        # Все блокирующие вызовы хранилища из async-кода идут через этот пул
+        self.executor = ThreadPoolExecutor(
+            max_workers=media_s3_settings.S3_MAX_CONCURRENCY,
+            thread_name_prefix="s3"
         )
         
-        self.bucket = media_s3_settings.S3_MEDIA_BUCKET
+        self.url_cache = PresignedUrlCache(
+            max_size=media_s3_settings.PRESIGNED_URL_CACHE_SIZE,
+            safety_margin=media_s3_settings.PRESIGNED_URL_SAFETY_MARGIN
+        )
         
     def validate_file(
         self, 
@@ -98,6 +99,45 @@ class MediaS3Service:
             logger.error(f"Error getting image dimensions: {e}")
             return 0, 0
     
+    def compute_content_hash(self, file_obj: BinaryIO, chunk_size: int = 1024 * 1024) -> str:
+        """SHA-256 содержимого, читается потоком по чанкам (позиция сохраняется)"""
+        current_pos = file_obj.tell()
+        file_obj.seek(0)
+        
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: file_obj.read(chunk_size), b''):
+            digest.update(chunk)
+        
+        file_obj.seek(current_pos)
+        return digest.hexdigest()
+    
+    def build_s3_key(
+        self,
+        filename: str,
+        media_type: Literal['image', 'video'],
+        course_id: Optional[int] = None,
+        lesson_id: Optional[int] = None,
+        user_id: Optional[int] = None
+    ) -> str:
+        """Генерирует уникальный путь объекта в S3"""
+        file_extension = filename.split('.')[-1] if '.' in filename else ''
+        unique_id = str(uuid.uuid4())
+        
+        # Фото от Telegram бота кладём отдельно от материалов курса
+        if user_id:
+            return f"user-photos/{user_id}/{media_type}s/{unique_id}.{file_extension}"
+        if course_id and lesson_id:
+            return f"courses/{course_id}/lessons/{lesson_id}/{media_type}s/{unique_id}.{file_extension}"
+        if course_id:
+            return f"courses/{course_id}/{media_type}s/{unique_id}.{file_extension}"
+        return f"{media_type}s/{unique_id}.{file_extension}"
+    
+    def max_size(self, media_type: Literal['image', 'video']) -> int:
+        """Максимальный размер файла для типа медиа"""
+        if media_type == 'image':
+            return media_s3_settings.MAX_IMAGE_SIZE
+        return media_s3_settings.MAX_VIDEO_SIZE
+    
     def upload_media(
         self, 
         file_obj: BinaryIO, 
@@ -131,19 +171,7 @@ class MediaS3Service:
                     content_type = 'application/octet-stream'
             
             # Генерируем путь в S3
-            file_extension = filename. split('.')[-1] if '.' in filename else ''
-            unique_id = str(uuid.uuid4())
-            
-            # ← ОБНОВЛЕННАЯ ЛОГИКА: проверяем user_id в первую очередь
-            if user_id:
-                # Для фото от Telegram бота
-                s3_key = f"user-photos/{user_id}/{media_type}s/{unique_id}.{file_extension}"
-            elif course_id and lesson_id:
-                s3_key = f"courses/{course_id}/lessons/{lesson_id}/{media_type}s/{unique_id}.{file_extension}"
-            elif course_id:
-                s3_key = f"courses/{course_id}/{media_type}s/{unique_id}.{file_extension}"
-            else:
-                s3_key = f"{media_type}s/{unique_id}.{file_extension}"
+            s3_key = self.build_s3_key(filename, media_type, course_id, lesson_id, user_id)
             
             # Метаданные
             metadata = {}
@@ -156,18 +184,15 @@ class MediaS3Service:
             
             # Загружаем в S3
             file_obj.seek(0)
-            self.client.upload_fileobj(
-                file_obj,
-                self.bucket,
+            self.storage.put_object(
                 s3_key,
-                ExtraArgs={
-                    'ContentType': content_type,
-                    'Metadata': {
-                        'media_type': media_type,
-                        'course_id': str(course_id) if course_id else '',
-                        'lesson_id':  str(lesson_id) if lesson_id else '',
-                        'user_id': str(user_id) if user_id else '',
-                    }
+                file_obj,
+                content_type,
+                {
+                    'media_type': media_type,
+                    'course_id': str(course_id) if course_id else '',
+                    'lesson_id':  str(lesson_id) if lesson_id else '',
+                    'user_id': str(user_id) if user_id else '',
                 }
             )
             
@@ -181,42 +206,378 @@ class MediaS3Service:
     def download_media(self, s3_key: str) -> bytes:
         """Скачивает медиа из S3"""
         try:
-            response = self.client.get_object(Bucket=self.bucket, Key=s3_key)
-            return response['Body'].read()
-        except ClientError as e: 
-            if e.response['Error']['Code'] == 'NoSuchKey':
-                raise Exception("Media not found in S3")
+            status_code, response = self.storage.get_object(s3_key)
+        except Exception as e:
             logger.error(f"Error downloading media from S3: {e}")
             raise Exception(f"Failed to download media: {e}")
+        if status_code == 404:
+            raise Exception("Media not found in S3")
+        
+        try:
+            return response['Body'].read()
+        finally:
+            response['Body'].close()
     
     def delete_media(self, s3_key: str) -> bool:
         """Удаляет медиа из S3"""
         try: 
-            self.client.delete_object(Bucket=self.bucket, Key=s3_key)
+            self.storage.delete_object(s3_key)
+            self.url_cache.invalidate(s3_key)
             logger.info(f"Media deleted successfully from S3: {s3_key}")
             return True
         except Exception as e: 
             logger.error(f"Error deleting media from S3: {e}")
             raise Exception(f"Failed to delete media: {e}")
     
-    def generate_presigned_url(self, s3_key: str, expires_in: int = 86400) -> str:
-        """Генерирует временную ссылку"""
+    def delete_media_batch(self, s3_keys: list[str]) -> list[dict]:
+        """
+        Удаляет до S3_DELETE_BATCH_SIZE объектов одним DeleteObjects
+        
+        Returns:
+            list[dict]: ошибки по ключам [{'s3_key', 'code', 'message'}]
+        """
+        errors = self.storage.delete_objects(s3_keys)
+        
+        failed = {error['s3_key'] for error in errors}
+        for s3_key in s3_keys:
+            if s3_key not in failed:
+                self.url_cache.invalidate(s3_key)
+        
+        logger.info(f"Batch deleted {len(s3_keys) - len(failed)}/{len(s3_keys)} objects from S3")
+        return errors
+    
+    def list_media_page(
+        self,
+        prefix: str,
+        max_keys: int,
+        continuation_token: Optional[str] = None
+    ) -> tuple[list[dict], Optional[str]]:
+        """
+        Одна страница ListObjectsV2 (ключи в порядке возрастания байтов UTF-8)
+        
+        Returns:
+            tuple[list[dict], Optional[str]]: (объекты, токен следующей страницы)
+        """
         try:
-            url = self. client.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': self.bucket, 'Key':  s3_key},
-                ExpiresIn=expires_in
-            )
-            return url
+            return self.storage.list_objects(prefix, max_keys, continuation_token)
+        except Exception as e:
+            logger.error(f"Error listing media in S3: {e}")
+            raise Exception(f"Failed to list media: {e}")
+    
+    def generate_presigned_url(self, s3_key: str, expires_in: Optional[int] = None) -> str:
+        """Генерирует временную ссылку (ссылки со стандартным сроком берутся из кэша)"""
+        if expires_in is None or expires_in == media_s3_settings.PRESIGNED_URL_EXPIRES:
+            return self.generate_presigned_urls([s3_key])[s3_key]
+        
+        try:
+            return self.storage.presign_get([s3_key], expires_in)[s3_key]
         except Exception as e:
             logger.error(f"Error generating presigned URL: {e}")
             raise Exception(f"Failed to generate URL: {e}")
     
+    def generate_presigned_upload(
+        self,
+        s3_key: str,
+        content_type: str,
+        size: int,
+        media_type: Literal['image', 'video'],
+        method: Literal['post', 'put'] = 'post'
+    ) -> dict:
+        """
+        Генерирует presigned POST/PUT для загрузки напрямую в бакет
+        
+        POST-политика ограничивает Content-Type и диапазон размера
+        (1..MAX_*_SIZE), у PUT подписаны Content-Type и Content-Length
+        заявленного размера.
+        
+        Returns:
+            dict: method, url, fields (для POST), headers (для PUT)
+        """
+        try:
+            return self.storage.presign_upload(
+                s3_key,
+                content_type,
+                size,
+                self.max_size(media_type),
+                method,
+                media_s3_settings.PRESIGNED_UPLOAD_EXPIRES
+            )
+        except Exception as e:
+            logger.error(f"Error generating presigned upload: {e}")
+            raise Exception(f"Failed to generate upload URL: {e}")
+    
+    def head_media(self, s3_key: str) -> Optional[dict]:
+        """Метаданные объекта (None, если объекта нет)"""
+        try:
+            return self.storage.head_object(s3_key)
+        except Exception as e:
+            logger.error(f"Error reading media metadata from S3: {e}")
+            raise Exception(f"Failed to read media metadata: {e}")
+    
+    def open_media_stream(
+        self,
+        s3_key: str,
+        range_header: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[datetime] = None
+    ) -> tuple[int, dict]:
+        """
+        Открывает объект без чтения тела: Range и условные заголовки проверяет хранилище
+        
+        Returns:
+            tuple[int, dict]: (HTTP-статус, ответ). Для 200/206 в ответе есть
+            поток Body, который нужно дочитать или закрыть; для 304/404/416 -
+            только заголовки.
+        """
+        try:
+            return self.storage.get_object(s3_key, range_header, if_none_match, if_modified_since)
+        except Exception as e:
+            logger.error(f"Error opening media stream from S3: {e}")
+            raise Exception(f"Failed to download media: {e}")
+    
+    def download_media_range(self, s3_key: str, length: int) -> bytes:
+        """Скачивает первые length байт объекта"""
+        try:
+            status_code, response = self.storage.get_object(s3_key, f"bytes=0-{length - 1}")
+        except Exception as e:
+            logger.error(f"Error downloading media range from S3: {e}")
+            raise Exception(f"Failed to download media: {e}")
+        if status_code == 416:
+            return b''
+        if status_code == 404:
+            raise Exception("Media not found in S3")
+        
+        try:
+            return response['Body'].read()
+        finally:
+            response['Body'].close()
+    
+    def create_multipart_upload(self, s3_key: str, content_type: str) -> str:
+        """Начинает multipart-загрузку, возвращает UploadId"""
+        try:
+            return self.storage.create_multipart_upload(s3_key, content_type)
+        except Exception as e:
+            logger.error(f"Error creating multipart upload: {e}")
+            raise Exception(f"Failed to start upload: {e}")
+    
+    def upload_part(self, s3_key: str, upload_id: str, part_number: int, body: bytes) -> str:
+        """Загружает одну часть, возвращает её ETag"""
+        try:
+            return self.storage.upload_part(s3_key, upload_id, part_number, body)
+        except Exception as e:
+            logger.error(f"Error uploading part {part_number} of {s3_key}: {e}")
+            raise Exception(f"Failed to upload part: {e}")
+    
+    def complete_multipart_upload(self, s3_key: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        """Собирает объект из частей [(part_number, etag), ...]"""
+        try:
+            self.storage.complete_multipart_upload(s3_key, upload_id, parts)
+        except Exception as e:
+            logger.error(f"Error completing multipart upload: {e}")
+            raise Exception(f"Failed to complete upload: {e}")
+    
+    def abort_multipart_upload(self, s3_key: str, upload_id: str) -> None:
+        """Отменяет multipart-загрузку и освобождает загруженные части"""
+        try:
+            self.storage.abort_multipart_upload(s3_key, upload_id)
+        except Exception as e:
+            logger.error(f"Error aborting multipart upload: {e}")
+            raise Exception(f"Failed to abort upload: {e}")
+    
+    def generate_presigned_urls(self, s3_keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Генерирует временные ссылки для нескольких объектов
+        
+        Ссылки берутся из кэша, пока им осталось жить дольше
+        PRESIGNED_URL_SAFETY_MARGIN; недостающие подписываются одним
+        проходом с общим ключом подписи.
+        
+        Returns:
+            Dict[str, str]: s3_key -> presigned URL
+        """
+        expires_in = media_s3_settings.PRESIGNED_URL_EXPIRES
+        urls = {}
+        missing = []
+        for s3_key in s3_keys:
+            url = self.url_cache.get(s3_key)
+            if url is None:
+                missing.append(s3_key)
+            else:
+                urls[s3_key] = url
+        
+        if not missing:
+            return urls
+        
+        signed_at = time.time()
+        try:
+            signed = self.storage.presign_get(missing, expires_in)
+        except Exception as e:
+            logger.error(f"Error generating presigned URLs: {e}")
+            raise Exception(f"Failed to generate URL: {e}")
+        
+        for s3_key, url in signed.items():
+            self.url_cache.put(s3_key, url, expires_in, signed_at)
+        urls.update(signed)
+        return urls
+    
+    async def _run_in_executor(self, timeout: int, operation: str, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Выполняет блокирующий вызов в пуле потоков S3 с таймаутом
+        
+        При таймауте запрос освобождается сразу, а поток дорабатывает
+        вызов в пределах connect/read таймаутов boto3.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(self.executor, partial(func, *args, **kwargs)),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"S3 {operation} timed out after {timeout}s")
+            raise Exception(f"S3 {operation} timed out after {timeout}s")
+    
+    async def upload_media_async(self, file_obj: BinaryIO, filename: str, **kwargs: Any) -> tuple[str, dict]:
+        """Асинхронная версия upload_media (выполняется в пуле потоков)"""
+        return await self._run_in_executor(
+            media_s3_settings.S3_UPLOAD_TIMEOUT, "upload",
+            self.upload_media, file_obj, filename, **kwargs
+        )
+    
+    async def compute_content_hash_async(self, file_obj: BinaryIO) -> str:
+        """Асинхронная версия compute_content_hash (выполняется в пуле потоков)"""
+        return await self._run_in_executor(
+            media_s3_settings.S3_UPLOAD_TIMEOUT, "hash",
+            self.compute_content_hash, file_obj
+        )
+    
+    async def download_media_async(self, s3_key: str) -> bytes:
+        """Асинхронная версия download_media (выполняется в пуле потоков)"""
+        return await self._run_in_executor(
+            media_s3_settings.S3_DOWNLOAD_TIMEOUT, "download",
+            self.download_media, s3_key
+        )
+    
+    async def delete_media_async(self, s3_key: str) -> bool:
+        """Асинхронная версия delete_media (выполняется в пуле потоков)"""
+        return await self._run_in_executor(
+            media_s3_settings.S3_DELETE_TIMEOUT, "delete",
+            self.delete_media, s3_key
+        )
+    
+    async def delete_media_batch_async(self, s3_keys: list[str]) -> list[dict]:
+        """Удаляет объекты пачками по S3_DELETE_BATCH_SIZE параллельно в пуле потоков"""
+        batch_size = media_s3_settings.S3_DELETE_BATCH_SIZE
+        chunks = [s3_keys[i:i + batch_size] for i in range(0, len(s3_keys), batch_size)]
+        
+        async def delete_chunk(chunk: list[str]) -> list[dict]:
+            try:
+                return await self._run_in_executor(
+                    media_s3_settings.S3_DELETE_TIMEOUT, "delete_objects",
+                    self.delete_media_batch, chunk
+                )
+            except Exception as e:
+                return [{'s3_key': s3_key, 'code': 'Timeout', 'message': str(e)} for s3_key in chunk]
+        
+        results = await asyncio.gather(*(delete_chunk(chunk) for chunk in chunks))
+        return [error for errors in results for error in errors]
+    
+    async def list_media_page_async(
+        self,
+        prefix: str,
+        max_keys: int,
+        continuation_token: Optional[str] = None
+    ) -> tuple[list[dict], Optional[str]]:
+        """Асинхронная версия list_media_page (выполняется в пуле потоков)"""
+        return await self._run_in_executor(
+            media_s3_settings.S3_READ_TIMEOUT, "list_objects",
+            self.list_media_page, prefix, max_keys, continuation_token
+        )
+    
+    async def head_media_async(self, s3_key: str) -> Optional[dict]:
+        """Асинхронная версия head_media (выполняется в пуле потоков)"""
+        return await self._run_in_executor(
+            media_s3_settings.S3_HEAD_TIMEOUT, "head_object",
+            self.head_media, s3_key
+        )
+    
+    async def open_media_stream_async(self, s3_key: str, **kwargs: Any) -> tuple[int, dict]:
+        """Асинхронная версия open_media_stream (выполняется в пуле потоков)"""
+        return await self._run_in_executor(
+            media_s3_settings.S3_HEAD_TIMEOUT, "get_object",
+            self.open_media_stream, s3_key, **kwargs
+        )
+    
+    async def iter_media_stream(self, body: Any) -> AsyncIterator[bytes]:
+        """
+        Читает тело GetObject кусками по S3_STREAM_CHUNK_SIZE
+        
+        Каждый кусок читается в пуле потоков только после того, как
+        предыдущий отдан клиенту, поэтому память не зависит от размера файла.
+        При обрыве соединения поток S3 закрывается.
+        """
+        try:
+            while True:
+                chunk = await self._run_in_executor(
+                    media_s3_settings.S3_READ_TIMEOUT, "read",
+                    body.read, media_s3_settings.S3_STREAM_CHUNK_SIZE
+                )
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+    
+    async def download_media_range_async(self, s3_key: str, length: int) -> bytes:
+        """Асинхронная версия download_media_range (выполняется в пуле потоков)"""
+        return await self._run_in_executor(
+            media_s3_settings.S3_DOWNLOAD_TIMEOUT, "download",
+            self.download_media_range, s3_key, length
+        )
+    
+    async def create_multipart_upload_async(self, s3_key: str, content_type: str) -> str:
+        """Асинхронная версия create_multipart_upload (выполняется в пуле потоков)"""
+        return await self._run_in_executor(
+            media_s3_settings.S3_HEAD_TIMEOUT, "create_multipart_upload",
+            self.create_multipart_upload, s3_key, content_type
+        )
+    
+    async def upload_part_async(self, s3_key: str, upload_id: str, part_number: int, body: bytes) -> str:
+        """Асинхронная версия upload_part (выполняется в пуле потоков)"""
+        return await self._run_in_executor(
+            media_s3_settings.S3_UPLOAD_TIMEOUT, "upload_part",
+            self.upload_part, s3_key, upload_id, part_number, body
+        )
+    
+    async def complete_multipart_upload_async(self, s3_key: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        """Асинхронная версия complete_multipart_upload (выполняется в пуле потоков)"""
+        return await self._run_in_executor(
+            media_s3_settings.S3_UPLOAD_TIMEOUT, "complete_multipart_upload",
+            self.complete_multipart_upload, s3_key, upload_id, parts
+        )
+    
+    async def abort_multipart_upload_async(self, s3_key: str, upload_id: str) -> None:
+        """Асинхронная версия abort_multipart_upload (выполняется в пуле потоков)"""
+        return await self._run_in_executor(
+            media_s3_settings.S3_DELETE_TIMEOUT, "abort_multipart_upload",
+            self.abort_multipart_upload, s3_key, upload_id
+        )
+    
+    async def check_connection_async(self) -> bool:
+        """Асинхронная версия check_connection (выполняется в пуле потоков)"""
+        try:
+            return await self._run_in_executor(
+                media_s3_settings.S3_HEAD_TIMEOUT, "head_bucket",
+                self.check_connection
+            )
+        except Exception:
+            return False
+    
     def check_connection(self) -> bool:
         """Проверяет подключение к S3"""
         try:
-            self.client.head_bucket(Bucket=self.bucket)
-            logger.info(f"S3 connection successful for bucket: {self.bucket}")
+            self.storage.check()
+            logger.info(f"Media storage available: {self.storage.name}")
             return True
         except Exception as e:
             logger.error(f"S3 connection failed:  {e}")
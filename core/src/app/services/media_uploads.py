@@ -0,0 +1,232 @@
+# app/services/media_uploads.py
+"""Двухфазная загрузка медиа напрямую в бакет: presign → PUT/POST в S3 → finalize."""
+
+import io
+import logging
+import time
+from typing import Literal, Optional
+
+from fastapi import HTTPException, status
+from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.src.app.core.config import settings
+from core.src.app.models.course_media import CourseMedia
+from core.src.app.repositories.base import dialect_insert
+from core.src.app.repositories.media_s3_config import media_s3_settings
+from core.src.app.services.media_s3_service import media_s3_service
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_TOKEN_PURPOSE = "media_upload"
+
+# Заголовков JPEG/PNG/GIF/WebP хватает, чтобы PIL определил размеры
+IMAGE_HEADER_BYTES = 256 * 1024
+
+
+def create_upload(
+    filename: str,
+    content_type: str,
+    size: int,
+    media_type: Literal['image', 'video'],
+    method: Literal['post', 'put'] = 'post',
+    course_id: Optional[int] = None,
+    lesson_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    custom_name: Optional[str] = None
+) -> dict:
+    """
+    Проверяет заявленный файл и выдаёт presigned POST/PUT и токен загрузки
+
+    Токен подписан SECRET_KEY и хранит всё, что нужно для finalize, поэтому
+    между фазами на сервере ничего не сохраняется.
+
+    Returns:
+        dict: поля PresignedUploadResponse
+    """
+    is_valid, error_msg = media_s3_service.validate_file(size, content_type, filename, media_type)
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error_msg
+        )
+
+    s3_key = media_s3_service.build_s3_key(filename, media_type, course_id, lesson_id, user_id)
+    presigned = media_s3_service.generate_presigned_upload(s3_key, content_type, size, media_type, method)
+
+    expires_in = media_s3_settings.PRESIGNED_UPLOAD_EXPIRES
+    upload_token = jwt.encode(
+        {
+            "purpose": UPLOAD_TOKEN_PURPOSE,
+            "s3_key": s3_key,
+            "filename": filename,
+            "content_type": content_type,
+            "size": size,
+            "media_type": media_type,
+            "course_id": course_id,
+            "lesson_id": lesson_id,
+            "user_id": user_id,
+            "custom_name": custom_name,
+            "exp": int(time.time()) + expires_in,
+        },
+        settings.SECRET_KEY,
+        algorithm="HS256"
+    )
+
+    logger.info(f"Issued presigned {method.upper()} upload for {s3_key} ({size} bytes)")
+    return {
+        "upload_token": upload_token,
+        "s3_key": s3_key,
+        "expires_in": expires_in,
+        **presigned,
+    }
+
+
+def decode_upload_token(upload_token: str) -> dict:
+    """Проверяет подпись и срок токена загрузки"""
+    try:
+        claims = jwt.decode(upload_token, settings.SECRET_KEY, algorithms=["HS256"])
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Недействительный или просроченный токен загрузки"
+        )
+
+    if claims.get("purpose") != UPLOAD_TOKEN_PURPOSE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Недействительный токен загрузки"
+        )
+    return claims
+
+
+async def finalize_upload(db: AsyncSession, upload_token: str) -> CourseMedia:
+    """
+    Проверяет загруженный объект через HEAD и создаёт запись CourseMedia
+
+    Повторный вызов с тем же токеном возвращает уже созданную запись.
+    Если объект не соответствует заявленным размеру или типу, он удаляется
+    из бакета.
+
+    Args:
+        db: Сессия БД
+        upload_token: Токен из presign
+
+    Returns:
+        CourseMedia: Созданная (или ранее созданная) запись
+    """
+    claims = decode_upload_token(upload_token)
+    s3_key = claims["s3_key"]
+    media_type = claims["media_type"]
+
+    existing = await _get_unhashed_media(db, s3_key)
+    if existing:
+        return existing
+
+    head = await media_s3_service.head_media_async(s3_key)
+    if head is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Файл ещё не загружен в хранилище"
+        )
+
+    size = head.get("ContentLength", 0)
+    content_type = head.get("ContentType") or claims["content_type"]
+    is_valid, error_msg = media_s3_service.validate_file(size, content_type, claims["filename"], media_type)
+    if is_valid and content_type != claims["content_type"]:
+        is_valid, error_msg = False, "Тип загруженного файла не совпадает с заявленным"
+
+    if not is_valid:
+        try:
+            await media_s3_service.delete_media_async(s3_key)
+        except Exception as e:
+            logger.error(f"Failed to delete rejected upload {s3_key}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error_msg
+        )
+
+    return await create_media_record(
+        db,
+        s3_key=s3_key,
+        filename=claims["filename"],
+        content_type=content_type,
+        media_type=media_type,
+        size=size,
+        course_id=claims.get("course_id"),
+        lesson_id=claims.get("lesson_id"),
+        user_id=claims.get("user_id"),
+        custom_name=claims.get("custom_name")
+    )
+
+
+async def create_media_record(
+    db: AsyncSession,
+    s3_key: str,
+    filename: str,
+    content_type: str,
+    media_type: Literal['image', 'video'],
+    size: int,
+    course_id: Optional[int] = None,
+    lesson_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    custom_name: Optional[str] = None,
+    commit: bool = True
+) -> CourseMedia:
+    """
+    Создаёт CourseMedia для объекта, уже лежащего в бакете
+
+    С commit=False запись только отправляется в БД (flush), фиксирует
+    транзакцию вызывающий код.
+    """
+    width = height = None
+    if media_type == 'image':
+        try:
+            header = await media_s3_service.download_media_range_async(
+                s3_key, min(size, IMAGE_HEADER_BYTES)
+            )
+            width, height = media_s3_service.get_image_dimensions(io.BytesIO(header))
+        except Exception as e:
+            logger.warning(f"Could not read image dimensions for {s3_key}: {e}")
+
+    # Параллельный finalize того же токена упирается в уникальный индекс
+    # ux_course_media_s3_key_unhashed и получает уже созданную запись
+    stmt = dialect_insert(db, CourseMedia).values(
+        filename=filename,
+        original_filename=filename,
+        custom_name=custom_name,
+        size=size,
+        content_type=content_type,
+        media_type=media_type,
+        s3_key=s3_key,
+        course_id=course_id,
+        lesson_id=lesson_id,
+        user_id=user_id,
+        width=width,
+        height=height,
+    ).on_conflict_do_nothing(
+        index_elements=[CourseMedia.s3_key],
+        index_where=CourseMedia.content_hash.is_(None),
+    ).returning(CourseMedia.id)
+    inserted_id = (await db.execute(stmt)).scalar_one_or_none()
+    if commit:
+        await db.commit()
+    else:
+        await db.flush()
+
+    db_media = await _get_unhashed_media(db, s3_key)
+    if inserted_id is not None:
+        logger.info(f"Uploaded object registered: {db_media.id} ({s3_key}, {size} bytes)")
+    return db_media
+
+
+async def _get_unhashed_media(db: AsyncSession, s3_key: str) -> Optional[CourseMedia]:
+    """Запись, владеющая объектом s3_key единолично (без хэша содержимого)"""
+    result = await db.execute(
+        select(CourseMedia).where(
+            CourseMedia.s3_key == s3_key,
+            CourseMedia.content_hash.is_(None)
+        )
+    )
+    return result.scalar_one_or_none()
@@ -0,0 +1,150 @@
+"""In-process cache of serialized, compressed API response snapshots."""
+
+import gzip
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+from core.src.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SnapshotKey = Tuple[str, int]
+SnapshotTag = Tuple[str, Hashable]
+
+
+class ResponseSnapshot:
+    """
+    Gzip-compressed JSON body of a response together with its strong ETag.
+
+    owner_id is kept next to the body so access checks can be done without
+    touching the database. tags name the rows the body was built from
+    (questions, source tests, ...) and are used for invalidation.
+    """
+
+    __slots__ = ("body", "etag", "owner_id", "tags", "created_at")
+
+    def __init__(self, payload: bytes, owner_id: str, tags: Iterable[SnapshotTag]):
+        self.body = gzip.compress(payload)
+        self.etag = '"' + hashlib.sha256(payload).hexdigest()[:32] + '"'
+        self.owner_id = owner_id
+        self.tags = frozenset(tags)
+        self.created_at = time.monotonic()
+
+    def to_response(self, request: Request) -> Response:
+        """Build a response, answering conditional requests with 304."""
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            headers["Vary"] = "Accept-Encoding"
+            return Response(content=self.body, media_type="application/json", headers=headers)
+
+        return Response(
+            content=gzip.decompress(self.body),
+            media_type="application/json",
+            headers=headers
+        )
+
+
+class ResponseSnapshotCache:
+    """
+    LRU cache of response snapshots keyed by (kind, id).
+
+    Snapshots are built on first read and dropped by tag when a referenced
+    question, option or media item is edited. Entries also expire after
+    RESPONSE_SNAPSHOT_CACHE_TTL seconds, which bounds staleness across
+    worker processes.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._snapshots: "OrderedDict[SnapshotKey, ResponseSnapshot]" = OrderedDict()
+        self._tagged: Dict[SnapshotTag, Set[SnapshotKey]] = {}
+
+    def get(self, key: SnapshotKey) -> Optional[ResponseSnapshot]:
+        """Get a snapshot if it is present and not expired."""
+        snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            return None
+
+        if time.monotonic() - snapshot.created_at > self.ttl:
+            self.invalidate(key)
+            return None
+
+        self._snapshots.move_to_end(key)
+        return snapshot
+
+    def put(
+        self,
+        key: SnapshotKey,
+        model: BaseModel,
+        owner_id: str,
+        tags: Iterable[SnapshotTag]
+    ) -> ResponseSnapshot:
+        """Serialize a response model and store it, evicting the LRU entry if full."""
+        snapshot = ResponseSnapshot(model.model_dump_json().encode(), owner_id, tags)
+
+        self.invalidate(key)
+        self._snapshots[key] = snapshot
+        for tag in snapshot.tags:
+            self._tagged.setdefault(tag, set()).add(key)
+
+        while len(self._snapshots) > self.max_size:
+            self.invalidate(next(iter(self._snapshots)))
+
+        return snapshot
+
+    def invalidate(self, key: SnapshotKey) -> None:
+        """Drop a single snapshot."""
+        snapshot = self._snapshots.pop(key, None)
+        if snapshot is None:
+            return
+
+        for tag in snapshot.tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    def invalidate_tag(self, tag: SnapshotTag) -> None:
+        """Drop every snapshot built from the tagged row."""
+        keys = self._tagged.pop(tag, set())
+        for key in list(keys):
+            self.invalidate(key)
+        if keys:
+            logger.debug(f"Invalidated {len(keys)} response snapshots for {tag}")
+
+    def invalidate_question(self, question_id: int) -> None:
+        """Drop snapshots that contain a question, its options or their media."""
+        self.invalidate_tag(("question", question_id))
+
+    def invalidate_test(self, test_id: int) -> None:
+        """Drop snapshots that reference a source test."""
+        self.invalidate_tag(("test", test_id))
+
+    def invalidate_combined_test(self, combined_test_id: int) -> None:
+        """Drop the snapshot of a combined test and of all its attempts."""
+        self.invalidate_tag(("combined_test", combined_test_id))
+
+    def clear(self) -> None:
+        """Drop all snapshots."""
+        self._snapshots.clear()
+        self._tagged.clear()
+
+
+response_snapshot_cache = ResponseSnapshotCache(
+    max_size=settings.RESPONSE_SNAPSHOT_CACHE_SIZE,
+    ttl=settings.RESPONSE_SNAPSHOT_CACHE_TTL
+)
@@ -0,0 +1,727 @@
+# app/services/storage_backends.py
+"""Хранилища медиа: S3 (boto3) и локальная файловая система с подписанными ссылками."""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import mimetypes
+import mmap
+import os
+import shutil
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Dict, Iterator, List, Literal, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from core.src.app.core.config import settings
+from core.src.app.repositories.media_s3_config import media_s3_settings
+from core.src.app.services.presigned_urls import PresignedUrlSigner
+
+logger = logging.getLogger(__name__)
+
+
+class StorageBackend(ABC):
+    """
+    Операции над объектами, которые нужны MediaS3Service
+
+    Ответы имеют форму ответов S3 (ContentLength, ContentType, ETag,
+    LastModified, Body, Key/Size в листинге), чтобы вызывающий код не
+    зависел от конкретного хранилища. Все методы блокирующие - из async-кода
+    они вызываются через пул потоков сервиса.
+    """
+
+    name: str
+
+    @abstractmethod
+    def put_object(self, key: str, file_obj: BinaryIO, content_type: str, metadata: Dict[str, str]) -> None:
+        """Сохраняет объект целиком"""
+
+    @abstractmethod
+    def get_object(
+        self,
+        key: str,
+        range_header: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[datetime] = None
+    ) -> Tuple[int, dict]:
+        """
+        Открывает объект на чтение
+
+        Returns:
+            Tuple[int, dict]: (HTTP-статус, ответ). Для 200/206 в ответе есть
+            поток Body, который нужно дочитать или закрыть; для 304/404/416 -
+            только заголовки.
+        """
+
+    @abstractmethod
+    def head_object(self, key: str) -> Optional[dict]:
+        """Метаданные объекта (None, если объекта нет)"""
+
+    @abstractmethod
+    def delete_object(self, key: str) -> None:
+        """Удаляет объект (отсутствующий объект - не ошибка)"""
+
+    @abstractmethod
+    def delete_objects(self, keys: List[str]) -> List[dict]:
+        """Удаляет несколько объектов, возвращает ошибки [{'s3_key', 'code', 'message'}]"""
+
+    @abstractmethod
+    def list_objects(
+        self,
+        prefix: str,
+        max_keys: int,
+        continuation_token: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Страница объектов по возрастанию байтов ключа: (объекты, токен следующей страницы)"""
+
+    @abstractmethod
+    def presign_get(self, keys: List[str], expires_in: int) -> Dict[str, str]:
+        """Временные ссылки на скачивание"""
+
+    @abstractmethod
+    def presign_upload(
+        self,
+        key: str,
+        content_type: str,
+        size: int,
+        max_size: int,
+        method: Literal['post', 'put'],
+        expires_in: int
+    ) -> dict:
+        """Временная ссылка на загрузку: method, url, fields, headers"""
+
+    @abstractmethod
+    def create_multipart_upload(self, key: str, content_type: str) -> str:
+        """Начинает загрузку по частям, возвращает её ID"""
+
+    @abstractmethod
+    def upload_part(self, key: str, upload_id: str, part_number: int, body: bytes) -> str:
+        """Сохраняет часть, возвращает её ETag"""
+
+    @abstractmethod
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        """Собирает объект из частей [(part_number, etag), ...]"""
+
+    @abstractmethod
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        """Отменяет загрузку по частям"""
+
+    @abstractmethod
+    def check(self) -> None:
+        """Проверяет доступность хранилища (исключение, если недоступно)"""
+
+
+class S3StorageBackend(StorageBackend):
+    """Бакет S3/MinIO через boto3"""
+
+    name = 's3'
+
+    def __init__(self):
+        self.config = Config(
+            retries={'max_attempts': 3},
+            max_pool_connections=max(50, media_s3_settings.S3_MAX_CONCURRENCY),
+            connect_timeout=media_s3_settings.S3_CONNECT_TIMEOUT,
+            read_timeout=media_s3_settings.S3_READ_TIMEOUT
+        )
+
+        self.client = boto3.client(
+            's3',
+            endpoint_url=media_s3_settings.S3_ENDPOINT,
+            aws_access_key_id=media_s3_settings.S3_ACCESS_KEY,
+            aws_secret_access_key=media_s3_settings.S3_SECRET_KEY,
+            region_name=media_s3_settings.S3_REGION,
+            config=self.config,
+            verify=False,
+            use_ssl=False
+        )
+
+        self.bucket = media_s3_settings.S3_MEDIA_BUCKET
+        self._signer: Optional[PresignedUrlSigner] = None
+
+    @property
+    def signer(self) -> Optional[PresignedUrlSigner]:
+        """Пакетный SigV4-подписчик (None, если ключи доступа не заданы)"""
+        if self._signer is None and media_s3_settings.S3_ACCESS_KEY and media_s3_settings.S3_SECRET_KEY:
+            self._signer = PresignedUrlSigner(
+                self.client,
+                self.bucket,
+                access_key=media_s3_settings.S3_ACCESS_KEY,
+                secret_key=media_s3_settings.S3_SECRET_KEY,
+                region=media_s3_settings.S3_REGION
+            )
+        return self._signer
+
+    def put_object(self, key: str, file_obj: BinaryIO, content_type: str, metadata: Dict[str, str]) -> None:
+        self.client.upload_fileobj(
+            file_obj,
+            self.bucket,
+            key,
+            ExtraArgs={'ContentType': content_type, 'Metadata': metadata}
+        )
+
+    def get_object(
+        self,
+        key: str,
+        range_header: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[datetime] = None
+    ) -> Tuple[int, dict]:
+        # Range и условные заголовки проверяет сам S3
+        params = {'Bucket': self.bucket, 'Key': key}
+        if range_header:
+            params['Range'] = range_header
+        if if_none_match:
+            params['IfNoneMatch'] = if_none_match
+        elif if_modified_since:
+            params['IfModifiedSince'] = if_modified_since
+
+        try:
+            response = self.client.get_object(**params)
+        except ClientError as e:
+            status_code = e.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+            if status_code in (304, 404, 416):
+                return status_code, e.response.get('ResponseMetadata', {}).get('HTTPHeaders', {})
+            raise
+
+        return response['ResponseMetadata']['HTTPStatusCode'], response
+
+    def head_object(self, key: str) -> Optional[dict]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def delete_object(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def delete_objects(self, keys: List[str]) -> List[dict]:
+        try:
+            response = self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+            )
+        except ClientError as e:
+            logger.error(f"Error batch deleting media from S3: {e}")
+            code = e.response.get('Error', {}).get('Code', '')
+            return [{'s3_key': key, 'code': code, 'message': str(e)} for key in keys]
+
+        return [
+            {'s3_key': error['Key'], 'code': error.get('Code', ''), 'message': error.get('Message', '')}
+            for error in response.get('Errors', [])
+        ]
+
+    def list_objects(
+        self,
+        prefix: str,
+        max_keys: int,
+        continuation_token: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        params = {'Bucket': self.bucket, 'Prefix': prefix, 'MaxKeys': max_keys}
+        if continuation_token:
+            params['ContinuationToken'] = continuation_token
+        response = self.client.list_objects_v2(**params)
+
+        next_token = response.get('NextContinuationToken') if response.get('IsTruncated') else None
+        return response.get('Contents', []), next_token
+
+    def presign_get(self, keys: List[str], expires_in: int) -> Dict[str, str]:
+        if self.signer is not None and expires_in == media_s3_settings.PRESIGNED_URL_EXPIRES:
+            return self.signer.sign_many(keys, expires_in)
+        return {
+            key: self.client.generate_presigned_url(
+                'get_object',
+                Params={'Bucket': self.bucket, 'Key': key},
+                ExpiresIn=expires_in
+            )
+            for key in keys
+        }
+
+    def presign_upload(
+        self,
+        key: str,
+        content_type: str,
+        size: int,
+        max_size: int,
+        method: Literal['post', 'put'],
+        expires_in: int
+    ) -> dict:
+        # POST-политика ограничивает Content-Type и диапазон размера,
+        # у PUT подписаны Content-Type и Content-Length заявленного размера
+        if method == 'post':
+            presigned = self.client.generate_presigned_post(
+                Bucket=self.bucket,
+                Key=key,
+                Fields={'Content-Type': content_type},
+                Conditions=[
+                    {'Content-Type': content_type},
+                    ['content-length-range', 1, max_size],
+                ],
+                ExpiresIn=expires_in
+            )
+            return {'method': 'post', 'url': presigned['url'], 'fields': presigned['fields'], 'headers': {}}
+
+        url = self.client.generate_presigned_url(
+            'put_object',
+            Params={
+                'Bucket': self.bucket,
+                'Key': key,
+                'ContentType': content_type,
+                'ContentLength': size,
+            },
+            ExpiresIn=expires_in
+        )
+        return {
+            'method': 'put',
+            'url': url,
+            'fields': {},
+            'headers': {'Content-Type': content_type, 'Content-Length': str(size)},
+        }
+
+    def create_multipart_upload(self, key: str, content_type: str) -> str:
+        response = self.client.create_multipart_upload(Bucket=self.bucket, Key=key, ContentType=content_type)
+        return response['UploadId']
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, body: bytes) -> str:
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body
+        )
+        return response['ETag']
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={
+                'Parts': [{'PartNumber': number, 'ETag': etag} for number, etag in parts]
+            }
+        )
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+
+    def check(self) -> None:
+        self.client.head_bucket(Bucket=self.bucket)
+
+
+class MmapBody:
+    """
+    Тело ответа локального хранилища: диапазон файла через mmap
+
+    Куски отдаются срезами отображённой памяти без промежуточных read()
+    и без буфера на весь файл; интерфейс как у StreamingBody (read/close).
+    """
+
+    def __init__(self, path: Path, start: int, length: int):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if length else None
+        self._pos = start
+        self._end = start + length
+
+    def read(self, size: int = -1) -> bytes:
+        if self._map is None or self._pos >= self._end:
+            return b''
+        end = self._end if size is None or size < 0 else min(self._pos + size, self._end)
+        chunk = self._map[self._pos:end]
+        self._pos = end
+        return chunk
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Объекты в каталоге на локальном диске (один сервер, бенчмарки без бакета)
+
+    Ключ объекта - относительный путь внутри root. Служебные данные лежат в
+    каталогах с точкой, которые не попадают в листинг: .meta (Content-Type и
+    метаданные), .uploads (части multipart-загрузок), .tmp (недописанные
+    файлы; запись атомарна через os.replace). Presigned-ссылки ведут на
+    /s3/local этого же API и подписаны HMAC-SHA256 отдельным ключом,
+    производным от SECRET_KEY (см. local_storage_signing_key).
+    """
+
+    name = 'local'
+
+    def __init__(self, root: str, public_url: str, signing_key: bytes):
+        self.root = Path(root).resolve()
+        self.public_url = public_url.rstrip('/')
+        self._secret = signing_key
+        for name in ('.meta', '.uploads', '.tmp'):
+            (self.root / name).mkdir(parents=True, exist_ok=True)
+
+    # --- пути и служебные файлы ---
+
+    def _path(self, key: str) -> Path:
+        parts = key.split('/')
+        if not key or key.startswith('/') or any(part in ('', '.', '..') for part in parts) or parts[0].startswith('.'):
+            raise ValueError(f"Invalid object key: {key}")
+        return self.root / key
+
+    def check_key(self, key: str) -> None:
+        """ValueError, если ключ выходит за пределы root или указывает на служебный каталог"""
+        self._path(key)
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / '.meta' / f"{key}.json"
+
+    def _tmp_path(self) -> Path:
+        return self.root / '.tmp' / uuid.uuid4().hex
+
+    def _upload_dir(self, upload_id: str) -> Path:
+        if not upload_id.isalnum():
+            raise ValueError(f"Invalid upload id: {upload_id}")
+        return self.root / '.uploads' / upload_id
+
+    def _commit(self, tmp_path: Path, key: str, content_type: str, metadata: Dict[str, str]) -> None:
+        """Публикует дописанный временный файл под ключом"""
+        path = self._path(key)
+        meta_path = self._meta_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+
+        meta_tmp = self._tmp_path()
+        meta_tmp.write_text(json.dumps({'ContentType': content_type, 'Metadata': metadata}))
+        os.replace(meta_tmp, meta_path)
+        os.replace(tmp_path, path)
+
+    def _read_meta(self, key: str) -> dict:
+        try:
+            return json.loads(self._meta_path(key).read_text())
+        except (FileNotFoundError, ValueError):
+            content_type, _ = mimetypes.guess_type(key)
+            return {'ContentType': content_type or 'application/octet-stream', 'Metadata': {}}
+
+    def _stat(self, key: str) -> Optional[os.stat_result]:
+        path = self._path(key)
+        try:
+            return path.stat() if path.is_file() else None
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _etag(stat: os.stat_result) -> str:
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+    @staticmethod
+    def _last_modified(stat: os.stat_result) -> datetime:
+        return datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc)
+
+    @staticmethod
+    def _parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+        """
+        Один диапазон bytes=a-b / a- / -n как (start, end включительно)
+
+        None - заголовок не поддерживается (несколько диапазонов, мусор) и,
+        как в S3, отдаётся весь объект; (-1, -1) - диапазон невыполним.
+        """
+        units, _, spec = range_header.partition('=')
+        if units.strip().lower() != 'bytes' or ',' in spec:
+            return None
+        first, sep, last = spec.strip().partition('-')
+        if not sep:
+            return None
+        try:
+            if not first:
+                suffix = int(last)
+                if suffix <= 0:
+                    return -1, -1
+                return max(size - suffix, 0), size - 1
+            start = int(first)
+            end = int(last) if last else size - 1
+        except ValueError:
+            return None
+        if start >= size:
+            return -1, -1
+        if end < start:
+            return None
+        return start, min(end, size - 1)
+
+    # --- подписанные ссылки ---
+
+    def _signature(self, method: str, key: str, expires: int, content_type: str = '', size: str = '') -> str:
+        message = f"{method}\n{key}\n{expires}\n{content_type}\n{size}".encode()
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+
+    def _signed_url(self, key: str, params: Dict[str, str]) -> str:
+        return f"{self.public_url}/{quote(key, safe='/~')}?{urlencode(params)}"
+
+    def verify_signature(
+        self,
+        method: str,
+        key: str,
+        expires: int,
+        signature: str,
+        content_type: str = '',
+        size: str = ''
+    ) -> bool:
+        """Проверяет подписанную ссылку /s3/local (метод, ключ, срок и ограничения загрузки)"""
+        if expires < time.time():
+            return False
+        expected = self._signature(method, key, expires, content_type, size)
+        return hmac.compare_digest(expected, signature)
+
+    # --- StorageBackend ---
+
+    def put_object(self, key: str, file_obj: BinaryIO, content_type: str, metadata: Dict[str, str]) -> None:
+        tmp_path = self._tmp_path()
+        try:
+            with open(tmp_path, 'wb') as f:
+                shutil.copyfileobj(file_obj, f, 1024 * 1024)
+            self._commit(tmp_path, key, content_type, metadata)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    async def receive_object(
+        self,
+        key: str,
+        content_type: str,
+        chunks: AsyncIterator[bytes],
+        min_size: int,
+        max_size: int
+    ) -> int:
+        """Сохраняет тело запроса по мере получения (загрузка по подписанной ссылке PUT)"""
+        tmp_path = self._tmp_path()
+        f = await asyncio.to_thread(open, tmp_path, 'wb')
+        size = 0
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_size:
+                    raise ValueError(f"Object exceeds {max_size} bytes")
+                await asyncio.to_thread(f.write, chunk)
+            f.close()
+            if size < min_size:
+                raise ValueError(f"Object is smaller than {min_size} bytes")
+            await asyncio.to_thread(self._commit, tmp_path, key, content_type, {})
+        finally:
+            f.close()
+            tmp_path.unlink(missing_ok=True)
+        return size
+
+    def get_object(
+        self,
+        key: str,
+        range_header: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[datetime] = None
+    ) -> Tuple[int, dict]:
+        stat = self._stat(key)
+        if stat is None:
+            return 404, {}
+
+        etag = self._etag(stat)
+        last_modified = self._last_modified(stat)
+        if if_none_match:
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            if '*' in tags or etag in tags:
+                return 304, {'etag': etag, 'last-modified': last_modified.strftime('%a, %d %b %Y %H:%M:%S GMT')}
+        elif if_modified_since and last_modified <= (
+            if_modified_since if if_modified_since.tzinfo else if_modified_since.replace(tzinfo=timezone.utc)
+        ):
+            return 304, {'etag': etag, 'last-modified': last_modified.strftime('%a, %d %b %Y %H:%M:%S GMT')}
+
+        size = stat.st_size
+        start, end = 0, size - 1
+        status_code = 200
+        byte_range = self._parse_range(range_header, size) if range_header else None
+        if byte_range == (-1, -1):
+            return 416, {'content-range': f"bytes */{size}"}
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+
+        meta = self._read_meta(key)
+        response = {
+            'Body': MmapBody(self._path(key), start, end - start + 1),
+            'ContentLength': end - start + 1,
+            'ContentType': meta['ContentType'],
+            'Metadata': meta['Metadata'],
+            'ETag': etag,
+            'LastModified': last_modified,
+        }
+        if status_code == 206:
+            response['ContentRange'] = f"bytes {start}-{end}/{size}"
+        return status_code, response
+
+    def head_object(self, key: str) -> Optional[dict]:
+        stat = self._stat(key)
+        if stat is None:
+            return None
+        meta = self._read_meta(key)
+        return {
+            'ContentLength': stat.st_size,
+            'ContentType': meta['ContentType'],
+            'Metadata': meta['Metadata'],
+            'ETag': self._etag(stat),
+            'LastModified': self._last_modified(stat),
+        }
+
+    def delete_object(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+        self._meta_path(key).unlink(missing_ok=True)
+
+    def delete_objects(self, keys: List[str]) -> List[dict]:
+        errors = []
+        for key in keys:
+            try:
+                self.delete_object(key)
+            except (OSError, ValueError) as e:
+                errors.append({'s3_key': key, 'code': type(e).__name__, 'message': str(e)})
+        return errors
+
+    def _walk(self, directory: Path, dir_key: str, prefix: str, after: Optional[str]) -> Iterator[dict]:
+        """Обход в порядке ключей S3: каталог 'a' сортируется как 'a/'"""
+        entries = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.startswith('.') and not dir_key:
+                    continue
+                is_dir = entry.is_dir(follow_symlinks=False)
+                entries.append((dir_key + entry.name + ('/' if is_dir else ''), entry, is_dir))
+
+        for key, entry, is_dir in sorted(entries, key=lambda item: item[0]):
+            if is_dir:
+                # Пропускаем каталоги вне префикса и целиком лежащие до токена
+                if not (key.startswith(prefix) or prefix.startswith(key)):
+                    continue
+                if after is not None and key < after and not after.startswith(key):
+                    continue
+                yield from self._walk(Path(entry.path), key, prefix, after)
+            elif key.startswith(prefix) and (after is None or key > after):
+                stat = entry.stat(follow_symlinks=False)
+                yield {'Key': key, 'Size': stat.st_size, 'LastModified': self._last_modified(stat)}
+
+    def list_objects(
+        self,
+        prefix: str,
+        max_keys: int,
+        continuation_token: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        objects = []
+        for obj in self._walk(self.root, '', prefix, continuation_token):
+            if len(objects) == max_keys:
+                return objects, objects[-1]['Key']
+            objects.append(obj)
+        return objects, None
+
+    def presign_get(self, keys: List[str], expires_in: int) -> Dict[str, str]:
+        expires = int(time.time()) + expires_in
+        return {
+            key: self._signed_url(key, {'expires': expires, 'signature': self._signature('get', key, expires)})
+            for key in keys
+        }
+
+    def presign_upload(
+        self,
+        key: str,
+        content_type: str,
+        size: int,
+        max_size: int,
+        method: Literal['post', 'put'],
+        expires_in: int
+    ) -> dict:
+        # Для PUT подписан точный размер, для POST - верхняя граница (как content-length-range)
+        expires = int(time.time()) + expires_in
+        limit = str(size if method == 'put' else max_size)
+        url = self._signed_url(key, {
+            'expires': expires,
+            'content_type': content_type,
+            'size': limit,
+            'signature': self._signature(method, key, expires, content_type, limit),
+        })
+        if method == 'post':
+            return {'method': 'post', 'url': url, 'fields': {}, 'headers': {}}
+        return {
+            'method': 'put',
+            'url': url,
+            'fields': {},
+            'headers': {'Content-Type': content_type, 'Content-Length': str(size)},
+        }
+
+    def create_multipart_upload(self, key: str, content_type: str) -> str:
+        self._path(key)
+        upload_id = uuid.uuid4().hex
+        upload_dir = self._upload_dir(upload_id)
+        upload_dir.mkdir(parents=True)
+        (upload_dir / 'content_type').write_text(content_type)
+        return upload_id
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, body: bytes) -> str:
+        upload_dir = self._upload_dir(upload_id)
+        if not upload_dir.is_dir():
+            raise FileNotFoundError(f"Upload {upload_id} not found")
+
+        tmp_path = self._tmp_path()
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, upload_dir / f"{part_number:05d}")
+        return f'"{hashlib.md5(body).hexdigest()}"'
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        upload_dir = self._upload_dir(upload_id)
+        content_type = (upload_dir / 'content_type').read_text()
+
+        tmp_path = self._tmp_path()
+        try:
+            with open(tmp_path, 'wb') as f:
+                for part_number, _ in sorted(parts):
+                    with open(upload_dir / f"{part_number:05d}", 'rb') as part:
+                        shutil.copyfileobj(part, f, 1024 * 1024)
+            self._commit(tmp_path, key, content_type, {})
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        shutil.rmtree(self._upload_dir(upload_id), ignore_errors=True)
+
+    def check(self) -> None:
+        if not os.access(self.root, os.W_OK):
+            raise PermissionError(f"Storage root {self.root} is not writable")
+
+
+def local_storage_signing_key() -> bytes:
+    """Ключ подписи ссылок /s3/local: выводится из SECRET_KEY, но не совпадает с ключом JWT"""
+    return hmac.new(settings.SECRET_KEY.encode(), b"local-storage-links", hashlib.sha256).digest()
+
+
+def local_storage_public_url() -> str:
+    """Адрес маршрутов /s3/local с учётом ROOT_PATH и API_PREFIX"""
+    if media_s3_settings.LOCAL_STORAGE_PUBLIC_URL:
+        return media_s3_settings.LOCAL_STORAGE_PUBLIC_URL
+    return (
+        media_s3_settings.LOCAL_STORAGE_BASE_URL.rstrip('/')
+        + settings.ROOT_PATH.rstrip('/')
+        + settings.API_PREFIX.rstrip('/')
+        + '/s3/local'
+    )
+
+
+def create_storage_backend() -> StorageBackend:
+    """Хранилище, выбранное в media_s3_settings.STORAGE_BACKEND"""
+    if media_s3_settings.STORAGE_BACKEND == 'local':
+        return LocalStorageBackend(
+            media_s3_settings.LOCAL_STORAGE_ROOT,
+            local_storage_public_url(),
+            local_storage_signing_key()
+        )
+    return S3StorageBackend()
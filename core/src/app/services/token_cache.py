@@ -0,0 +1,96 @@
+"""In-process cache of verified bearer tokens used for request authentication."""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from core.src.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCache:
+    """
+    LRU cache of verified JWT subjects keyed by a SHA-256 digest of the token.
+
+    A token is verified once; until its exp (capped at max_ttl seconds) the
+    same token resolves to the cached subject without another signature
+    check. Only successfully verified tokens are stored, and raw tokens are
+    never kept in memory.
+    """
+
+    def __init__(self, max_size: int, max_ttl: int):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[str]:
+        """Get the subject of a previously verified, not yet expired token."""
+        digest = self._digest(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        subject, expires_at = entry
+        if time.time() >= expires_at:
+            del self._entries[digest]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return subject
+
+    def put(self, token: str, subject: str, expires_at: Optional[float] = None) -> None:
+        """Store a verified token's subject until its expiry, evicting the least recently used."""
+        deadline = time.time() + self.max_ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+
+        digest = self._digest(token)
+        self._entries[digest] = (subject, deadline)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, token: str) -> None:
+        """Drop a token from the cache."""
+        self._entries.pop(self._digest(token), None)
+
+    def clear(self) -> None:
+        """Drop all cached tokens and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Cache size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+token_cache = TokenCache(
+    max_size=settings.TOKEN_CACHE_SIZE,
+    max_ttl=settings.TOKEN_CACHE_MAX_TTL
+)
+
+# Tokens the auth service confirmed as belonging to a superuser
+admin_token_cache = TokenCache(
+    max_size=settings.TOKEN_CACHE_SIZE,
+    max_ttl=settings.ADMIN_CHECK_CACHE_TTL
+)
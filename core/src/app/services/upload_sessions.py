@@ -0,0 +1,257 @@
+# app/services/upload_sessions.py
+"""Возобновляемые multipart-загрузки через API: сессия → части → complete."""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Literal, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from core.src.app.models.course_media import CourseMedia, MediaUploadPart, MediaUploadSession
+from core.src.app.repositories.base import dialect_insert
+from core.src.app.repositories.media_s3_config import media_s3_settings
+from core.src.app.services.media_s3_service import media_s3_service
+from core.src.app.services.media_uploads import create_media_record
+
+logger = logging.getLogger(__name__)
+
+# Ограничение S3 на число частей в одной загрузке
+MAX_PARTS = 10000
+
+
+def _is_expired(session: MediaUploadSession) -> bool:
+    expires_at = session.expires_at
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= datetime.now(timezone.utc)
+
+
+def _ensure_active(session: MediaUploadSession) -> None:
+    """Части и complete принимаются только активной, не просроченной сессией"""
+    if session.status != 'active':
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Сессия загрузки в статусе {session.status}"
+        )
+    if _is_expired(session):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Сессия загрузки истекла"
+        )
+
+
+async def create_session(
+    db: AsyncSession,
+    filename: str,
+    content_type: str,
+    size: int,
+    media_type: Literal['image', 'video'],
+    course_id: Optional[int] = None,
+    lesson_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    custom_name: Optional[str] = None
+) -> MediaUploadSession:
+    """
+    Проверяет заявленный файл, начинает multipart-загрузку в S3 и сохраняет сессию
+
+    Returns:
+        MediaUploadSession: Новая сессия (без частей)
+    """
+    is_valid, error_msg = media_s3_service.validate_file(size, content_type, filename, media_type)
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error_msg
+        )
+
+    part_size = max(media_s3_settings.MULTIPART_PART_SIZE, -(-size // MAX_PARTS))
+    s3_key = media_s3_service.build_s3_key(filename, media_type, course_id, lesson_id, user_id)
+    upload_id = await media_s3_service.create_multipart_upload_async(s3_key, content_type)
+
+    session = MediaUploadSession(
+        s3_key=s3_key,
+        upload_id=upload_id,
+        filename=filename,
+        custom_name=custom_name,
+        content_type=content_type,
+        media_type=media_type,
+        size=size,
+        part_size=part_size,
+        course_id=course_id,
+        lesson_id=lesson_id,
+        user_id=user_id,
+        status='active',
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=media_s3_settings.UPLOAD_SESSION_TTL),
+    )
+    db.add(session)
+    await db.commit()
+
+    logger.info(f"Upload session {session.id} started for {s3_key} ({size} bytes, {session.total_parts} parts)")
+    return await get_session(db, session.id)
+
+
+async def get_session(
+    db: AsyncSession,
+    session_id: str,
+    for_update: bool = False
+) -> MediaUploadSession:
+    """Сессия вместе с уже загруженными частями (for_update - с блокировкой строки сессии)"""
+    stmt = (
+        select(MediaUploadSession)
+        .options(selectinload(MediaUploadSession.parts))
+        .where(MediaUploadSession.id == session_id)
+        .execution_options(populate_existing=True)
+    )
+    if for_update:
+        stmt = stmt.with_for_update()
+    result = await db.execute(stmt)
+    session = result.scalar_one_or_none()
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Сессия загрузки {session_id} не найдена"
+        )
+    return session
+
+
+async def _read_part(chunks: AsyncIterator[bytes], part_number: int, expected_size: int) -> bytes:
+    """Читает тело части, обрывая чтение, как только оно превысило ожидаемый размер"""
+    body = bytearray()
+    async for chunk in chunks:
+        body += chunk
+        if len(body) > expected_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Часть {part_number} должна быть размером {expected_size} байт"
+            )
+    return bytes(body)
+
+
+async def upload_part(
+    db: AsyncSession,
+    session_id: str,
+    part_number: int,
+    chunks: AsyncIterator[bytes],
+    content_length: Optional[int] = None
+) -> MediaUploadPart:
+    """
+    Передаёт часть в S3 сразу по получении и запоминает её ETag
+
+    Сессия и размер проверяются до чтения тела: запрос с неверным
+    Content-Length отклоняется сразу, а тело читается не дальше
+    ожидаемого размера части.
+
+    Повторная отправка той же части перезаписывает её, так что клиент
+    может безопасно переотправить часть после обрыва.
+    """
+    session = await get_session(db, session_id)
+    _ensure_active(session)
+
+    if not 1 <= part_number <= session.total_parts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Номер части должен быть от 1 до {session.total_parts}"
+        )
+
+    expected_size = session.expected_part_size(part_number)
+    if content_length is not None and content_length != expected_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Часть {part_number} должна быть размером {expected_size} байт, Content-Length {content_length}"
+        )
+
+    body = await _read_part(chunks, part_number, expected_size)
+    if len(body) != expected_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Часть {part_number} должна быть размером {expected_size} байт, получено {len(body)}"
+        )
+
+    etag = await media_s3_service.upload_part_async(session.s3_key, session.upload_id, part_number, body)
+
+    # Повторная отправка части (в том числе параллельная) перезаписывает её ETag
+    stmt = dialect_insert(db, MediaUploadPart).values(
+        session_id=session.id, part_number=part_number, etag=etag, size=len(body)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MediaUploadPart.session_id, MediaUploadPart.part_number],
+        set_={'etag': stmt.excluded.etag, 'size': stmt.excluded.size}
+    )
+    await db.execute(stmt)
+    await db.commit()
+    return MediaUploadPart(session_id=session.id, part_number=part_number, etag=etag, size=len(body))
+
+
+async def complete_session(db: AsyncSession, session_id: str) -> CourseMedia:
+    """
+    Собирает объект из частей в S3 и создаёт запись CourseMedia
+
+    Строка сессии блокируется до коммита, так что параллельный complete
+    дожидается первого и возвращает уже созданную запись.
+    """
+    session = await get_session(db, session_id, for_update=True)
+
+    if session.status == 'completed' and session.media_id:
+        media = await db.get(CourseMedia, session.media_id)
+        if media:
+            return media
+    _ensure_active(session)
+
+    result = await db.execute(select(CourseMedia).where(CourseMedia.s3_key == session.s3_key))
+    media = result.scalar_one_or_none()
+
+    if media is None:
+        uploaded = {part.part_number for part in session.parts}
+        missing = [n for n in range(1, session.total_parts + 1) if n not in uploaded]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Не загружены части: {', '.join(map(str, missing[:20]))}"
+            )
+
+        await media_s3_service.complete_multipart_upload_async(
+            session.s3_key,
+            session.upload_id,
+            [(part.part_number, part.etag) for part in session.parts]
+        )
+        media = await create_media_record(
+            db,
+            s3_key=session.s3_key,
+            filename=session.filename,
+            content_type=session.content_type,
+            media_type=session.media_type,
+            size=session.size,
+            course_id=session.course_id,
+            lesson_id=session.lesson_id,
+            user_id=session.user_id,
+            custom_name=session.custom_name,
+            commit=False
+        )
+
+    session.status = 'completed'
+    session.media_id = media.id
+    session.parts.clear()
+    await db.commit()
+
+    logger.info(f"Upload session {session_id} completed: media {media.id}")
+    return media
+
+
+async def abort_session(db: AsyncSession, session_id: str) -> None:
+    """Отменяет загрузку в S3 и помечает сессию отменённой"""
+    session = await get_session(db, session_id)
+    if session.status != 'active':
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Сессия загрузки в статусе {session.status}"
+        )
+
+    await media_s3_service.abort_multipart_upload_async(session.s3_key, session.upload_id)
+
+    session.status = 'aborted'
+    session.parts.clear()
+    await db.commit()
+    logger.info(f"Upload session {session_id} aborted")
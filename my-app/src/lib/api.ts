@@ -366,9 +366,21 @@ export const testsAPI = {
   },
 
 
-  getUserAllAttempts: async (userId:  string): Promise<TestAttemptResponse[]> => {
-    const response = await testsClient.get(`/attempts/user/${userId}`);
-    return response.data;
+  // Все попытки пользователя: проходим по страницам через заголовок X-Next-Cursor
+  getUserAllAttempts: async (
+    userId: string,
+    limit = 1000
+  ): Promise<TestAttemptResponse[]> => {
+    const attempts: TestAttemptResponse[] = [];
+    let cursor: string | undefined;
+    do {
+      const response = await testsClient.get(`/attempts/user/${userId}`, {
+        params: { cursor, limit },
+      });
+      attempts.push(...response.data);
+      cursor = response.headers["x-next-cursor"];
+    } while (cursor);
+    return attempts;
   },
 
   // Получить детальную информацию о попытке с результатами
@@ -441,7 +453,7 @@ export const mediaAPI = {
   },
 
   list: async (params?: {
-    skip?: number;
+    cursor?: string;
     limit?: number;
     media_type?: "image" | "video";
     course_id?: number;
@@ -503,15 +515,20 @@ export const combinedTestsAPI = {
     return response.data;
   },
 
-  // Get attempts history
+  // Get attempts history, following the X-Next-Cursor header page by page
   getAttemptsHistory: async (
-    skip = 0,
-    limit = 100
+    limit = 1000
   ): Promise<CombinedTestAttemptResponse[]> => {
-    const response = await combinedTestsClient.get("/attempts/history", {
-      params: { skip, limit },
-    });
-    return response.data;
+    const attempts: CombinedTestAttemptResponse[] = [];
+    let cursor: string | undefined;
+    do {
+      const response = await combinedTestsClient.get("/attempts/history", {
+        params: { cursor, limit },
+      });
+      attempts.push(...response.data);
+      cursor = response.headers["x-next-cursor"];
+    } while (cursor);
+    return attempts;
   },
 
   // Get specific attempt details
@@ -334,6 +334,7 @@ export interface MediaUploadResponse {
 export interface MediaListResponse {
   media: CourseMediaResponse[];
   total: number;
+  next_cursor?: string | null;
 }
 
 export interface MediaConfigResponse {